@@ -0,0 +1,120 @@
+# src/batch_sizer.py
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from .db import pyodbc
+from .dialect import DUCKDB, dialect_of
+
+DEFAULT_TARGET_SECONDS = 5.0
+DEFAULT_MIN_BATCH_SIZE = 5000
+DEFAULT_MAX_BATCH_SIZE = 500000
+
+# one step never changes the size by more than this factor (a single slow / fast batch can't swing it wildly)
+_MAX_STEP = 2.0
+# within +-20% of the target the size is left alone (no flapping around the target)
+_DEADBAND = 1.2
+# sizes are rounded to this (easier to read in the log, and avoids tiny changes)
+_ROUND_TO = 1000
+
+_INSERT_SQL = """
+INSERT INTO etl.run_batch_size (RunId, StepName, BatchNo, LowId, HighId, BatchSize, RowsIn, DurationMs, RowsPerSec, NextBatchSize, Reason, DecidedUtc)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+
+@dataclass
+class BatchSizeDecision:
+    # one batch as it ran + the size picked for the next one
+    batch_no: int
+    low_id: int
+    high_id: int
+    batch_size: int
+    rows: int
+    seconds: float
+    next_size: int
+    reason: str  # grow / shrink / hold / tail / min / max
+    decided_utc: datetime
+
+
+class AdaptiveBatchSize:
+    """
+    Picks the next batch size from how long the last ones took, aiming at target_seconds per batch.
+    - Throughput (rows/sec) is smoothed over batches, next size = smoothed rows/sec * target_seconds
+    - Moves at most 2x up or down per batch, leaves the size alone within +-20% of the target, stays in [min_size, max_size]
+    - A short batch (fewer rows than asked for = end of the backlog) says nothing about the size and is ignored
+    - Every decision is kept and written to etl.run_batch_size by flush() (if that table exists)
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        target_seconds: float = DEFAULT_TARGET_SECONDS,
+        min_size: int = DEFAULT_MIN_BATCH_SIZE,
+        max_size: int = DEFAULT_MAX_BATCH_SIZE,
+        smoothing: float = 0.5
+    ):
+        if target_seconds <= 0:
+            raise ValueError("target_seconds must be > 0")
+        if not 1 <= min_size <= max_size:
+            raise ValueError("batch size bounds must satisfy 1 <= min_size <= max_size")
+        self.target_seconds = target_seconds
+        self.min_size = min_size
+        self.max_size = max_size
+        self.smoothing = smoothing
+        self.size = min(max(initial, min_size), max_size)
+        self.decisions: list[BatchSizeDecision] = []
+        self._rate: float | None = None
+        self._pending = 0  # decisions not flushed yet
+
+    def observe(self, low_id: int, high_id: int, rows: int, seconds: float) -> int:
+        """Record a finished batch (size = self.size when it ran) and return the size for the next one."""
+        requested = self.size
+        next_size, reason = requested, "hold"
+
+        if rows < requested or seconds <= 0:
+            reason = "tail"
+        else:
+            rate = rows / seconds
+            self._rate = rate if self._rate is None else self.smoothing * rate + (1 - self.smoothing) * self._rate
+
+            ratio = self._rate * self.target_seconds / requested
+            if ratio > _DEADBAND or ratio < 1 / _DEADBAND:
+                ratio = min(max(ratio, 1 / _MAX_STEP), _MAX_STEP)
+                next_size = max(int(round(requested * ratio / _ROUND_TO)) * _ROUND_TO, 1)
+                reason = "grow" if next_size > requested else "shrink"
+
+            if next_size >= self.max_size:
+                next_size, reason = self.max_size, ("max" if requested < self.max_size else "hold")
+            elif next_size <= self.min_size:
+                next_size, reason = self.min_size, ("min" if requested > self.min_size else "hold")
+
+        self.decisions.append(BatchSizeDecision(
+            len(self.decisions) + 1, low_id, high_id, requested, rows, seconds, next_size, reason,
+            datetime.now(timezone.utc),
+        ))
+        self._pending += 1
+        self.size = next_size
+        return next_size
+
+    def flush(self, conn: pyodbc.Connection, run_id: str, step_name: str) -> None:
+        pending = self.decisions[len(self.decisions) - self._pending:]
+        self._pending = 0
+        if not pending:
+            return
+
+        cur = conn.cursor()
+        if dialect_of(conn) != DUCKDB:  # the duckdb schema always has it
+            cur.execute("SELECT OBJECT_ID('etl.run_batch_size', 'U');")
+            if cur.fetchone()[0] is None:
+                return  # log table not deployed (see SQL's/DDL/run_batch_size)
+
+        cur.fast_executemany = True
+        cur.executemany(_INSERT_SQL, [
+            (
+                run_id, step_name, d.batch_no, d.low_id, d.high_id, d.batch_size, d.rows,
+                round(d.seconds * 1000, 3), round(d.rows / d.seconds, 1) if d.seconds > 0 else None,
+                d.next_size, d.reason, d.decided_utc.replace(tzinfo=None),
+            )
+            for d in pending
+        ])
+        conn.commit()
@@ -0,0 +1,169 @@
+# src/benchmark/generator.py
+import csv
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from ..bronze import BRONZE_COLUMNS
+
+_START = datetime(2023, 1, 1)
+_DT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# what a reject row breaks (one rule each, same rules silver checks, see silver._STAGE_SQL ErrorType)
+_REJECT_KINDS = ("INVALID_INCIDENT_DT", "MISSING_COUNTY", "INVALID_INJURY_FLG", "INVALID_NALOXONE_FLG", "INVALID_MED_GIVEN_FLG")
+
+
+@dataclass
+class GeneratorConfig:
+    """
+    Shape of a synthetic bronze file.
+    - rows: data rows in the file (duplicates and rejects included)
+    - duplicate_rate: share of rows that repeat an earlier clean row value for value (silver dedupes them on RecordHash)
+    - reject_rate: share of rows that break exactly one silver validation rule
+    - cardinality: distinct members per text dim (complaint, symptom, provider, disposition, ...); counties are capped at `counties`
+    - days: INCIDENT_DT is spread evenly over this many days from 2023-01-01 (more rows than seconds in the span: 1s apart)
+    - Same seed + config = same file, byte for byte
+    """
+    rows: int
+    seed: int = 42
+    duplicate_rate: float = 0.02
+    reject_rate: float = 0.01
+    cardinality: int = 500
+    counties: int = 62
+    days: int = 3 * 365
+
+    def __post_init__(self):
+        if self.rows < 0:
+            raise ValueError("rows must be >= 0")
+        if not 0 <= self.duplicate_rate < 1 or not 0 <= self.reject_rate < 1 or self.duplicate_rate + self.reject_rate >= 1:
+            raise ValueError("duplicate_rate / reject_rate must be in [0, 1) and add up to < 1")
+        if self.cardinality < 1 or self.counties < 1:
+            raise ValueError("cardinality / counties must be >= 1")
+        if self.days < 1:
+            raise ValueError("days must be >= 1")
+
+
+@dataclass
+class GeneratedCounts:
+    # what silver/gold should end up with for a generated file (checked by the harness)
+    rows: int = 0
+    duplicates: int = 0
+    rejects: int = 0
+
+    @property
+    def clean(self) -> int:
+        return self.rows - self.duplicates - self.rejects
+
+
+class _Pool:
+    # skewed pick from a fixed member list (a few members are common, most are rare - like real dims)
+    def __init__(self, rnd: random.Random, members: list[str]):
+        self.rnd = rnd
+        self.members = members
+        self.cum_weights = list(accumulate(1.0 / (k + 1) for k in range(len(members))))
+
+    def pick(self) -> str:
+        return self.rnd.choices(self.members, cum_weights=self.cum_weights)[0]
+
+
+def _members(prefix: str, n: int) -> list[str]:
+    return [f"{prefix} {k:05d}" for k in range(1, n + 1)]
+
+
+def generate_rows(cfg: GeneratorConfig, counts: GeneratedCounts | None = None):
+    """
+    Yield bronze rows (tuples of raw strings in BRONZE_COLUMNS order), streaming (nothing is held but the duplicate sample).
+    - Every non-duplicate row gets its own INCIDENT_DT second, so only the planned duplicates share a RecordHash
+    - counts (optional) is filled in as rows are produced
+    """
+    rnd = random.Random(cfg.seed)
+    counts = counts if counts is not None else GeneratedCounts()
+
+    n = cfg.cardinality
+    county = _Pool(rnd, _members("COUNTY", cfg.counties))
+    complaint = _Pool(rnd, _members("COMPLAINT", n))
+    anatomic = _Pool(rnd, _members("LOCATION", max(n // 10, 1)))
+    symptom = _Pool(rnd, _members("SYMPTOM", n))
+    impression = _Pool(rnd, _members("IMPRESSION", n))
+    disposition = _Pool(rnd, _members("DISPOSITION", max(n // 20, 1)))
+    destination = _Pool(rnd, _members("DESTINATION", max(n // 50, 1)))
+    structure = _Pool(rnd, _members("STRUCTURE", max(n // 50, 1)))
+    service = _Pool(rnd, _members("SERVICE", max(n // 20, 1)))
+    level = _Pool(rnd, _members("LEVEL", max(n // 100, 1)))
+    flags = ("Y", "N", "Y", "N", "")
+    step = max(cfg.days * 86400 // max(cfg.rows, 1), 1)  # seconds per row slot
+
+    recent: list[tuple] = []  # last clean rows, duplicates are copied from here
+    for i in range(cfg.rows):
+        roll = rnd.random()
+
+        if roll < cfg.duplicate_rate and recent:
+            row = rnd.choice(recent)
+            counts.duplicates += 1
+        else:
+            incident = _START + timedelta(seconds=step * i + rnd.randrange(step))
+            notified = incident + timedelta(seconds=rnd.randrange(30, 300))
+            on_scene = notified + timedelta(minutes=rnd.randrange(2, 30))
+            to_patient = on_scene + timedelta(minutes=rnd.randrange(0, 5))
+            left = to_patient + timedelta(minutes=rnd.randrange(5, 40))
+            arrived = left + timedelta(minutes=rnd.randrange(5, 60))
+
+            values = {
+                "INCIDENT_DT": incident.strftime(_DT_FORMAT),
+                "INCIDENT_COUNTY": county.pick(),
+                "CHIEF_COMPLAINT_DISPATCH": complaint.pick(),
+                "CHIEF_COMPLAINT_ANATOMIC_LOC": anatomic.pick(),
+                "PRIMARY_SYMPTOM": symptom.pick(),
+                "PROVIDER_IMPRESSION_PRIMARY": impression.pick(),
+                "DISPOSITION_ED": disposition.pick(),
+                "DISPOSITION_HOSPITAL": disposition.pick(),
+                "INJURY_FLG": rnd.choice(flags),
+                "NALOXONE_GIVEN_FLG": rnd.choice(flags),
+                "MEDICATION_GIVEN_OTHER_FLG": rnd.choice(flags),
+                "DESTINATION_TYPE": destination.pick(),
+                "PROVIDER_TYPE_STRUCTURE": structure.pick(),
+                "PROVIDER_TYPE_SERVICE": service.pick(),
+                "PROVIDER_TYPE_SERVICE_LEVEL": level.pick(),
+                "PROVIDER_TO_SCENE_MINS": str((on_scene - notified).seconds // 60),
+                "PROVIDER_TO_DESTINATION_MINS": str((arrived - left).seconds // 60),
+                "UNIT_NOTIFIED_BY_DISPATCH_DT": notified.strftime(_DT_FORMAT),
+                "UNIT_ARRIVED_ON_SCENE_DT": on_scene.strftime(_DT_FORMAT),
+                "UNIT_ARRIVED_TO_PATIENT_DT": to_patient.strftime(_DT_FORMAT),
+                "UNIT_LEFT_SCENE_DT": left.strftime(_DT_FORMAT),
+                "PATIENT_ARRIVED_DESTINATION_DT": arrived.strftime(_DT_FORMAT),
+            }
+
+            if roll < cfg.duplicate_rate + cfg.reject_rate:
+                kind = rnd.choice(_REJECT_KINDS)
+                if kind == "INVALID_INCIDENT_DT":
+                    values["INCIDENT_DT"] = f"not a date {i}"
+                elif kind == "MISSING_COUNTY":
+                    values["INCIDENT_COUNTY"] = ""
+                elif kind == "INVALID_INJURY_FLG":
+                    values["INJURY_FLG"] = "MAYBE"
+                elif kind == "INVALID_NALOXONE_FLG":
+                    values["NALOXONE_GIVEN_FLG"] = "MAYBE"
+                else:
+                    values["MEDICATION_GIVEN_OTHER_FLG"] = "MAYBE"
+                counts.rejects += 1
+                row = tuple(values[c] for c in BRONZE_COLUMNS)
+            else:
+                row = tuple(values[c] for c in BRONZE_COLUMNS)
+                if len(recent) < 1000:
+                    recent.append(row)
+                else:
+                    recent[rnd.randrange(1000)] = row
+
+        counts.rows += 1
+        yield row
+
+
+def write_csv(path: str, cfg: GeneratorConfig) -> GeneratedCounts:
+    """Write a generated file with the bronze column names as header (loadable with --load-file / bronze.load_file)."""
+    counts = GeneratedCounts()
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(BRONZE_COLUMNS)
+        w.writerows(generate_rows(cfg, counts))
+    return counts
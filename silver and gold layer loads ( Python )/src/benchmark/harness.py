@@ -0,0 +1,215 @@
+# src/benchmark/harness.py
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+try:
+    import resource  # peak RSS; not on Windows
+except ImportError:
+    resource = None
+
+from ..db import connect
+from ..dialect import BACKENDS, DUCKDB, dialect_of
+from ..bronze import load_file
+from ..silver import run_silver, SILVER_ENGINES
+from ..gold import run_gold, FACT_ENGINES
+from .generator import GeneratorConfig, write_csv
+
+DEFAULT_SIZES = (100_000, 1_000_000, 10_000_000)
+DEFAULT_BASELINE = "benchmark_baseline.json"
+DEFAULT_TOLERANCE = 0.20
+
+STEPS = ("bronze", "silver", "gold")
+
+# bench runs start from an empty bronze (silver + gold are reset by their own full refresh)
+_WIPE_SQL = """
+TRUNCATE TABLE silver.ems_reject;
+TRUNCATE TABLE silver.ems_clean;
+TRUNCATE TABLE bronze.ems_raw;
+"""
+
+_COUNTS_SQL = """
+SELECT
+    (SELECT COUNT_BIG(1) FROM silver.ems_clean),
+    (SELECT COUNT_BIG(1) FROM silver.ems_reject),
+    (SELECT COUNT_BIG(1) FROM dw.FactEMS_Encounter);
+"""
+
+_DUCKDB_COUNTS_SQL = """
+SELECT
+    (SELECT COUNT(1) FROM silver.ems_clean),
+    (SELECT COUNT(1) FROM silver.ems_reject),
+    (SELECT COUNT(1) FROM dw.FactEMS_Encounter);
+"""
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # Linux reports KB
+
+
+def _connect(conn_str: str, backend: str):
+    if backend == "duckdb":
+        from ..duckdb_backend import connect as connect_duckdb  # duckdb is only needed for this backend
+        return connect_duckdb(conn_str)
+    return connect(conn_str)
+
+
+def run_size(conn_str: str, size: int, args) -> dict:
+    """
+    One benchmark point, meant to run in its own process (peak RSS is per process).
+    - Wipes bronze/silver/fact, generates `size` rows to a temp CSV, then times bronze load, silver, gold
+    - Checks silver clean / reject and fact counts against what the generator produced
+    - --backend duckdb: conn_str is the DuckDB file, everything runs in process
+    """
+    cfg = GeneratorConfig(size, seed=args.seed, duplicate_rate=args.duplicate_rate,
+                          reject_rate=args.reject_rate, cardinality=args.cardinality, days=args.days)
+    run_id = str(uuid.uuid4())
+    conn = _connect(conn_str, args.backend)
+    result = {"rows": size, "seconds": {}, "rows_per_sec": {}}
+
+    with tempfile.TemporaryDirectory(prefix="ems_bench_") as tmp:
+        path = os.path.join(tmp, f"ems_bench_{size}.csv")
+        t0 = time.perf_counter()
+        expected = write_csv(path, cfg)
+        result["generate_seconds"] = round(time.perf_counter() - t0, 3)
+
+        conn.cursor().execute(_WIPE_SQL)
+        conn.commit()
+
+        steps = {
+            "bronze": lambda: load_file(conn, run_id, path, batch_size=args.batch_size),
+            "silver": lambda: run_silver(conn, run_id, batch_size=args.batch_size, full_refresh=True,
+                                         engine=args.engine),
+            "gold": lambda: run_gold(conn, run_id, full_refresh=True, batch_size=args.batch_size,
+                                     fact_engine=args.fact_engine),
+        }
+        for step in STEPS:
+            t0 = time.perf_counter()
+            steps[step]()
+            seconds = time.perf_counter() - t0
+            result["seconds"][step] = round(seconds, 3)
+            result["rows_per_sec"][step] = round(size / seconds, 1) if seconds > 0 else None
+
+    cur = conn.cursor()
+    cur.execute(_DUCKDB_COUNTS_SQL if dialect_of(conn) == DUCKDB else _COUNTS_SQL)
+    clean, rejects, facts = (int(v) for v in cur.fetchone())
+    conn.close()
+
+    result["total_seconds"] = round(sum(result["seconds"].values()), 3)
+    result["peak_rss_mb"] = _peak_rss_mb()
+    result["counts"] = {"clean": clean, "rejects": rejects, "facts": facts}
+    result["expected"] = {"clean": expected.clean, "rejects": expected.rejects, "facts": expected.clean}
+    return result
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    """Regressions vs the baseline: rows/sec down or peak RSS up by more than `tolerance` (same size, same step)."""
+    problems = []
+    for size, res in results.items():
+        base = baseline.get(size)
+        if base is None:
+            continue
+        for step, rate in res["rows_per_sec"].items():
+            base_rate = base["rows_per_sec"].get(step)
+            if base_rate and rate is not None and rate < base_rate * (1 - tolerance):
+                problems.append(f"{size} rows {step}: {rate:,.0f} rows/s vs baseline {base_rate:,.0f} rows/s")
+        rss, base_rss = res.get("peak_rss_mb"), base.get("peak_rss_mb")
+        if rss and base_rss and rss > base_rss * (1 + tolerance):
+            problems.append(f"{size} rows peak RSS: {rss:,.1f} MB vs baseline {base_rss:,.1f} MB")
+    return problems
+
+
+def _print_table(results: dict[str, dict]) -> None:
+    print(f"{'rows':>11} {'step':>7} {'seconds':>10} {'rows/s':>12} {'peak MB':>9}")
+    for size, res in results.items():
+        for step in STEPS:
+            rate = res["rows_per_sec"][step]
+            print(f"{int(size):>11,} {step:>7} {res['seconds'][step]:>10.2f} {rate or 0:>12,.0f} {res['peak_rss_mb'] or 0:>9,.1f}")
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="End-to-end throughput benchmark (bronze -> silver -> gold) on synthetic data")
+    p.add_argument("--conn", required=True,
+                   help="ODBC connection string of a THROWAWAY ems database (it gets wiped); --backend duckdb: path of the DuckDB file")
+    p.add_argument("--backend", choices=sorted(BACKENDS), default="sqlserver",
+                   help="sqlserver (default) or duckdb (in-process, sql silver engine only)")
+    p.add_argument("--wipe", action="store_true",
+                   help="Required: confirms bronze/silver/fact/watermarks in --conn may be deleted")
+    p.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                   help="Comma separated row counts (default 100000,1000000,10000000)")
+    p.add_argument("--batch-size", type=int, default=50000, help="Pipeline batch size for all steps (default 50000)")
+    p.add_argument("--engine", choices=SILVER_ENGINES, default="sql", help="Silver stage engine (default sql)")
+    p.add_argument("--fact-engine", choices=FACT_ENGINES, default="sql", help="Gold fact engine (default sql)")
+    p.add_argument("--seed", type=int, default=42, help="Generator seed (same seed = same data)")
+    p.add_argument("--duplicate-rate", type=float, default=0.02, help="Share of exact duplicate rows (default 0.02)")
+    p.add_argument("--reject-rate", type=float, default=0.01, help="Share of rows silver rejects (default 0.01)")
+    p.add_argument("--cardinality", type=int, default=500, help="Distinct members per text dim (default 500)")
+    p.add_argument("--days", type=int, default=3 * 365,
+                   help="Days the incident dates are spread over, from 2023-01-01 (default 1095)")
+    p.add_argument("--baseline", default=DEFAULT_BASELINE, help=f"Baseline JSON to compare against (default {DEFAULT_BASELINE})")
+    p.add_argument("--save-baseline", action="store_true", help="Write this run's results as the new baseline")
+    p.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                   help="Allowed slowdown / memory growth vs baseline before failing (default 0.20 = 20%%)")
+    p.add_argument("--output", help="Also write the results JSON here")
+    p.add_argument("--one-size", type=int, help=argparse.SUPPRESS)  # child process: run one size, print JSON
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.wipe:
+        raise SystemExit("The benchmark deletes bronze/silver/gold rows in --conn; pass --wipe to confirm")
+    if args.backend == "duckdb" and args.engine != "sql":
+        raise SystemExit("--backend duckdb only has the sql silver engine (no --engine arrow)")
+
+    if args.one_size is not None:
+        print(json.dumps(run_size(args.conn, args.one_size, args)))
+        return
+
+    # each size in a fresh process: clean peak RSS, nothing cached from the previous size
+    passthrough = [a for a in (argv if argv is not None else sys.argv[1:]) if a != "--save-baseline"]
+    results = {}
+    for size in (int(s) for s in args.sizes.split(",")):
+        out = subprocess.run(
+            [sys.executable, "-m", "src.benchmark.harness", *passthrough, "--one-size", str(size)],
+            check=True, stdout=subprocess.PIPE, text=True
+        )
+        results[str(size)] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    _print_table(results)
+
+    problems = []
+    for size, res in results.items():
+        if res["counts"] != res["expected"]:
+            problems.append(f"{size} rows: counts {res['counts']} != expected {res['expected']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline and not problems:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            problems += compare(results, json.load(f), args.tolerance)
+    else:
+        print(f"no baseline at {args.baseline} (run with --save-baseline to create one)")
+
+    if problems:
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# src/bronze.py
+import csv
+import os
+from operator import itemgetter
+
+from .db import pyodbc, RetryPolicy, DEFAULT_RETRY
+from .run_audit import start_run, end_run
+from .metrics import StepMetrics, NULL_METRICS
+from .dialect import DUCKDB, dialect_of
+
+BRONZE_STEP = "BRONZE_LOAD"
+DEFAULT_BATCH_SIZE = 50000
+
+# raw CSV columns, in bronze.ems_raw order (CSV header names = bronze column names, same as the SSIS mapping)
+BRONZE_COLUMNS = [
+    "INCIDENT_DT",
+    "INCIDENT_COUNTY",
+    "CHIEF_COMPLAINT_DISPATCH",
+    "CHIEF_COMPLAINT_ANATOMIC_LOC",
+    "PRIMARY_SYMPTOM",
+    "PROVIDER_IMPRESSION_PRIMARY",
+    "DISPOSITION_ED",
+    "DISPOSITION_HOSPITAL",
+    "INJURY_FLG",
+    "NALOXONE_GIVEN_FLG",
+    "MEDICATION_GIVEN_OTHER_FLG",
+    "DESTINATION_TYPE",
+    "PROVIDER_TYPE_STRUCTURE",
+    "PROVIDER_TYPE_SERVICE",
+    "PROVIDER_TYPE_SERVICE_LEVEL",
+    "PROVIDER_TO_SCENE_MINS",
+    "PROVIDER_TO_DESTINATION_MINS",
+    "UNIT_NOTIFIED_BY_DISPATCH_DT",
+    "UNIT_ARRIVED_ON_SCENE_DT",
+    "UNIT_ARRIVED_TO_PATIENT_DT",
+    "UNIT_LEFT_SCENE_DT",
+    "PATIENT_ARRIVED_DESTINATION_DT",
+]
+
+_LINEAGE_COLUMNS = ["RunId", "FileName", "SourceRowNum"]
+
+_INSERT_SQL = f"""
+INSERT INTO bronze.ems_raw ({', '.join(_LINEAGE_COLUMNS + BRONZE_COLUMNS)})
+VALUES ({', '.join('?' for _ in _LINEAGE_COLUMNS + BRONZE_COLUMNS)});
+"""
+
+# undo a partial load (chunks are committed as they go, so a failed run leaves its own rows behind)
+_DELETE_RUN_SQL = "DELETE FROM bronze.ems_raw WHERE RunId = ?;"
+
+
+def _column_index(header: list[str]) -> list[int]:
+    # position of each bronze column in this file's header (extra CSV columns are ignored)
+    pos = {name.strip().upper(): i for i, name in enumerate(header)}
+    missing = [c for c in BRONZE_COLUMNS if c not in pos]
+    if missing:
+        raise ValueError(f"CSV is missing bronze columns: {', '.join(missing)}")
+    return [pos[c] for c in BRONZE_COLUMNS]
+
+
+def read_chunks(path: str, batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    Stream the EMS CSV as lists of (SourceRowNum, *bronze columns) tuples.
+    - Only one chunk is held in memory at a time
+    - SourceRowNum = 1-based data row number (header excluded, blank lines skipped), same as the SSIS script component
+    - Empty fields stay '' (SSIS flat file source with RetainNulls = false)
+    """
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+
+        idx = _column_index(header)
+        width = max(idx) + 1
+        pick = itemgetter(*idx)
+
+        chunk = []
+        row_num = 0
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < width:
+                row = row + [None] * (width - len(row))  # ragged last columns -> NULL
+            row_num += 1
+            chunk.append((row_num, *pick(row)))
+            if len(chunk) >= batch_size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
+
+def _input_sizes(chunk: list[tuple]) -> list[tuple]:
+    # fast_executemany sizes its parameter buffers from the declared column width (NVARCHAR(4000) x rows adds up fast),
+    # so declare each column as wide as the longest value in this chunk instead
+    sizes = [(pyodbc.SQL_WVARCHAR, 36, 0), (pyodbc.SQL_WVARCHAR, 255, 0), (pyodbc.SQL_BIGINT, 0, 0)]
+    for i in range(1, len(BRONZE_COLUMNS) + 1):
+        longest = max((len(r[i]) for r in chunk if r[i]), default=1)
+        sizes.append((pyodbc.SQL_WVARCHAR, min(longest, 4000), 0))
+    return sizes
+
+
+def load_file(
+    conn: pyodbc.Connection,
+    run_id: str,
+    path: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    metrics: StepMetrics = NULL_METRICS,
+    retry: RetryPolicy = DEFAULT_RETRY
+) -> int:
+    """
+    Python replacement for the SSIS bronze data flow (CSV -> bronze.ems_raw).
+    - etl.run_audit gets the same RUNNING -> SUCCESS/FAILED row the SSIS package writes
+    - Rows are bulk inserted with fast_executemany, one commit per batch_size chunk (bounded memory + log)
+    - On failure the run's bronze rows are deleted again, so silver never sees half a file
+    - metrics: one insert+commit timing per chunk (bounds = SourceRowNum range)
+    - A chunk that hits a deadlock/timeout is rolled back and inserted again (retry)
+    - duckdb backend: the file is read by DuckDB itself in one statement (duckdb_backend.load_csv)
+    - Returns RowsBronze
+    """
+    file_name = os.path.basename(path)
+    start_run(conn, run_id, file_name)
+
+    rows_bronze = 0
+    cur = conn.cursor()
+    cur.fast_executemany = True
+    try:
+        if dialect_of(conn) == DUCKDB:
+            from .duckdb_backend import load_csv  # imports bronze itself
+
+            with metrics.measure(BRONZE_STEP, "insert") as m:
+                rows_bronze = m.rows = load_csv(conn, run_id, path, file_name)
+                conn.commit()
+        else:
+            for chunk in read_chunks(path, batch_size):
+                params = [(run_id, file_name, *r) for r in chunk]
+                sizes = _input_sizes(chunk)
+
+                def insert_chunk():
+                    cur.setinputsizes(sizes)
+                    cur.executemany(_INSERT_SQL, params)
+                    conn.commit()
+
+                with metrics.measure(BRONZE_STEP, "insert", chunk[0][0] - 1, chunk[-1][0]) as m:
+                    retry.run(insert_chunk, conn)
+                    m.rows = len(chunk)
+                rows_bronze += len(chunk)
+
+        metrics.flush(conn)
+        end_run(conn, run_id, "SUCCESS", rows_bronze=rows_bronze)
+        return rows_bronze
+
+    except Exception as e:
+        conn.rollback()
+        conn.cursor().execute(_DELETE_RUN_SQL, run_id)
+        conn.commit()
+        end_run(conn, run_id, "FAILED", rows_bronze=0, error_message=str(e)[:4000])
+        raise
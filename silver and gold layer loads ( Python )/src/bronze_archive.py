@@ -0,0 +1,420 @@
+# src/bronze_archive.py
+# bronze.ems_raw archival (--archive-bronze DIR): rows silver already processed move to zstd Parquet files on local disk,
+# then leave bronze, so bronze only holds what silver hasn't read yet (+ what's waiting to be purged).
+# - archived = BronzeId <= the silver watermark, one file per (RunId, FileName) per pass:
+#   DIR/<RunId>/bronze_<first BronzeId>_<last BronzeId>.parquet, every column as stored (NVARCHAR -> string)
+# - every file is read back and checked against the SQL row count + BronzeId range before it's listed in
+#   DIR/manifest.jsonl (one JSON line per file, with its sha256); the archive watermark moves after the manifest
+# - purge = BronzeId <= min(archive watermark, silver watermark), deleted in small BronzeId windows, one commit each
+#   (the log only ever holds one window), so it's safe to stop and rerun at any point
+# - and never a row whose reject the daily summary hasn't counted yet: daily_summary.merge_rejects reads the reject's
+#   date / county from its bronze row, so purge stops below the first one until gold has merged them
+# - --full-refresh --replay-archive DIR puts the archived rows back (same BronzeIds) before silver starts over
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .bronze import BRONZE_COLUMNS
+from .db import pyodbc, RetryPolicy, DEFAULT_RETRY, execute_rowcount
+from .step_log import start_step, end_step
+from .watermark import get_last_bronze_id, set_last_bronze_id, BRONZE_ARCHIVE_PIPELINE_NAME, SUMMARY_REJECT_PIPELINE_NAME
+from .daily_summary import summary_enabled
+from .metrics import StepMetrics, NULL_METRICS
+from .dialect import DUCKDB, dialect_of
+
+ARCHIVE_STEP = "BRONZE_ARCHIVE"
+RESTORE_STEP = "BRONZE_RESTORE"
+MANIFEST_NAME = "manifest.jsonl"
+DEFAULT_PURGE_BATCH_SIZE = 10000
+COMPRESSION = "zstd"
+
+_ARCHIVE_COLUMNS = ["BronzeId", "RunId", "FileName", "LoadUtc", "SourceRowNum"] + BRONZE_COLUMNS
+
+ARCHIVE_SCHEMA = pa.schema(
+    [
+        ("BronzeId", pa.int64()),
+        ("RunId", pa.string()),
+        ("FileName", pa.string()),
+        ("LoadUtc", pa.timestamp("ms")),
+        ("SourceRowNum", pa.int64()),
+    ]
+    + [(c, pa.string()) for c in BRONZE_COLUMNS]
+)
+
+# what the pass has to write, per file (params: pass bounds)
+_GROUPS_SQL = """
+SELECT RunId, FileName, COUNT(1), MIN(BronzeId), MAX(BronzeId)
+FROM bronze.ems_raw
+WHERE BronzeId > ? AND BronzeId <= ?
+GROUP BY RunId, FileName
+ORDER BY MIN(BronzeId);
+"""
+
+_FIRST_ID_SQL = "SELECT MIN(BronzeId) FROM bronze.ems_raw WHERE BronzeId > ? AND BronzeId <= ?;"
+
+# one BronzeId window (PK range seek, same statement on both backends)
+_WINDOW_SQL = f"""
+SELECT {', '.join(_ARCHIVE_COLUMNS)}
+FROM bronze.ems_raw
+WHERE BronzeId > ? AND BronzeId <= ?
+ORDER BY BronzeId;
+"""
+
+_PURGE_SQL = "DELETE FROM bronze.ems_raw WHERE BronzeId > ? AND BronzeId <= ?;"
+
+# first bronze row behind a reject the summary hasn't counted yet (param: summary reject watermark = last RejectId counted)
+_FIRST_UNCOUNTED_REJECT_SQL = """
+SELECT MIN(b.BronzeId)
+FROM silver.ems_reject r
+JOIN bronze.ems_raw b
+    ON b.RunId = r.RunId
+   AND b.SourceRowNum = r.SourceRowNum
+WHERE r.RejectId > ?;
+"""
+
+# SQL Server restore: file batches land here first, then go in under IDENTITY_INSERT (original BronzeIds)
+_CREATE_RESTORE_SQL = f"""
+IF OBJECT_ID('tempdb..#bronze_restore') IS NOT NULL DROP TABLE #bronze_restore;
+CREATE TABLE #bronze_restore (
+    BronzeId     BIGINT NOT NULL PRIMARY KEY,
+    RunId        NVARCHAR(36) NOT NULL,
+    FileName     NVARCHAR(255) NOT NULL,
+    LoadUtc      DATETIME2(3) NOT NULL,
+    SourceRowNum BIGINT NOT NULL,
+    {', '.join(f'{c} NVARCHAR(4000) NULL' for c in BRONZE_COLUMNS)}
+);
+"""
+
+_RESTORE_SQL = f"""
+INSERT INTO bronze.ems_raw ({', '.join(_ARCHIVE_COLUMNS)})
+SELECT {', '.join(_ARCHIVE_COLUMNS)}
+FROM #bronze_restore r
+WHERE NOT EXISTS (SELECT 1 FROM bronze.ems_raw b WHERE b.BronzeId = r.BronzeId);
+"""
+
+
+# --------------------------
+# manifest
+# --------------------------
+def read_manifest(archive_dir: str) -> list[dict]:
+    path = os.path.join(archive_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _append_manifest(archive_dir: str, entries: list[dict]) -> None:
+    # one write + fsync per pass: a pass is listed completely or not at all
+    with open(os.path.join(archive_dir, MANIFEST_NAME), "a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(e, sort_keys=True) + "\n" for e in entries))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _drop_partial_files(archive_dir: str) -> None:
+    # *.tmp = a pass that died before its files were checked; nothing points at them
+    for root, _, files in os.walk(archive_dir):
+        for name in files:
+            if name.endswith(".tmp"):
+                os.remove(os.path.join(root, name))
+
+
+def archived_upto(conn: pyodbc.Connection, manifest: list[dict]) -> int:
+    """
+    Last BronzeId in the archive (the archive watermark), reconciled with the manifest.
+    - manifest ahead of the watermark = the last pass died between the two; its files are checked and listed, and
+      its rows are still in bronze (nothing purges past the watermark), so once they match the watermark catches up
+    - manifest behind it = a different (or damaged) archive directory than the one the rows went to: ValueError,
+      purging against it would delete rows that aren't in it
+    """
+    upto = get_last_bronze_id(conn, BRONZE_ARCHIVE_PIPELINE_NAME)
+    listed = max((int(e["archived_upto"]) for e in manifest), default=0)
+    if listed > upto:
+        ahead = [e for e in manifest if int(e["archived_upto"]) > upto]
+        cur = conn.cursor()
+        cur.execute(_GROUPS_SQL, min(int(e["archived_from"]) for e in ahead), listed)
+        in_bronze = {(r[0], r[1]): int(r[2]) for r in cur.fetchall()}
+        if in_bronze != {(e["run_id"], e["file_name"]): int(e["rows"]) for e in ahead}:
+            raise ValueError(f"archive manifest lists BronzeIds up to {listed} that don't match bronze; wrong archive directory?")
+        set_last_bronze_id(conn, listed, BRONZE_ARCHIVE_PIPELINE_NAME)
+        return listed
+    if listed < upto:
+        raise ValueError(
+            f"bronze is archived up to BronzeId {upto} but this archive's manifest only goes to {listed}; "
+            "wrong archive directory?"
+        )
+    return upto
+
+
+# --------------------------
+# archive + purge
+# --------------------------
+def _table(rows: list) -> pa.Table:
+    cols = list(zip(*rows))
+    return pa.Table.from_arrays(
+        [pa.array(list(values), type=f.type) for values, f in zip(cols, ARCHIVE_SCHEMA)],
+        schema=ARCHIVE_SCHEMA
+    )
+
+
+def _check_file(path: str, rows: int, first_id: int, last_id: int) -> None:
+    # read the file back: row count + BronzeId range have to be what SQL said the group holds
+    ids = pq.read_table(path, columns=["BronzeId"]).column("BronzeId")
+    got = (len(ids), ids[0].as_py() if len(ids) else None, ids[-1].as_py() if len(ids) else None)
+    if got != (rows, first_id, last_id):
+        raise ValueError(f"archive check failed for {path}: rows/first/last {got}, expected {(rows, first_id, last_id)}")
+
+
+def _archive_pass(
+    conn: pyodbc.Connection,
+    archive_dir: str,
+    lo: int,
+    hi: int,
+    batch_size: int,
+    metrics: StepMetrics
+) -> list[dict]:
+    # BronzeId lo < id <= hi -> one checked Parquet file per (RunId, FileName); returns their manifest entries
+    cur = conn.cursor()
+    cur.execute(_GROUPS_SQL, lo, hi)
+    groups = {(r[0], r[1]): (int(r[2]), int(r[3]), int(r[4])) for r in cur.fetchall()}
+    if not groups:
+        return []
+
+    paths = {}
+    for (run_id, file_name), (_, first_id, last_id) in groups.items():
+        os.makedirs(os.path.join(archive_dir, run_id), exist_ok=True)
+        paths[(run_id, file_name)] = os.path.join(run_id, f"bronze_{first_id}_{last_id}.parquet")
+    writers: dict[tuple, pq.ParquetWriter] = {}
+    written = dict.fromkeys(groups, 0)
+
+    try:
+        cur.execute(_FIRST_ID_SQL, lo, hi)
+        start = int(cur.fetchone()[0]) - 1
+        # one scan of the range in BronzeId windows, rows routed to their file (one row group per window)
+        while start < hi:
+            end = min(start + batch_size, hi)
+            with metrics.measure(ARCHIVE_STEP, "write", start, end) as m:
+                cur.execute(_WINDOW_SQL, start, end)
+                rows = cur.fetchall()
+                by_group: dict[tuple, list] = {}
+                for r in rows:
+                    by_group.setdefault((r[1], r[2]), []).append(tuple(r))
+                for key, group_rows in by_group.items():
+                    if key not in writers:
+                        tmp = os.path.join(archive_dir, paths[key]) + ".tmp"
+                        writers[key] = pq.ParquetWriter(tmp, ARCHIVE_SCHEMA, compression=COMPRESSION)
+                    writers[key].write_table(_table(group_rows))
+                    written[key] += len(group_rows)
+                m.rows = len(rows)
+            conn.rollback()  # read only; don't hold the window's locks / snapshot into the next one
+            start = end
+    finally:
+        for w in writers.values():
+            w.close()
+
+    entries = []
+    archived_utc = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    for key, (rows, first_id, last_id) in groups.items():
+        path = os.path.join(archive_dir, paths[key])
+        if written[key] != rows:
+            raise ValueError(f"archive of {key[1]} (RunId {key[0]}) read {written[key]} rows, bronze has {rows}")
+        _check_file(path + ".tmp", rows, first_id, last_id)
+        os.replace(path + ".tmp", path)
+        entries.append({
+            "run_id": key[0],
+            "file_name": key[1],
+            "path": paths[key].replace(os.sep, "/"),
+            "rows": rows,
+            "first_bronze_id": first_id,
+            "last_bronze_id": last_id,
+            "archived_from": lo,
+            "archived_upto": hi,
+            "archived_utc": archived_utc,
+            "sha256": _sha256(path),
+        })
+    return entries
+
+
+def purge_bronze(
+    conn: pyodbc.Connection,
+    upto: int,
+    batch_size: int = DEFAULT_PURGE_BATCH_SIZE,
+    metrics: StepMetrics = NULL_METRICS,
+    retry: RetryPolicy = DEFAULT_RETRY
+) -> int:
+    """
+    Delete bronze rows with BronzeId <= upto, batch_size BronzeIds per statement + commit (bounded log / locks).
+    Caller makes sure they're archived and processed. Returns rows deleted.
+    """
+    cur = conn.cursor()
+    cur.execute(_FIRST_ID_SQL, 0, upto)
+    first = cur.fetchone()[0]
+    if first is None:
+        return 0
+
+    purged = 0
+    lo = int(first) - 1
+    while lo < upto:
+        hi = min(lo + batch_size, upto)
+
+        def delete_window(lo=lo, hi=hi):
+            n = execute_rowcount(cur, _PURGE_SQL, lo, hi)
+            conn.commit()
+            return n
+
+        with metrics.measure(ARCHIVE_STEP, "purge", lo, hi) as m:
+            n = retry.run(delete_window, conn)
+            m.rows = n
+        purged += n
+        lo = hi
+    return purged
+
+
+def purge_bound(conn: pyodbc.Connection, archived: int) -> int:
+    """
+    Highest BronzeId that may leave bronze: archived, processed by silver (silver watermark) and, with the daily summary
+    deployed, below every bronze row whose reject gold hasn't merged into it yet (summary reject watermark).
+    """
+    upto = min(archived, get_last_bronze_id(conn))
+    cur = conn.cursor()
+    if summary_enabled(cur):
+        cur.execute(_FIRST_UNCOUNTED_REJECT_SQL, get_last_bronze_id(conn, SUMMARY_REJECT_PIPELINE_NAME))
+        first = cur.fetchone()[0]
+        if first is not None:
+            upto = min(upto, int(first) - 1)
+    return upto
+
+
+def archive_bronze(
+    conn: pyodbc.Connection,
+    run_id: str,
+    archive_dir: str,
+    batch_size: int = 50000,
+    purge_batch_size: int = DEFAULT_PURGE_BATCH_SIZE,
+    metrics: StepMetrics = NULL_METRICS,
+    retry: RetryPolicy = DEFAULT_RETRY
+) -> tuple[int, int]:
+    """
+    Archive every bronze row silver has processed that isn't archived yet, then purge what's archived.
+    - Files are written as *.tmp, checked, renamed, listed in the manifest, and only then does the archive watermark
+      move; a failure anywhere before that leaves bronze untouched
+    - Purge never goes past the silver watermark (after a --full-refresh it waits for silver to catch up again), nor
+      reaches a reject the daily summary hasn't counted yet (purge_bound; the next run after gold purges the rest)
+    - One etl.run_step_log row (BRONZE_ARCHIVE): RowsIn = rows archived, RowsOut = rows purged
+    - Returns (rows archived, rows purged)
+    """
+    step_log_id = start_step(conn, run_id, ARCHIVE_STEP)
+    archived = purged = 0
+    try:
+        os.makedirs(archive_dir, exist_ok=True)
+        _drop_partial_files(archive_dir)
+        lo = archived_upto(conn, read_manifest(archive_dir))
+        hi = get_last_bronze_id(conn)
+
+        if hi > lo:
+            entries = _archive_pass(conn, archive_dir, lo, hi, batch_size, metrics)
+            if entries:
+                _append_manifest(archive_dir, entries)
+                set_last_bronze_id(conn, hi, BRONZE_ARCHIVE_PIPELINE_NAME)
+                lo = hi
+                archived = sum(e["rows"] for e in entries)
+
+        purged = purge_bronze(conn, purge_bound(conn, lo), purge_batch_size, metrics, retry)
+
+        metrics.flush(conn)
+        end_step(conn, step_log_id, "SUCCESS", rows_in=archived, rows_out=purged, rows_reject=0)
+        return archived, purged
+
+    except Exception as ex:
+        conn.rollback()
+        metrics.flush(conn)
+        end_step(conn, step_log_id, "FAILED", rows_in=archived, rows_out=purged, rows_reject=0,
+                 error_message=str(ex)[:4000])
+        raise
+
+
+# --------------------------
+# replay
+# --------------------------
+def restore_archive(
+    conn: pyodbc.Connection,
+    run_id: str,
+    archive_dir: str,
+    batch_size: int = 50000,
+    metrics: StepMetrics = NULL_METRICS
+) -> int:
+    """
+    Put every archived row back into bronze.ems_raw with its original BronzeId (for --full-refresh --replay-archive).
+    - Every file's sha256 is checked against the manifest before anything is inserted
+    - Rows still in bronze (archived, not purged yet) are skipped, so a rerun is harmless
+    - The archive watermark stays: the next --archive-bronze only purges them again (after silver reprocessed them)
+    - One etl.run_step_log row (BRONZE_RESTORE): RowsIn = rows in the archive, RowsOut = rows put back
+    """
+    step_log_id = start_step(conn, run_id, RESTORE_STEP)
+    rows_in = restored = 0
+    try:
+        manifest = read_manifest(archive_dir)
+        archived_upto(conn, manifest)  # same directory the rows went to
+        for e in manifest:
+            path = os.path.join(archive_dir, e["path"])
+            if _sha256(path) != e["sha256"]:
+                raise ValueError(f"{path} doesn't match its manifest checksum")
+
+        cur = conn.cursor()
+        duckdb = dialect_of(conn) == DUCKDB
+        if not duckdb:
+            cur.execute(_CREATE_RESTORE_SQL)
+            conn.commit()
+
+        for e in sorted(manifest, key=lambda x: x["first_bronze_id"]):
+            path = os.path.join(archive_dir, e["path"])
+            rows_in += int(e["rows"])
+            with metrics.measure(RESTORE_STEP, "insert", e["first_bronze_id"] - 1, e["last_bronze_id"]) as m:
+                if duckdb:
+                    from .duckdb_backend import import_bronze  # reads the Parquet file itself
+
+                    n = import_bronze(conn, path)
+                    conn.commit()
+                else:
+                    n = 0
+                    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+                        cur.fast_executemany = True
+                        try:
+                            cur.executemany(
+                                f"INSERT INTO #bronze_restore ({', '.join(_ARCHIVE_COLUMNS)}) "
+                                f"VALUES ({', '.join('?' for _ in _ARCHIVE_COLUMNS)});",
+                                list(zip(*(col.to_pylist() for col in batch.columns)))
+                            )
+                        finally:
+                            cur.fast_executemany = False
+                        cur.execute("SET IDENTITY_INSERT bronze.ems_raw ON;")
+                        n += execute_rowcount(cur, _RESTORE_SQL)
+                        cur.execute("SET IDENTITY_INSERT bronze.ems_raw OFF;")
+                        cur.execute("TRUNCATE TABLE #bronze_restore;")
+                        conn.commit()  # one batch per commit (bounded log)
+                m.rows = n
+            restored += n
+
+        metrics.flush(conn)
+        end_step(conn, step_log_id, "SUCCESS", rows_in=rows_in, rows_out=restored, rows_reject=0)
+        return restored
+
+    except Exception as ex:
+        conn.rollback()
+        metrics.flush(conn)
+        end_step(conn, step_log_id, "FAILED", rows_in=rows_in, rows_out=restored, rows_reject=0,
+                 error_message=str(ex)[:4000])
+        raise
@@ -0,0 +1,173 @@
+# src/calendar_dim.py
+from datetime import date, timedelta
+
+from .db import pyodbc
+from .dialect import DUCKDB, dialect_of
+from . import duckdb_sql
+from .date_window import FIRST_YEAR, LAST_YEAR
+
+# fiscal year starts on the 1st of this month and is named by the calendar year it ends in (July start -> FY2025 = Jul-2024..Jun-2025)
+FISCAL_YEAR_START_MONTH = 7
+
+# fixed English names so DimDate doesn't depend on the server's language / DATEFIRST settings
+_DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+_MONTH_NAMES = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+
+_INSERT_SQL = """
+INSERT INTO dw.DimDate (
+    DateKey, FullDate, [Year], [Quarter], [Month], [Day],
+    DayOfWeek, DayName, MonthName, IsWeekend,
+    IsoYear, IsoWeek, FiscalYear, FiscalQuarter, FiscalMonth
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+
+def date_key(d: date) -> int:
+    # yyyymmdd int (same as the silver DateKey columns)
+    return d.year * 10000 + d.month * 100 + d.day
+
+
+def key_to_date(key: int) -> date:
+    return date(key // 10000, key // 100 % 100, key % 100)
+
+
+def calendar_rows(start: date, end: date, fiscal_start_month: int = FISCAL_YEAR_START_MONTH) -> list[tuple]:
+    """All DimDate rows for start..end (inclusive), in _INSERT_SQL column order."""
+    rows = []
+    d = start
+    one_day = timedelta(days=1)
+    while d <= end:
+        iso_year, iso_week, iso_weekday = d.isocalendar()  # weekday 1=Mon ... 7=Sun
+        fiscal_month = (d.month - fiscal_start_month) % 12 + 1
+        fiscal_year = d.year + (1 if fiscal_start_month != 1 and d.month >= fiscal_start_month else 0)
+        rows.append((
+            date_key(d),
+            d,
+            d.year,
+            (d.month - 1) // 3 + 1,
+            d.month,
+            d.day,
+            iso_weekday,
+            _DAY_NAMES[iso_weekday - 1],
+            _MONTH_NAMES[d.month - 1],
+            1 if iso_weekday >= 6 else 0,
+            iso_year,
+            iso_week,
+            fiscal_year,
+            (fiscal_month - 1) // 3 + 1,
+            fiscal_month,
+        ))
+        d += one_day
+    return rows
+
+
+class CalendarDim:
+    """
+    Keeps dw.DimDate as one contiguous calendar (whole years) instead of deriving it from silver.
+    - ensure() is a bounds check against the loaded range; it only generates + bulk inserts when a key falls outside
+    - loaded range is cached per run, so repeated slices cost nothing once the calendar covers them
+    - contiguous only inside first_year..last_year (the date window, date_window.py), whatever the slice asks for;
+      a date outside it gets a row for just that day from ensure_days (the fact's FKs need one)
+    """
+
+    def __init__(self, fiscal_start_month: int = FISCAL_YEAR_START_MONTH, first_year: int = FIRST_YEAR,
+                 last_year: int = LAST_YEAR):
+        if first_year > last_year:
+            raise ValueError("first_year must be <= last_year")
+        self.fiscal_start_month = fiscal_start_month
+        self.first_year = first_year
+        self.last_year = last_year
+        self.min_key: int | None = None
+        self.max_key: int | None = None
+        self.days: set[int] = set()  # keys outside the window known to be in dw.DimDate
+
+    @property
+    def first_key(self) -> int:
+        return self.first_year * 10000 + 101
+
+    @property
+    def last_key(self) -> int:
+        return self.last_year * 10000 + 1231
+
+    def reset(self) -> None:
+        # forget the cached range (e.g. the insert that extended it was rolled back); next ensure() re-reads it
+        self.min_key = self.max_key = None
+        self.days = set()
+
+    def _read_loaded_range(self, cur: pyodbc.Cursor) -> None:
+        # the calendar inside the window (single days outside it don't count)
+        if dialect_of(cur) == DUCKDB:
+            cur.execute(duckdb_sql.CALENDAR_RANGE_SQL, self.first_key, self.last_key)
+        else:
+            cur.execute("SELECT MIN(DateKey), MAX(DateKey), COUNT_BIG(1) FROM dw.DimDate WHERE DateKey BETWEEN ? AND ?;",
+                        self.first_key, self.last_key)
+        min_key, max_key, n = cur.fetchone()
+        if min_key is None:
+            return
+
+        # older data-driven DimDate can have gaps; treat it as not loaded so ensure() fills the holes
+        span = (key_to_date(int(max_key)) - key_to_date(int(min_key))).days + 1
+        if int(n) == span:
+            self.min_key, self.max_key = int(min_key), int(max_key)
+
+    def ensure(self, cur: pyodbc.Cursor, min_key: int | None, max_key: int | None) -> int:
+        """Make sure every date between min_key and max_key (clamped to the window) exists in dw.DimDate. Returns rows inserted."""
+        if min_key is None or max_key is None:
+            return 0
+
+        min_key = max(int(min_key), self.first_key)
+        max_key = min(int(max_key), self.last_key)
+        if min_key > max_key:
+            return 0
+
+        if self.min_key is None:
+            self._read_loaded_range(cur)
+
+        if self.min_key is not None and self.min_key <= min_key and max_key <= self.max_key:
+            return 0
+
+        # extend to whole calendar years around both the needed and the already-loaded range
+        lo, hi = min_key, max_key
+        if self.min_key is not None:
+            lo, hi = min(lo, self.min_key), max(hi, self.max_key)
+        start = date(lo // 10000, 1, 1)
+        end = date(hi // 10000, 12, 31)
+
+        cur.execute(
+            "SELECT DateKey FROM dw.DimDate WHERE DateKey BETWEEN ? AND ?;",
+            date_key(start), date_key(end)
+        )
+        existing = {int(r[0]) for r in cur.fetchall()}
+        rows = [r for r in calendar_rows(start, end, self.fiscal_start_month) if r[0] not in existing]
+        _insert(cur, rows)
+
+        self.min_key, self.max_key = date_key(start), date_key(end)
+        return len(rows)
+
+    def ensure_days(self, cur: pyodbc.Cursor, keys) -> int:
+        """DimDate rows for just these days outside the window (a typo year gets its days, not the years in between). Returns rows inserted."""
+        keys = {int(k) for k in keys if not self.first_key <= int(k) <= self.last_key} - self.days
+        if not keys:
+            return 0
+
+        cur.execute(f"SELECT DateKey FROM dw.DimDate WHERE DateKey IN ({', '.join('?' for _ in keys)});", *keys)
+        existing = {int(r[0]) for r in cur.fetchall()}
+        rows = [calendar_rows(d, d, self.fiscal_start_month)[0] for d in map(key_to_date, sorted(keys - existing))]
+        _insert(cur, rows)
+
+        self.days |= keys
+        return len(rows)
+
+
+def _insert(cur: pyodbc.Cursor, rows: list[tuple]) -> None:
+    if not rows:
+        return
+    cur.fast_executemany = True
+    try:
+        cur.executemany(duckdb_sql.CALENDAR_INSERT_SQL if dialect_of(cur) == DUCKDB else _INSERT_SQL, rows)
+    finally:
+        cur.fast_executemany = False
@@ -1,15 +1,59 @@
 import json
 from dataclasses import dataclass
 from .db import SqlServerConfig
+from .dialect import BACKENDS
+from .silver import SILVER_ENGINES
+from .gold import FACT_ENGINES
+from .date_window import DATE_WINDOW, check_date_window
 
 
 @dataclass
 class AppConfig:
-    # Central app config object used across the pipeline
-    sql_server: SqlServerConfig
-    run_id: str
+    # Central app config object used across the pipeline (run_pipeline --config: these become the CLI defaults)
+    sql_server: SqlServerConfig | None  # None = no SQL Server block (--backend duckdb, or --conn on the command line)
+    run_id: str | None
     batch_size: int = 50000  # used for chunking/bulk patterns on large files
-    dry_run: bool = False    # when true, run logic without writing to DB
+    fact_engine: str = "sql" # gold fact step: "sql" (dim joins) or "python" (in-memory dim key cache)
+    workers: int = 1         # parallel silver workers (1 = serial on the main connection)
+    dim_workers: int = 1     # gold: dims of a slice loaded concurrently on this many connections
+    engine: str = "sql"      # silver stage: "sql" (one T-SQL statement) or "arrow" (vectorized python, needs pyarrow)
+    retries: int = 3         # retries per batch/slice on deadlocks, timeouts, dropped connections (0 = off)
+    adaptive_batch: bool = False        # silver: resize batches toward target_batch_seconds (batch_size = start)
+    target_batch_seconds: float = 5.0
+    min_batch_size: int = 5000
+    max_batch_size: int = 500000
+    backend: str = "sqlserver"          # "sqlserver" or "duckdb" (embedded file, local runs; see duckdb_backend.py)
+    rollups: list[str] | None = None    # gold: "grain:dims" rollup specs to maintain (None = off, [] = default set; see rollups.py)
+    date_window: tuple[int, int] = DATE_WINDOW  # gold: years DimDate / the fact partitions are contiguous for (date_window.py)
+
+    def cli_defaults(self) -> dict:
+        """argparse dest -> value for run_pipeline.parse_args (flags given on the command line still win)."""
+        defaults = {
+            "run_id": self.run_id,
+            "batch_size": self.batch_size,
+            "fact_engine": self.fact_engine,
+            "workers": self.workers,
+            "dim_workers": self.dim_workers,
+            "engine": self.engine,
+            "retries": self.retries,
+            "adaptive_batch": self.adaptive_batch,
+            "target_batch_seconds": self.target_batch_seconds,
+            "min_batch_size": self.min_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "backend": self.backend,
+            "rollups": self.rollups,
+            "date_window": list(self.date_window),
+        }
+        if self.sql_server is not None and self.backend == "sqlserver":
+            defaults["conn"] = self.sql_server.connection_string()
+        return defaults
+
+
+def _choice(raw: dict, key: str, default: str, choices) -> str:
+    value = str(raw.get(key, default))
+    if value not in choices:
+        raise ValueError(f"config {key} must be one of {', '.join(sorted(choices))}, not {value!r}")
+    return value
 
 
 def load_config(path: str) -> AppConfig:
@@ -18,25 +62,37 @@ def load_config(path: str) -> AppConfig:
         raw = json.load(f)
 
     # Read SQL Server settings (supports defaults where reasonable)
-    ss = raw["sql_server"]
-    sql_cfg = SqlServerConfig(
-        driver=ss.get("driver", "{ODBC Driver 18 for SQL Server}"),
-        server=ss["server"],                         # required
-        database=ss.get("database", "ems"),
-        trusted_connection=bool(ss.get("trusted_connection", True)),
-        username=ss.get("username", ""),
-        password=ss.get("password", ""),
-        # Keep these explicit because local/dev SQL Server setups vary
-        encrypt=ss.get("encrypt", "no"),
-        trust_server_certificate=ss.get("trust_server_certificate", "yes"),
-    )
+    sql_cfg = None
+    ss = raw.get("sql_server")
+    if ss is not None:
+        sql_cfg = SqlServerConfig(
+            driver=ss.get("driver", "{ODBC Driver 18 for SQL Server}"),
+            server=ss["server"],                         # required
+            database=ss.get("database", "ems"),
+            trusted_connection=bool(ss.get("trusted_connection", True)),
+            username=ss.get("username", ""),
+            password=ss.get("password", ""),
+            # Keep these explicit because local/dev SQL Server setups vary
+            encrypt=ss.get("encrypt", "no"),
+            trust_server_certificate=ss.get("trust_server_certificate", "yes"),
+        )
 
-    # run_id is required so Silver/Gold can tie back to the same SSIS/bronze run
+    # run_id ties Silver/Gold back to the same SSIS/bronze run; usually passed per run with --run-id instead
+    rollups = raw.get("rollups")
     return AppConfig(
         sql_server=sql_cfg,
-        run_id=str(raw["run_id"]),
+        run_id=str(raw["run_id"]) if raw.get("run_id") else None,
         batch_size=int(raw.get("batch_size", 50000)),
-        dry_run=bool(raw.get("dry_run", False)),
+        fact_engine=_choice(raw, "fact_engine", "sql", FACT_ENGINES),
+        workers=int(raw.get("workers", 1)),
+        dim_workers=int(raw.get("dim_workers", 1)),
+        engine=_choice(raw, "engine", "sql", SILVER_ENGINES),
+        retries=int(raw.get("retries", 3)),
+        adaptive_batch=bool(raw.get("adaptive_batch", False)),
+        target_batch_seconds=float(raw.get("target_batch_seconds", 5.0)),
+        min_batch_size=int(raw.get("min_batch_size", 5000)),
+        max_batch_size=int(raw.get("max_batch_size", 500000)),
+        backend=_choice(raw, "backend", "sqlserver", BACKENDS),
+        rollups=[str(r) for r in rollups] if rollups is not None else None,
+        date_window=check_date_window(*raw.get("date_window", DATE_WINDOW)),
     )
-
-
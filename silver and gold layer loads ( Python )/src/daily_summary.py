@@ -0,0 +1,144 @@
+# src/daily_summary.py
+# dw.ems_daily_summary = one row per (IncidentDate, IncidentCounty), kept up to date incrementally:
+# - every gold slice MERGEs the aggregates of its silver rows (same SilverId range, same commit as the gold watermark)
+# - rejects are merged once per gold run from the RejectIds not counted yet (own watermark row, same commit)
+# so the table always equals "all silver up to the gold watermark", and a rerun can't count anything twice.
+from .db import pyodbc, execute_rowcount
+from .watermark import get_last_bronze_id, set_last_bronze_id, write_last_bronze_id, SUMMARY_REJECT_PIPELINE_NAME
+from .dialect import DUCKDB, dialect_of
+from . import duckdb_sql
+
+# additive measures of a silver slice, all computed in the one GROUP BY
+# (sum + count per duration so averages are exact: SceneMinsSum / SceneMinsCount)
+_SLICE_SQL = """
+MERGE dw.ems_daily_summary WITH (HOLDLOCK) AS t
+USING (
+    SELECT
+        s.IncidentDate,
+        s.IncidentCounty,
+        COUNT_BIG(1) AS TotalIncidents,
+        SUM(CASE WHEN s.InjuryFlg = 'Y' THEN 1 ELSE 0 END) AS InjuryYes,
+        SUM(CASE WHEN s.NaloxoneGivenFlg = 'Y' THEN 1 ELSE 0 END) AS NaloxoneYes,
+        SUM(CASE WHEN s.MedicationGivenOtherFlg = 'Y' THEN 1 ELSE 0 END) AS MedicationYes,
+        ISNULL(SUM(CAST(s.ProviderToSceneMins AS BIGINT)), 0) AS SceneMinsSum,
+        COUNT_BIG(s.ProviderToSceneMins) AS SceneMinsCount,
+        MIN(s.ProviderToSceneMins) AS SceneMinsMin,
+        MAX(s.ProviderToSceneMins) AS SceneMinsMax,
+        ISNULL(SUM(CAST(s.ProviderToDestinationMins AS BIGINT)), 0) AS DestinationMinsSum,
+        COUNT_BIG(s.ProviderToDestinationMins) AS DestinationMinsCount,
+        MIN(s.ProviderToDestinationMins) AS DestinationMinsMin,
+        MAX(s.ProviderToDestinationMins) AS DestinationMinsMax
+    FROM silver.ems_clean s
+    WHERE s.SilverId > ? AND s.SilverId <= ?
+      AND s.IncidentDttm IS NOT NULL
+      AND s.IncidentCounty IS NOT NULL
+    GROUP BY s.IncidentDate, s.IncidentCounty
+) AS d
+    ON t.IncidentDate = d.IncidentDate
+   AND t.IncidentCounty = d.IncidentCounty
+WHEN MATCHED THEN UPDATE SET
+    TotalIncidents = t.TotalIncidents + d.TotalIncidents,
+    InjuryYes = t.InjuryYes + d.InjuryYes,
+    NaloxoneYes = t.NaloxoneYes + d.NaloxoneYes,
+    MedicationYes = t.MedicationYes + d.MedicationYes,
+    SceneMinsSum = t.SceneMinsSum + d.SceneMinsSum,
+    SceneMinsCount = t.SceneMinsCount + d.SceneMinsCount,
+    SceneMinsMin = CASE WHEN t.SceneMinsMin IS NULL OR d.SceneMinsMin < t.SceneMinsMin THEN d.SceneMinsMin ELSE t.SceneMinsMin END,
+    SceneMinsMax = CASE WHEN t.SceneMinsMax IS NULL OR d.SceneMinsMax > t.SceneMinsMax THEN d.SceneMinsMax ELSE t.SceneMinsMax END,
+    DestinationMinsSum = t.DestinationMinsSum + d.DestinationMinsSum,
+    DestinationMinsCount = t.DestinationMinsCount + d.DestinationMinsCount,
+    DestinationMinsMin = CASE WHEN t.DestinationMinsMin IS NULL OR d.DestinationMinsMin < t.DestinationMinsMin THEN d.DestinationMinsMin ELSE t.DestinationMinsMin END,
+    DestinationMinsMax = CASE WHEN t.DestinationMinsMax IS NULL OR d.DestinationMinsMax > t.DestinationMinsMax THEN d.DestinationMinsMax ELSE t.DestinationMinsMax END,
+    RunId = ?,
+    LoadUtc = SYSUTCDATETIME()
+WHEN NOT MATCHED THEN INSERT (
+    RunId, IncidentDate, IncidentCounty,
+    TotalIncidents, InjuryYes, NaloxoneYes, MedicationYes,
+    SceneMinsSum, SceneMinsCount, SceneMinsMin, SceneMinsMax,
+    DestinationMinsSum, DestinationMinsCount, DestinationMinsMin, DestinationMinsMax
+) VALUES (
+    ?, d.IncidentDate, d.IncidentCounty,
+    d.TotalIncidents, d.InjuryYes, d.NaloxoneYes, d.MedicationYes,
+    d.SceneMinsSum, d.SceneMinsCount, d.SceneMinsMin, d.SceneMinsMax,
+    d.DestinationMinsSum, d.DestinationMinsCount, d.DestinationMinsMin, d.DestinationMinsMax
+);
+"""
+
+# rejects per day: the date / county come from the raw bronze row (a reject has no typed silver row).
+# rejects whose incident date doesn't parse can't be put on a day and aren't counted
+_REJECTS_SQL = """
+MERGE dw.ems_daily_summary WITH (HOLDLOCK) AS t
+USING (
+    SELECT v.IncidentDate, v.IncidentCounty, COUNT_BIG(1) AS RejectCount
+    FROM silver.ems_reject r
+    JOIN bronze.ems_raw b
+        ON b.RunId = r.RunId
+       AND b.SourceRowNum = r.SourceRowNum
+    CROSS APPLY (
+        SELECT
+            CAST(TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.INCIDENT_DT)), '')) AS DATE) AS IncidentDate,
+            ISNULL(NULLIF(LTRIM(RTRIM(b.INCIDENT_COUNTY)), ''), 'UNKNOWN') AS IncidentCounty
+    ) v
+    WHERE r.RejectId > ? AND r.RejectId <= ?
+      AND v.IncidentDate IS NOT NULL
+    GROUP BY v.IncidentDate, v.IncidentCounty
+) AS d
+    ON t.IncidentDate = d.IncidentDate
+   AND t.IncidentCounty = d.IncidentCounty
+WHEN MATCHED THEN UPDATE SET
+    RejectCount = t.RejectCount + d.RejectCount,
+    RunId = ?,
+    LoadUtc = SYSUTCDATETIME()
+WHEN NOT MATCHED THEN INSERT (RunId, IncidentDate, IncidentCounty, RejectCount)
+VALUES (?, d.IncidentDate, d.IncidentCounty, d.RejectCount);
+"""
+
+_RESET_SQL = """
+IF OBJECT_ID('dw.ems_daily_summary', 'U') IS NOT NULL
+    DELETE FROM dw.ems_daily_summary;
+"""
+
+
+def summary_enabled(cur: pyodbc.Cursor) -> bool:
+    """
+    The summary is optional: False when dw.ems_daily_summary isn't deployed.
+    A table still in the old per-RunId shape is an error (run SQL's/DDL/migration - daily summary grain).
+    """
+    if dialect_of(cur) == DUCKDB:
+        return True  # part of the duckdb schema
+
+    cur.execute("SELECT OBJECT_ID('dw.ems_daily_summary', 'U'), COL_LENGTH('dw.ems_daily_summary', 'RejectCount');")
+    table_id, new_shape = cur.fetchone()
+    if table_id is None:
+        return False
+    if new_shape is None:
+        raise ValueError("dw.ems_daily_summary is the old per-RunId table; run SQL's/DDL/migration - daily summary grain")
+    return True
+
+
+def merge_slice(cur: pyodbc.Cursor, run_id: str, lo: int, hi: int) -> int:
+    # fold silver rows lo < SilverId <= hi into the summary (caller commits, together with the gold watermark)
+    sql = duckdb_sql.SUMMARY_SLICE_SQL if dialect_of(cur) == DUCKDB else _SLICE_SQL
+    return execute_rowcount(cur, sql, lo, hi, run_id, run_id)
+
+
+def merge_rejects(conn: pyodbc.Connection, run_id: str) -> int:
+    # fold rejects not counted yet into the summary, commits with the reject watermark. returns summary rows touched
+    cur = conn.cursor()
+    lo = get_last_bronze_id(conn, SUMMARY_REJECT_PIPELINE_NAME)
+    cur.execute("SELECT COALESCE(MAX(RejectId), 0) FROM silver.ems_reject;")
+    hi = int(cur.fetchone()[0])
+    if hi <= lo:
+        return 0
+
+    sql = duckdb_sql.SUMMARY_REJECTS_SQL if dialect_of(conn) == DUCKDB else _REJECTS_SQL
+    rows = execute_rowcount(cur, sql, lo, hi, run_id, run_id)
+    write_last_bronze_id(conn, hi, SUMMARY_REJECT_PIPELINE_NAME)
+    conn.commit()
+    return rows
+
+
+def reset_summary(conn: pyodbc.Connection) -> None:
+    """Empty the summary and its reject watermark (whenever the gold watermark goes back to 0)."""
+    conn.cursor().execute(duckdb_sql.RESET_SUMMARY_SQL if dialect_of(conn) == DUCKDB else _RESET_SQL)
+    set_last_bronze_id(conn, 0, SUMMARY_REJECT_PIPELINE_NAME)
@@ -0,0 +1,22 @@
+# src/date_window.py
+# the years gold keeps contiguous: dw.DimDate is one whole-year calendar inside the window (calendar_dim.py) and the fact
+# only gets month partitions inside it (fact_partitions.py). Silver dates aren't touched by it:
+# - a date outside the window (a typo year like 0201 or 2920) is loaded like any other; gold adds a DimDate row for just
+#   that day (not every year in between) and the fact row sits in the first / last partition
+# - per run: --date-window FIRST LAST / config "date_window": [FIRST, LAST]; widening it later extends both on demand
+FIRST_YEAR = 2000
+LAST_YEAR = 2099
+DATE_WINDOW = (FIRST_YEAR, LAST_YEAR)
+
+# whole years of month partitions that fit in SQL Server's 15,000 partitions per table
+MAX_WINDOW_YEARS = 1200
+
+
+def check_date_window(first_year: int, last_year: int) -> tuple[int, int]:
+    """(first_year, last_year) as ints; ValueError unless 1 <= first <= last <= 9999 and at most MAX_WINDOW_YEARS years."""
+    first_year, last_year = int(first_year), int(last_year)
+    if not 1 <= first_year <= last_year <= 9999:
+        raise ValueError(f"date window must be years 1..9999 with first <= last, not {first_year}..{last_year}")
+    if last_year - first_year + 1 > MAX_WINDOW_YEARS:
+        raise ValueError(f"date window can span at most {MAX_WINDOW_YEARS} years (fact month partitions)")
+    return first_year, last_year
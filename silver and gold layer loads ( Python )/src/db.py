@@ -1,6 +1,260 @@
-import pyodbc
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from .dialect import DUCKDB, dialect_of
+
+try:
+    import pyodbc
+except ImportError:  # --backend duckdb runs without pyodbc / unixODBC installed
+    import types
+
+    class _MissingDriverError(Exception):
+        pass
+
+    def _no_pyodbc(*args, **kwargs):
+        raise ImportError("pyodbc isn't installed (pip install pyodbc); only --backend duckdb works without it")
+
+    # just enough of the module for the rest of the package: the Error type, annotations, the SQL type codes
+    # (setinputsizes is only called on SQL Server cursors) and a connect() that says what's missing
+    pyodbc = types.SimpleNamespace(
+        Error=_MissingDriverError,
+        Connection=object,
+        Cursor=object,
+        SQL_CHAR=1,
+        SQL_INTEGER=4,
+        SQL_TYPE_TIMESTAMP=93,
+        SQL_BINARY=-2,
+        SQL_BIGINT=-5,
+        SQL_WVARCHAR=-9,
+        connect=_no_pyodbc,
+    )
+
+# every database error the pipeline handles, from either backend (duckdb_backend raises this type too)
+Error = pyodbc.Error
+
+# applied to every new session:
+# - NOCOUNT ON: no "n rows affected" messages per statement (use execute_rowcount when the count matters)
+# - XACT_ABORT ON: any error (incl. a client timeout) rolls the whole transaction back, so a retry starts clean
+SESSION_SETTINGS_SQL = "SET NOCOUNT ON; SET XACT_ABORT ON;"
+
+# worth a retry: deadlock victim / lock + query timeouts / dropped connections / Azure SQL throttling + failover
+_TRANSIENT_SQLSTATES = ("40001", "HYT00", "HYT01", "08S01")
+_TRANSIENT_ERRORS = (1205, 1222, -2, 233, 10053, 10054, 10060, 40197, 40501, 40613, 49918, 49919, 49920)
+
+# the connection itself is gone (pool throws these away instead of handing them out again)
+_DISCONNECT_SQLSTATES = ("08S01", "08001", "08003")
+_DISCONNECT_ERRORS = (233, 10053, 10054, 10060)
+
+
+def _matches(ex: Exception, sqlstates: tuple, errors: tuple) -> bool:
+    if not isinstance(ex, pyodbc.Error):
+        return False
+    # pyodbc errors look like ('40001', '[40001] [Microsoft]...deadlocked ... (1205) (SQLExecDirectW)')
+    if ex.args and ex.args[0] in sqlstates:
+        return True
+    msg = str(ex)
+    return any(f"({n})" in msg for n in errors)
+
+
+def is_transient(ex: Exception) -> bool:
+    return _matches(ex, _TRANSIENT_SQLSTATES, _TRANSIENT_ERRORS)
+
+
+def is_disconnect(ex: Exception) -> bool:
+    return _matches(ex, _DISCONNECT_SQLSTATES, _DISCONNECT_ERRORS)
+
+
+def _odbc_value(value: str) -> str:
+    # values with ; { } (passwords...) go in braces, } doubled
+    if any(ch in value for ch in ";{}"):
+        return "{" + value.replace("}", "}}") + "}"
+    return value
+
+
+@dataclass
+class SqlServerConfig:
+    # the "sql_server" block of config.json (config.load_config), turned into an ODBC connection string
+    server: str
+    driver: str = "{ODBC Driver 18 for SQL Server}"
+    database: str = "ems"
+    trusted_connection: bool = True
+    username: str = ""
+    password: str = ""
+    encrypt: str = "no"
+    trust_server_certificate: str = "yes"
+
+    def connection_string(self) -> str:
+        parts = [f"DRIVER={self.driver}", f"SERVER={_odbc_value(self.server)}", f"DATABASE={_odbc_value(self.database)}"]
+        if self.trusted_connection:
+            parts.append("Trusted_Connection=yes")
+        else:
+            parts += [f"UID={_odbc_value(self.username)}", f"PWD={_odbc_value(self.password)}"]
+        parts += [f"Encrypt={self.encrypt}", f"TrustServerCertificate={self.trust_server_certificate}"]
+        return ";".join(parts) + ";"
+
 
 def connect(conn_str: str) -> pyodbc.Connection:
-    """Connect using a full ODBC connection string."""
+    """Connect using a full ODBC connection string (session settings applied)."""
     conn = pyodbc.connect(conn_str, autocommit=False)
+    conn.cursor().execute(SESSION_SETTINGS_SQL)
     return conn
+
+
+def execute_rowcount(cur: pyodbc.Cursor, sql: str, *params) -> int:
+    # rows affected by a single DML statement; NOCOUNT ON sessions don't report cur.rowcount
+    if dialect_of(cur) == DUCKDB:
+        cur.execute(sql, *params)  # DuckDB returns the count as the DML's result row
+        return int(cur.fetchone()[0])
+    cur.execute(sql + "\nSELECT @@ROWCOUNT;", *params)
+    return int(cur.fetchone()[0])
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retries an idempotent unit of work on transient errors (deadlock, timeout, dropped connection).
+    - Exponential backoff with jitter: base_delay, 2x, 4x ... capped at max_delay
+    - Only wrap work that is safe to run twice (batch + its watermark commit, NOT EXISTS inserts, ...)
+    """
+    attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    retries: int = 0  # total retries taken (all threads)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def run(self, fn, conn: pyodbc.Connection | None = None, on_retry=None):
+        attempt = 1
+        while True:
+            try:
+                return fn()
+            except pyodbc.Error as ex:
+                if attempt >= self.attempts or not is_transient(ex):
+                    raise
+                if conn is not None:
+                    try:
+                        conn.rollback()
+                    except pyodbc.Error:
+                        pass
+                with self._lock:
+                    self.retries += 1
+                if on_retry is not None:
+                    on_retry()  # caller drops any state the rolled back work left behind
+                delay = min(self.base_delay * 2 ** (attempt - 1), self.max_delay)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+                attempt += 1
+
+
+DEFAULT_RETRY = RetryPolicy()
+NO_RETRY = RetryPolicy(attempts=1)
+
+
+class ConnectionPool:
+    """
+    Small fixed-size pool of connections for parallel workers.
+    - Pre-warmed: all `size` connections are opened (with SESSION_SETTINGS_SQL) up front, so workers don't pay the login
+    - Callers block when all are checked out
+    - Each checkout is its own unit of work: rollback on error, caller commits on success
+    - A connection that failed with a disconnect error is closed and replaced on the next checkout
+    - stats(): size / open / idle / in use + checkouts, waits (had to block), created, discarded
+    """
+
+    def __init__(self, conn_str: str, size: int, prewarm: bool = True):
+        if size < 1:
+            raise ValueError("pool size must be >= 1")
+        self.conn_str = conn_str
+        self.size = size
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._all: list[pyodbc.Connection] = []
+        self._lock = threading.Lock()
+        self._counts = {"checkouts": 0, "waits": 0, "created": 0, "discarded": 0}
+
+        if prewarm:
+            for _ in range(size):
+                self._idle.put(self._open())
+
+    def _open(self) -> pyodbc.Connection:
+        conn = connect(self.conn_str)
+        with self._lock:
+            self._all.append(conn)
+            self._counts["created"] += 1
+        return conn
+
+    def _acquire(self) -> pyodbc.Connection:
+        waited = False
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+                break
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                can_open = len(self._all) < self.size
+            if can_open:
+                conn = self._open()
+                break
+
+            # wait for a worker to hand one back (re-check now and then in case one got discarded)
+            waited = True
+            try:
+                conn = self._idle.get(timeout=1)
+                break
+            except queue.Empty:
+                continue
+
+        with self._lock:
+            self._counts["checkouts"] += 1
+            if waited:
+                self._counts["waits"] += 1
+        return conn
+
+    def _discard(self, conn: pyodbc.Connection) -> None:
+        with self._lock:
+            if conn in self._all:
+                self._all.remove(conn)
+            self._counts["discarded"] += 1
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        except Exception as ex:
+            if is_disconnect(ex):
+                self._discard(conn)
+                conn = None
+            else:
+                try:
+                    conn.rollback()
+                except pyodbc.Error:
+                    pass  # connection is already gone; the error below is what matters
+            raise
+        finally:
+            if conn is not None:
+                self._idle.put(conn)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            open_ = len(self._all)
+            counts = dict(self._counts)
+        idle = self._idle.qsize()
+        return {"size": self.size, "open": open_, "idle": idle, "in_use": open_ - idle, **counts}
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._all:
+                try:
+                    conn.close()
+                except pyodbc.Error:
+                    pass
+            self._all.clear()
+        while not self._idle.empty():
+            self._idle.get_nowait()
@@ -0,0 +1,68 @@
+# src/dedupe.py
+# RecordHash = SHA2_256 fingerprint of the raw bronze values, stored as BINARY(32).
+# silver.ems_clean and dw.FactEMS_Encounter both carry a UNIQUE index on it with IGNORE_DUP_KEY = ON
+# (see SQL's/DDL), so the NOT EXISTS checks below are index seeks and the index itself drops any
+# duplicate that slips through (same hash twice in one batch, or two writers racing).
+
+from .dialect import TSQL, DUCKDB
+
+# raw bronze columns that feed the hash, in hash order (don't reorder - it changes every hash)
+RECORD_HASH_COLUMNS = [
+    "INCIDENT_DT",
+    "INCIDENT_COUNTY",
+    "CHIEF_COMPLAINT_DISPATCH",
+    "CHIEF_COMPLAINT_ANATOMIC_LOC",
+    "PRIMARY_SYMPTOM",
+    "PROVIDER_IMPRESSION_PRIMARY",
+    "DISPOSITION_ED",
+    "DISPOSITION_HOSPITAL",
+    "DESTINATION_TYPE",
+    "PROVIDER_TYPE_STRUCTURE",
+    "PROVIDER_TYPE_SERVICE",
+    "PROVIDER_TYPE_SERVICE_LEVEL",
+    "PROVIDER_TO_SCENE_MINS",
+    "PROVIDER_TO_DESTINATION_MINS",
+    "UNIT_NOTIFIED_BY_DISPATCH_DT",
+    "UNIT_ARRIVED_ON_SCENE_DT",
+    "UNIT_ARRIVED_TO_PATIENT_DT",
+    "UNIT_LEFT_SCENE_DT",
+    "PATIENT_ARRIVED_DESTINATION_DT",
+    "INJURY_FLG",
+    "NALOXONE_GIVEN_FLG",
+    "MEDICATION_GIVEN_OTHER_FLG",
+]
+
+
+def record_hash_sql(alias: str = "b", dialect: str = TSQL) -> str:
+    """
+    SQL expression for the 32 byte RecordHash of one bronze row (aliased as `alias`).
+    - TSQL: HASHBYTES over the NVARCHAR (UTF-16) string, DUCKDB: sha256 over the UTF-8 string
+    - Same columns / separators / trimming in both, but the bytes hashed differ, so hashes only match within one engine
+    """
+    if dialect == DUCKDB:
+        parts = ", '|',\n        ".join(
+            f"coalesce(upper(trim({alias}.{col})), '')" for col in RECORD_HASH_COLUMNS
+        )
+        return f"unhex(sha256(concat(\n        {parts}\n    )))"
+
+    parts = ", '|',\n        ".join(
+        f"ISNULL(UPPER(LTRIM(RTRIM({alias}.{col}))), '')" for col in RECORD_HASH_COLUMNS
+    )
+    return f"CAST(HASHBYTES('SHA2_256', CONCAT(\n        {parts}\n    )) AS BINARY(32))"
+
+
+def not_exists_hash_sql(table: str, hash_expr: str, partition_expr: str | None = None) -> str:
+    """
+    NOT EXISTS predicate against a RecordHash-indexed table (seek on the UX_*_RecordHash index).
+    - partition_expr: the row's IncidentDateKey for the month-partitioned fact, so only that month's index partition is
+      searched instead of every one. Same answer: the hash covers INCIDENT_DT, so equal hashes have equal dates
+      (NULL dates never match here; UX_Fact_RecordHash ignores those duplicates on insert)
+    """
+    partition = f"\n        AND d.IncidentDateKey = {partition_expr}" if partition_expr else ""
+    return (
+        "NOT EXISTS (\n"
+        "      SELECT 1\n"
+        f"      FROM {table} d\n"
+        f"      WHERE d.RecordHash = {hash_expr}{partition}\n"
+        "  )"
+    )
@@ -0,0 +1,16 @@
+# src/dialect.py
+# SQL dialects the pipeline can run against.
+# - TSQL: SQL Server through pyodbc (default, what the DDLs in SQL's/DDL are for)
+# - DUCKDB: embedded DuckDB file (duckdb_backend.py); its connections/cursors carry a `dialect` attribute
+# Statements that aren't portable keep their T-SQL text where they are, the DuckDB text lives in duckdb_sql.py.
+
+TSQL = "tsql"
+DUCKDB = "duckdb"
+
+# --backend value -> dialect
+BACKENDS = {"sqlserver": TSQL, "duckdb": DUCKDB}
+
+
+def dialect_of(conn_or_cursor) -> str:
+    # plain pyodbc objects have no `dialect` attribute -> SQL Server
+    return getattr(conn_or_cursor, "dialect", TSQL)
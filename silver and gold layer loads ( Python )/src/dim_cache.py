@@ -0,0 +1,90 @@
+# src/dim_cache.py
+from dataclasses import dataclass
+
+from .db import pyodbc
+from .dialect import DUCKDB, dialect_of
+from . import duckdb_sql
+
+
+@dataclass(frozen=True)
+class DimSpec:
+    # one gold dimension: where it lives and which columns make up its natural key
+    table: str
+    key_col: str
+    nk_cols: tuple[str, ...]
+    current_filter: str = ""  # extra WHERE for SCD2-style dims (only current rows are joinable)
+
+
+# same dims (and same match rules) as the LEFT JOINs in gold._FACT_SQL
+DIMS = {
+    "county": DimSpec("dw.DimCounty", "CountyKey", ("CountyName",)),
+    "complaint": DimSpec("dw.DimComplaint", "ComplaintKey", ("ChiefComplaintDispatch", "ChiefComplaintAnatomicLoc")),
+    "symptom": DimSpec("dw.DimSymptom", "SymptomKey", ("PrimarySymptom", "ProviderImpressionPrimary")),
+    "provider": DimSpec(
+        "dw.DimProvider", "ProviderKey",
+        ("ProviderTypeStructure", "ProviderTypeService", "ProviderTypeServiceLevel"),
+        current_filter="IsCurrent = 1",
+    ),
+    "disposition": DimSpec("dw.DimDisposition", "DispositionKey", ("DispositionName",)),
+    "destination_type": DimSpec("dw.DimDestinationType", "DestinationTypeKey", ("DestinationTypeName",)),
+}
+
+
+def _nk(values) -> tuple[str, ...]:
+    # SQL side compares ISNULL(col,'') under a case-insensitive collation, so fold the same way here
+    return tuple((v or "").upper() for v in values)
+
+
+class DimKeyCache:
+    """
+    In-memory natural key -> surrogate key maps for the gold dims.
+    - Preloaded once per run (dims are small: hundreds to thousands of members)
+    - Misses on a non-empty natural key insert the member and cache the new key
+    - Empty natural keys resolve to the UNKNOWN key (same as the ISNULL(...) fallback in SQL)
+    """
+
+    def __init__(self, unknown_keys: dict[str, int]):
+        self.unknown_keys = unknown_keys
+        self.maps: dict[str, dict[tuple[str, ...], int]] = {name: {} for name in DIMS}
+        self.inserted = 0
+
+    def load(self, cur: pyodbc.Cursor) -> None:
+        for name, spec in DIMS.items():
+            where = f" WHERE {spec.current_filter}" if spec.current_filter else ""
+            cur.execute(f"SELECT {', '.join(spec.nk_cols)}, {spec.key_col} FROM {spec.table}{where};")
+            m = self.maps[name]
+            for row in cur.fetchall():
+                m[_nk(row[:-1])] = int(row[-1])
+
+    def reload(self, cur: pyodbc.Cursor) -> None:
+        # drop everything (members inserted by a rolled back slice included) and read the dims again
+        self.maps = {name: {} for name in DIMS}
+        self.load(cur)
+
+    def resolve(self, cur: pyodbc.Cursor, name: str, values) -> int:
+        nk = _nk(values)
+        if not any(nk):
+            return self.unknown_keys[name]
+
+        key = self.maps[name].get(nk)
+        if key is None:
+            key = self._insert_member(cur, name, values)
+            self.maps[name][nk] = key
+        return key
+
+    def _insert_member(self, cur: pyodbc.Cursor, name: str, values) -> int:
+        # new member seen mid-stream -> insert it (type 1 style) and hand back the surrogate key
+        spec = DIMS[name]
+        if dialect_of(cur) == DUCKDB:
+            cur.execute(duckdb_sql.insert_member_sql(spec.table, spec.key_col, spec.nk_cols), *values)
+        else:
+            cur.execute(
+                f"""
+                INSERT INTO {spec.table} ({', '.join(spec.nk_cols)})
+                OUTPUT INSERTED.{spec.key_col}
+                VALUES ({', '.join('?' for _ in spec.nk_cols)});
+                """,
+                *values
+            )
+        self.inserted += 1
+        return int(cur.fetchone()[0])
@@ -0,0 +1,301 @@
+# src/dq_profile.py
+# data-quality profile of the silver pass (--profile): per column null / blank / parse failure counts, flag value
+# histograms, min/max of dates and ints, approximate distinct counts of the text columns.
+# - Nothing extra is read from bronze: the stage step already knows per row which columns were blank or didn't convert,
+#   it keeps that as two bitmasks on the work set (BlankMask / ParseFailMask, one bit per PROFILE_COLUMNS entry)
+# - Per batch, one aggregate + one sketch query over the work set (#silver_batch / silver_batch), merged in memory
+# - Distinct counts are HyperLogLog sketches (2^SKETCH_BITS registers, ~6.5% standard error): registers merge by max,
+#   so batches, parallel ranges and reruns of the same RunId combine without keeping any values
+# - Written to etl.silver_profile when the silver step ends (one row per RunId + column, merged into what's there)
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable
+
+from .db import pyodbc
+from .dialect import TSQL, DUCKDB, dialect_of
+
+TEXT, DATE, INT, FLAG = "text", "date", "int", "flag"
+
+# silver column, bronze column, kind; the position is the column's bit in BlankMask / ParseFailMask (don't reorder)
+PROFILE_COLUMNS = [
+    ("IncidentDttm", "INCIDENT_DT", DATE),
+    ("IncidentCounty", "INCIDENT_COUNTY", TEXT),
+    ("ChiefComplaintDispatch", "CHIEF_COMPLAINT_DISPATCH", TEXT),
+    ("ChiefComplaintAnatomicLoc", "CHIEF_COMPLAINT_ANATOMIC_LOC", TEXT),
+    ("PrimarySymptom", "PRIMARY_SYMPTOM", TEXT),
+    ("ProviderImpressionPrimary", "PROVIDER_IMPRESSION_PRIMARY", TEXT),
+    ("DispositionED", "DISPOSITION_ED", TEXT),
+    ("DispositionHospital", "DISPOSITION_HOSPITAL", TEXT),
+    ("DestinationType", "DESTINATION_TYPE", TEXT),
+    ("ProviderTypeStructure", "PROVIDER_TYPE_STRUCTURE", TEXT),
+    ("ProviderTypeService", "PROVIDER_TYPE_SERVICE", TEXT),
+    ("ProviderTypeServiceLevel", "PROVIDER_TYPE_SERVICE_LEVEL", TEXT),
+    ("ProviderToSceneMins", "PROVIDER_TO_SCENE_MINS", INT),
+    ("ProviderToDestinationMins", "PROVIDER_TO_DESTINATION_MINS", INT),
+    ("UnitNotifiedByDispatchDttm", "UNIT_NOTIFIED_BY_DISPATCH_DT", DATE),
+    ("UnitArrivedOnSceneDttm", "UNIT_ARRIVED_ON_SCENE_DT", DATE),
+    ("UnitArrivedToPatientDttm", "UNIT_ARRIVED_TO_PATIENT_DT", DATE),
+    ("UnitLeftSceneDttm", "UNIT_LEFT_SCENE_DT", DATE),
+    ("PatientArrivedDestinationDttm", "PATIENT_ARRIVED_DESTINATION_DT", DATE),
+    ("InjuryFlg", "INJURY_FLG", FLAG),
+    ("NaloxoneGivenFlg", "NALOXONE_GIVEN_FLG", FLAG),
+    ("MedicationGivenOtherFlg", "MEDICATION_GIVEN_OTHER_FLG", FLAG),
+]
+
+FLAG_VALUES = ("Y", "N", "X")  # X = anything else (rejected)
+
+SKETCH_BITS = 8
+SKETCH_SIZE = 1 << SKETCH_BITS
+
+_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _trim(expr: str, dialect: str) -> str:
+    return f"trim({expr})" if dialect == DUCKDB else f"LTRIM(RTRIM({expr}))"
+
+
+def blank_mask_sql(raw: str, dialect: str = TSQL) -> str:
+    # bit set = the bronze value is there but only spaces (silver makes it NULL); raw = bronze row alias
+    terms = [
+        f"CASE WHEN {raw}.{src} IS NOT NULL AND {_trim(f'{raw}.{src}', dialect)} = '' THEN {1 << i} ELSE 0 END"
+        for i, (_, src, _) in enumerate(PROFILE_COLUMNS)
+    ]
+    return "(\n        " + "\n        + ".join(terms) + "\n    )"
+
+
+def parse_fail_mask_sql(raw: str, typed: Callable[[str], str], dialect: str = TSQL) -> str:
+    # bit set = the bronze value is there but didn't convert (date / int came out NULL, flag came out X)
+    # typed(silver column) = the converted value's expression in the same SELECT
+    terms = []
+    for i, (col, src, kind) in enumerate(PROFILE_COLUMNS):
+        if kind in (DATE, INT):
+            terms.append(f"CASE WHEN {_trim(f'{raw}.{src}', dialect)} <> '' AND {typed(col)} IS NULL THEN {1 << i} ELSE 0 END")
+        elif kind == FLAG:
+            terms.append(f"CASE WHEN {typed(col)} = 'X' THEN {1 << i} ELSE 0 END")
+    return "(\n        " + "\n        + ".join(terms) + "\n    )"
+
+
+def _stats_sql(table: str) -> str:
+    # one row per batch: row count, then per column nulls / blanks / parse failures (+ min, max or flag counts)
+    parts = ["COUNT(1)"]
+    for i, (col, _, kind) in enumerate(PROFILE_COLUMNS):
+        bit = 1 << i
+        parts += [
+            f"SUM(CASE WHEN t.{col} IS NULL AND (t.BlankMask & {bit}) = 0 AND (t.ParseFailMask & {bit}) = 0 THEN 1 ELSE 0 END)",
+            f"SUM(CASE WHEN (t.BlankMask & {bit}) <> 0 THEN 1 ELSE 0 END)",
+            f"SUM(CASE WHEN (t.ParseFailMask & {bit}) <> 0 THEN 1 ELSE 0 END)",
+        ]
+        if kind in (DATE, INT):
+            parts += [f"MIN(t.{col})", f"MAX(t.{col})"]
+        elif kind == FLAG:
+            parts += [f"SUM(CASE WHEN t.{col} = '{v}' THEN 1 ELSE 0 END)" for v in FLAG_VALUES]
+    return "SELECT\n    " + ",\n    ".join(parts) + f"\nFROM {table} t;"
+
+
+def _sketch_sql(table: str, dialect: str) -> str:
+    # HyperLogLog registers of the text columns: (column no, register, max rank) for every register that got a value
+    values = ", ".join(f"({i}, t.{col})" for i, (col, _, kind) in enumerate(PROFILE_COLUMNS) if kind == TEXT)
+    if dialect == DUCKDB:
+        # 64 bit hash: low SKETCH_BITS pick the register, rank = leading zeros of the other 56 bits + 1
+        return f"""
+SELECT c.ColumnNo, (hash(c.Val) & {SKETCH_SIZE - 1})::INTEGER AS Register,
+       max(CASE WHEN hash(c.Val) >> {SKETCH_BITS} = 0 THEN {65 - SKETCH_BITS}
+                ELSE {64 - SKETCH_BITS} - floor(log2(greatest(hash(c.Val) >> {SKETCH_BITS}, 1)::DOUBLE))::INTEGER END)
+FROM {table} t, LATERAL (VALUES {values}) c(ColumnNo, Val)
+WHERE c.Val IS NOT NULL
+GROUP BY ALL;
+"""
+    # MD5 of the value: first byte picks the register, rank = leading zeros of the next 32 bits + 1
+    return f"""
+SELECT c.ColumnNo, w.Register, MAX(ISNULL(32 - CAST(FLOOR(LOG(NULLIF(w.W, 0), 2)) AS INT), 33))
+FROM {table} t
+CROSS APPLY (VALUES {values}) c(ColumnNo, Val)
+CROSS APPLY (SELECT HASHBYTES('MD5', c.Val) AS H) x
+CROSS APPLY (SELECT CAST(SUBSTRING(x.H, 1, 1) AS INT) AS Register, CAST(SUBSTRING(x.H, 2, 4) AS BIGINT) AS W) w
+WHERE c.Val IS NOT NULL
+GROUP BY c.ColumnNo, w.Register;
+"""
+
+
+def hll_estimate(registers: bytes) -> int:
+    # HyperLogLog cardinality estimate (with the small range correction; the sketch is far from its 32 bit limit)
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / sum(2.0 ** -r for r in registers)
+    zeros = registers.count(0)
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * math.log(m / zeros)
+    return int(round(estimate))
+
+
+@dataclass
+class ColumnProfile:
+    # one column's counts for a batch, a run, or a stored row
+    column: str
+    kind: str
+    rows: int = 0
+    nulls: int = 0            # NULL in bronze
+    blanks: int = 0           # only spaces in bronze
+    parse_failures: int = 0   # there, but didn't convert (dates / ints / flags)
+    min_value: object = None  # dates / ints
+    max_value: object = None
+    values: dict[str, int] = field(default_factory=dict)  # flags: count per FLAG_VALUES
+    sketch: bytearray | None = None                        # text: HyperLogLog registers
+
+    def merge(self, other: "ColumnProfile") -> None:
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.blanks += other.blanks
+        self.parse_failures += other.parse_failures
+        if other.min_value is not None and (self.min_value is None or other.min_value < self.min_value):
+            self.min_value = other.min_value
+        if other.max_value is not None and (self.max_value is None or other.max_value > self.max_value):
+            self.max_value = other.max_value
+        for v, n in other.values.items():
+            self.values[v] = self.values.get(v, 0) + n
+        if other.sketch is not None:
+            if self.sketch is None:
+                self.sketch = bytearray(SKETCH_SIZE)
+            self.sketch[:] = bytes(max(a, b) for a, b in zip(self.sketch, other.sketch))
+
+    @property
+    def distinct_estimate(self) -> int | None:
+        return hll_estimate(self.sketch) if self.sketch is not None else None
+
+
+def _to_text(kind: str, value) -> str | None:
+    if value is None:
+        return None
+    return value.strftime(_DATE_FORMAT) if kind == DATE else str(value)
+
+
+def _from_text(kind: str, text: str | None):
+    if text is None:
+        return None
+    if kind == DATE:
+        return datetime.strptime(text, _DATE_FORMAT)
+    return int(text)
+
+
+_SELECT_SQL = """
+SELECT ColumnName, RowsProfiled, NullCount, BlankCount, ParseFailCount, MinValue, MaxValue, ValueCounts, Sketch
+FROM etl.silver_profile
+WHERE RunId = ?;
+"""
+
+_DELETE_SQL = "DELETE FROM etl.silver_profile WHERE RunId = ?;"
+
+_INSERT_SQL = """
+INSERT INTO etl.silver_profile (
+    RunId, ColumnName, ColumnKind, RowsProfiled, NullCount, BlankCount, ParseFailCount,
+    MinValue, MaxValue, ValueCounts, DistinctEstimate, Sketch
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+
+class SilverProfile:
+    """
+    Data-quality profile of one silver run, collected from the work set of every batch silver stages.
+    - read_batch(cur) right after a batch is staged (same session), add(batch) once the batch committed,
+      so a retried batch is only counted once
+    - flush(conn) merges the run's counts into etl.silver_profile (a resumed RunId adds to its earlier rows)
+    """
+
+    enabled = True
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.columns = {col: ColumnProfile(col, kind) for col, _, kind in PROFILE_COLUMNS}
+        self._pending = False
+
+    def read_batch(self, cur: pyodbc.Cursor) -> list[ColumnProfile]:
+        dialect = dialect_of(cur)
+        table = "silver_batch" if dialect == DUCKDB else "#silver_batch"
+        cur.execute(_stats_sql(table))
+        row = list(cur.fetchone())
+        rows = int(row.pop(0) or 0)
+
+        batch = []
+        for col, _, kind in PROFILE_COLUMNS:
+            p = ColumnProfile(col, kind, rows, int(row.pop(0) or 0), int(row.pop(0) or 0), int(row.pop(0) or 0))
+            if kind in (DATE, INT):
+                p.min_value, p.max_value = row.pop(0), row.pop(0)
+            elif kind == FLAG:
+                p.values = {v: int(row.pop(0) or 0) for v in FLAG_VALUES}
+            elif rows:
+                p.sketch = bytearray(SKETCH_SIZE)
+            batch.append(p)
+
+        if rows:
+            cur.execute(_sketch_sql(table, dialect))
+            for column_no, register, rank in cur.fetchall():
+                batch[column_no].sketch[register] = max(batch[column_no].sketch[register], int(rank))
+        return batch
+
+    def add(self, batch: list[ColumnProfile] | None) -> None:
+        if not batch:
+            return
+        for p in batch:
+            self.columns[p.column].merge(p)
+        self._pending = True
+
+    def flush(self, conn: pyodbc.Connection) -> None:
+        if not self._pending:
+            return
+        self._pending = False
+
+        cur = conn.cursor()
+        if dialect_of(conn) != DUCKDB:  # the duckdb schema always has it
+            cur.execute("SELECT OBJECT_ID('etl.silver_profile', 'U');")
+            if cur.fetchone()[0] is None:
+                return  # profile table not deployed (see SQL's/DDL/silver_profile)
+
+        # merge with what earlier attempts of this RunId stored, then replace those rows
+        merged = {col: ColumnProfile(col, kind) for col, _, kind in PROFILE_COLUMNS}
+        cur.execute(_SELECT_SQL, self.run_id)
+        for name, rows, nulls, blanks, fails, lo, hi, counts, sketch in cur.fetchall():
+            if name not in merged:
+                continue
+            kind = merged[name].kind
+            merged[name].merge(ColumnProfile(
+                name, kind, int(rows), int(nulls), int(blanks), int(fails), _from_text(kind, lo), _from_text(kind, hi),
+                {v: int(n) for v, n in (pair.split("=") for pair in counts.split(","))} if counts else {},
+                bytearray(sketch) if sketch is not None else None,
+            ))
+        for col, p in self.columns.items():
+            merged[col].merge(p)
+
+        cur.execute(_DELETE_SQL, self.run_id)
+        cur.executemany(_INSERT_SQL, [
+            (
+                self.run_id, p.column, p.kind, p.rows, p.nulls, p.blanks, p.parse_failures,
+                _to_text(p.kind, p.min_value), _to_text(p.kind, p.max_value),
+                ",".join(f"{v}={n}" for v, n in p.values.items()) or None,
+                p.distinct_estimate, bytes(p.sketch) if p.sketch is not None else None,
+            )
+            for p in merged.values()
+        ])
+        conn.commit()
+
+        # what's stored now includes this run's counts
+        self.columns = {col: ColumnProfile(col, kind) for col, _, kind in PROFILE_COLUMNS}
+
+
+class _NullProfile:
+    # --profile off: nothing is read or written
+
+    enabled = False
+
+    def read_batch(self, cur: pyodbc.Cursor) -> None:
+        return None
+
+    def add(self, batch) -> None:
+        pass
+
+    def flush(self, conn: pyodbc.Connection) -> None:
+        pass
+
+
+NULL_PROFILE = _NullProfile()
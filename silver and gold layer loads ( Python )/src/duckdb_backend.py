@@ -0,0 +1,490 @@
+# src/duckdb_backend.py
+# --backend duckdb: the whole pipeline in-process on an embedded DuckDB file (dev, CI, local gold rebuilds).
+# DuckDB is only imported here, and only when this backend is used (pip install duckdb).
+from collections import namedtuple
+
+from .db import pyodbc
+
+from .bronze import BRONZE_COLUMNS
+from .dialect import DUCKDB
+from .duckdb_sql import SILVER_COLUMNS, UTC_NOW
+from .watermark import set_last_bronze_id, GOLD_PIPELINE_NAME, GOLD_DIMS_PIPELINE_NAME
+from .daily_summary import reset_summary
+
+# same tables as SQL's/DDL, DuckDB types. no indexes / FKs (columnar scans + hash joins),
+# identities are sequences, persisted computed columns are generated (virtual) columns
+SCHEMA_SQL = f"""
+CREATE SCHEMA IF NOT EXISTS bronze;
+CREATE SCHEMA IF NOT EXISTS silver;
+CREATE SCHEMA IF NOT EXISTS etl;
+CREATE SCHEMA IF NOT EXISTS dw;
+
+CREATE SEQUENCE IF NOT EXISTS bronze.seq_bronze_id;
+CREATE SEQUENCE IF NOT EXISTS silver.seq_silver_id;
+CREATE SEQUENCE IF NOT EXISTS silver.seq_reject_id;
+CREATE SEQUENCE IF NOT EXISTS etl.seq_step_log_id;
+CREATE SEQUENCE IF NOT EXISTS etl.seq_metric_id;
+CREATE SEQUENCE IF NOT EXISTS etl.seq_batch_size_id;
+CREATE SEQUENCE IF NOT EXISTS dw.seq_dim_key;
+CREATE SEQUENCE IF NOT EXISTS dw.seq_encounter_key;
+
+CREATE TABLE IF NOT EXISTS bronze.ems_raw (
+    BronzeId     BIGINT NOT NULL DEFAULT nextval('bronze.seq_bronze_id'),
+    RunId        VARCHAR NOT NULL,
+    FileName     VARCHAR NOT NULL,
+    LoadUtc      TIMESTAMP NOT NULL DEFAULT {UTC_NOW},
+    SourceRowNum BIGINT NOT NULL,
+    {', '.join(f'{c} VARCHAR' for c in BRONZE_COLUMNS)}
+);
+
+CREATE TABLE IF NOT EXISTS silver.ems_clean (
+    SilverId     BIGINT NOT NULL DEFAULT nextval('silver.seq_silver_id'),
+    RunId        VARCHAR NOT NULL,
+    FileName     VARCHAR NOT NULL,
+    LoadUtc      TIMESTAMP NOT NULL DEFAULT {UTC_NOW},
+    SourceRowNum BIGINT NOT NULL,
+
+    IncidentDttm TIMESTAMP,
+    IncidentDate DATE GENERATED ALWAYS AS (CAST(IncidentDttm AS DATE)) VIRTUAL,
+    IncidentCounty VARCHAR,
+
+    ChiefComplaintDispatch    VARCHAR,
+    ChiefComplaintAnatomicLoc VARCHAR,
+    PrimarySymptom            VARCHAR,
+    ProviderImpressionPrimary VARCHAR,
+
+    DispositionED       VARCHAR,
+    DispositionHospital VARCHAR,
+    DestinationType     VARCHAR,
+
+    ProviderTypeStructure    VARCHAR,
+    ProviderTypeService      VARCHAR,
+    ProviderTypeServiceLevel VARCHAR,
+
+    ProviderToSceneMins       INTEGER,
+    ProviderToDestinationMins INTEGER,
+
+    UnitNotifiedByDispatchDttm    TIMESTAMP,
+    UnitArrivedOnSceneDttm        TIMESTAMP,
+    UnitArrivedToPatientDttm      TIMESTAMP,
+    UnitLeftSceneDttm             TIMESTAMP,
+    PatientArrivedDestinationDttm TIMESTAMP,
+
+    IncidentDateKey           INTEGER GENERATED ALWAYS AS (year(IncidentDttm) * 10000 + month(IncidentDttm) * 100 + day(IncidentDttm)) VIRTUAL,
+    UnitNotifiedDateKey       INTEGER GENERATED ALWAYS AS (year(UnitNotifiedByDispatchDttm) * 10000 + month(UnitNotifiedByDispatchDttm) * 100 + day(UnitNotifiedByDispatchDttm)) VIRTUAL,
+    ArrivedSceneDateKey       INTEGER GENERATED ALWAYS AS (year(UnitArrivedOnSceneDttm) * 10000 + month(UnitArrivedOnSceneDttm) * 100 + day(UnitArrivedOnSceneDttm)) VIRTUAL,
+    ArrivedPatientDateKey     INTEGER GENERATED ALWAYS AS (year(UnitArrivedToPatientDttm) * 10000 + month(UnitArrivedToPatientDttm) * 100 + day(UnitArrivedToPatientDttm)) VIRTUAL,
+    LeftSceneDateKey          INTEGER GENERATED ALWAYS AS (year(UnitLeftSceneDttm) * 10000 + month(UnitLeftSceneDttm) * 100 + day(UnitLeftSceneDttm)) VIRTUAL,
+    ArrivedDestinationDateKey INTEGER GENERATED ALWAYS AS (year(PatientArrivedDestinationDttm) * 10000 + month(PatientArrivedDestinationDttm) * 100 + day(PatientArrivedDestinationDttm)) VIRTUAL,
+
+    InjuryFlg               VARCHAR,
+    NaloxoneGivenFlg        VARCHAR,
+    MedicationGivenOtherFlg VARCHAR,
+
+    RecordHash BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS silver.ems_reject (
+    RejectId     BIGINT NOT NULL DEFAULT nextval('silver.seq_reject_id'),
+    RunId        VARCHAR NOT NULL,
+    FileName     VARCHAR NOT NULL,
+    SourceRowNum BIGINT NOT NULL,
+    ErrorType    VARCHAR NOT NULL,
+    ErrorMessage VARCHAR,
+    RejectedUtc  TIMESTAMP NOT NULL DEFAULT {UTC_NOW}
+);
+
+CREATE TABLE IF NOT EXISTS etl.run_audit (
+    RunId        VARCHAR NOT NULL PRIMARY KEY,
+    StartedUtc   TIMESTAMP NOT NULL DEFAULT {UTC_NOW},
+    EndedUtc     TIMESTAMP,
+    Status       VARCHAR NOT NULL DEFAULT 'RUNNING',
+    FileName     VARCHAR NOT NULL,
+    RowsBronze   BIGINT,
+    RowsRejected BIGINT,
+    ErrorMessage VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS etl.run_step_log (
+    StepLogId    BIGINT NOT NULL DEFAULT nextval('etl.seq_step_log_id') PRIMARY KEY,
+    RunId        VARCHAR NOT NULL,
+    StepName     VARCHAR NOT NULL,
+    StartedUtc   TIMESTAMP NOT NULL DEFAULT {UTC_NOW},
+    EndedUtc     TIMESTAMP,
+    Status       VARCHAR NOT NULL,
+    RowsIn       BIGINT,
+    RowsOut      BIGINT,
+    RowsReject   BIGINT,
+    ErrorMessage VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS etl.watermark (
+    PipelineName VARCHAR NOT NULL PRIMARY KEY,
+    LastBronzeId BIGINT NOT NULL,
+    UpdatedUtc   TIMESTAMP NOT NULL DEFAULT {UTC_NOW}
+);
+
+CREATE TABLE IF NOT EXISTS etl.run_step_metric (
+    MetricId      BIGINT NOT NULL DEFAULT nextval('etl.seq_metric_id'),
+    RunId         VARCHAR NOT NULL,
+    StepName      VARCHAR NOT NULL,
+    StatementName VARCHAR NOT NULL,
+    LowId         BIGINT,
+    HighId        BIGINT,
+    StartedUtc    TIMESTAMP NOT NULL,
+    DurationMs    DECIMAL(18,3) NOT NULL,
+    RowsAffected  BIGINT,
+    RowsPerSec    DECIMAL(18,1)
+);
+
+CREATE TABLE IF NOT EXISTS etl.run_batch_size (
+    DecisionId    BIGINT NOT NULL DEFAULT nextval('etl.seq_batch_size_id'),
+    RunId         VARCHAR NOT NULL,
+    StepName      VARCHAR NOT NULL,
+    BatchNo       INTEGER NOT NULL,
+    LowId         BIGINT NOT NULL,
+    HighId        BIGINT NOT NULL,
+    BatchSize     INTEGER NOT NULL,
+    RowsIn        BIGINT NOT NULL,
+    DurationMs    DECIMAL(18,3) NOT NULL,
+    RowsPerSec    DECIMAL(18,1),
+    NextBatchSize INTEGER NOT NULL,
+    Reason        VARCHAR NOT NULL,
+    DecidedUtc    TIMESTAMP NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS etl.silver_profile (
+    RunId            VARCHAR NOT NULL,
+    ColumnName       VARCHAR NOT NULL,
+    ColumnKind       VARCHAR NOT NULL,
+    RowsProfiled     BIGINT NOT NULL,
+    NullCount        BIGINT NOT NULL,
+    BlankCount       BIGINT NOT NULL,
+    ParseFailCount   BIGINT NOT NULL,
+    MinValue         VARCHAR,
+    MaxValue         VARCHAR,
+    ValueCounts      VARCHAR,
+    DistinctEstimate BIGINT,
+    Sketch           BLOB,
+    UpdatedUtc       TIMESTAMP NOT NULL DEFAULT {UTC_NOW},
+    PRIMARY KEY (RunId, ColumnName)
+);
+
+CREATE TABLE IF NOT EXISTS dw.DimDate (
+    DateKey       INTEGER NOT NULL PRIMARY KEY,
+    FullDate      DATE NOT NULL,
+    "Year"        INTEGER NOT NULL,
+    "Quarter"     INTEGER NOT NULL,
+    "Month"       INTEGER NOT NULL,
+    "Day"         INTEGER NOT NULL,
+    DayOfWeek     INTEGER NOT NULL,
+    DayName       VARCHAR NOT NULL,
+    MonthName     VARCHAR NOT NULL,
+    IsWeekend     INTEGER NOT NULL,
+    IsoYear       INTEGER NOT NULL,
+    IsoWeek       INTEGER NOT NULL,
+    FiscalYear    INTEGER NOT NULL,
+    FiscalQuarter INTEGER NOT NULL,
+    FiscalMonth   INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS dw.DimCounty (
+    CountyKey   INTEGER NOT NULL DEFAULT nextval('dw.seq_dim_key') PRIMARY KEY,
+    CountyName  VARCHAR NOT NULL,
+    UnknownFlag INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS dw.DimComplaint (
+    ComplaintKey              INTEGER NOT NULL DEFAULT nextval('dw.seq_dim_key') PRIMARY KEY,
+    ChiefComplaintDispatch    VARCHAR,
+    ChiefComplaintAnatomicLoc VARCHAR,
+    UnknownFlag               INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS dw.DimSymptom (
+    SymptomKey                INTEGER NOT NULL DEFAULT nextval('dw.seq_dim_key') PRIMARY KEY,
+    PrimarySymptom            VARCHAR,
+    ProviderImpressionPrimary VARCHAR,
+    UnknownFlag               INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS dw.DimProvider (
+    ProviderKey              INTEGER NOT NULL DEFAULT nextval('dw.seq_dim_key') PRIMARY KEY,
+    ProviderTypeStructure    VARCHAR,
+    ProviderTypeService      VARCHAR,
+    ProviderTypeServiceLevel VARCHAR,
+    EffectiveStart           DATE NOT NULL DEFAULT DATE '1900-01-01',
+    EffectiveEnd             DATE NOT NULL DEFAULT DATE '9999-12-31',
+    IsCurrent                INTEGER NOT NULL DEFAULT 1,
+    UnknownFlag              INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS dw.DimDisposition (
+    DispositionKey  INTEGER NOT NULL DEFAULT nextval('dw.seq_dim_key') PRIMARY KEY,
+    DispositionName VARCHAR NOT NULL,
+    UnknownFlag     INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS dw.DimDestinationType (
+    DestinationTypeKey  INTEGER NOT NULL DEFAULT nextval('dw.seq_dim_key') PRIMARY KEY,
+    DestinationTypeName VARCHAR NOT NULL,
+    UnknownFlag         INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS dw.FactEMS_Encounter (
+    EncounterKey BIGINT NOT NULL DEFAULT nextval('dw.seq_encounter_key'),
+
+    IncidentDateKey           INTEGER,
+    UnitNotifiedDateKey       INTEGER,
+    ArrivedSceneDateKey       INTEGER,
+    ArrivedPatientDateKey     INTEGER,
+    LeftSceneDateKey          INTEGER,
+    ArrivedDestinationDateKey INTEGER,
+
+    CountyKey              INTEGER NOT NULL,
+    ComplaintKey           INTEGER NOT NULL,
+    SymptomKey             INTEGER NOT NULL,
+    ProviderKey            INTEGER NOT NULL,
+    DispositionEDKey       INTEGER NOT NULL,
+    DispositionHospitalKey INTEGER NOT NULL,
+    DestinationTypeKey     INTEGER NOT NULL,
+
+    ProviderToSceneMins       INTEGER,
+    ProviderToDestinationMins INTEGER,
+    InjuryFlg                 VARCHAR,
+    NaloxoneGivenFlg          VARCHAR,
+    MedicationGivenOtherFlg   VARCHAR,
+
+    RunId           VARCHAR NOT NULL,
+    FileName        VARCHAR NOT NULL,
+    SourceRowNumber BIGINT NOT NULL,
+    RecordHash      BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS dw.ems_daily_summary (
+    IncidentDate   DATE NOT NULL,
+    IncidentCounty VARCHAR NOT NULL,
+    RunId          VARCHAR NOT NULL,
+    LoadUtc        TIMESTAMP NOT NULL DEFAULT {UTC_NOW},
+
+    TotalIncidents BIGINT NOT NULL DEFAULT 0,
+    InjuryYes      BIGINT NOT NULL DEFAULT 0,
+    NaloxoneYes    BIGINT NOT NULL DEFAULT 0,
+    MedicationYes  BIGINT NOT NULL DEFAULT 0,
+
+    SceneMinsSum   BIGINT NOT NULL DEFAULT 0,
+    SceneMinsCount BIGINT NOT NULL DEFAULT 0,
+    SceneMinsMin   INTEGER,
+    SceneMinsMax   INTEGER,
+
+    DestinationMinsSum   BIGINT NOT NULL DEFAULT 0,
+    DestinationMinsCount BIGINT NOT NULL DEFAULT 0,
+    DestinationMinsMin   INTEGER,
+    DestinationMinsMax   INTEGER,
+
+    RejectCount BIGINT NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (IncidentDate, IncidentCounty)
+);
+
+-- UNKNOWN members (same seeds as the SQL Server DDL)
+INSERT INTO dw.DimCounty (CountyName, UnknownFlag)
+SELECT 'UNKNOWN', 1 WHERE NOT EXISTS (SELECT 1 FROM dw.DimCounty WHERE UnknownFlag = 1);
+INSERT INTO dw.DimDisposition (DispositionName, UnknownFlag)
+SELECT 'UNKNOWN', 1 WHERE NOT EXISTS (SELECT 1 FROM dw.DimDisposition WHERE UnknownFlag = 1);
+INSERT INTO dw.DimDestinationType (DestinationTypeName, UnknownFlag)
+SELECT 'UNKNOWN', 1 WHERE NOT EXISTS (SELECT 1 FROM dw.DimDestinationType WHERE UnknownFlag = 1);
+INSERT INTO dw.DimComplaint (ChiefComplaintDispatch, ChiefComplaintAnatomicLoc, UnknownFlag)
+SELECT 'UNKNOWN', 'UNKNOWN', 1 WHERE NOT EXISTS (SELECT 1 FROM dw.DimComplaint WHERE UnknownFlag = 1);
+INSERT INTO dw.DimSymptom (PrimarySymptom, ProviderImpressionPrimary, UnknownFlag)
+SELECT 'UNKNOWN', 'UNKNOWN', 1 WHERE NOT EXISTS (SELECT 1 FROM dw.DimSymptom WHERE UnknownFlag = 1);
+INSERT INTO dw.DimProvider (ProviderTypeStructure, ProviderTypeService, ProviderTypeServiceLevel, UnknownFlag)
+SELECT 'UNKNOWN', 'UNKNOWN', 'UNKNOWN', 1 WHERE NOT EXISTS (SELECT 1 FROM dw.DimProvider WHERE UnknownFlag = 1);
+"""
+
+
+def _error(ex: Exception) -> pyodbc.Error:
+    # surface DuckDB errors as pyodbc.Error so the pipeline's existing error handling applies unchanged
+    return pyodbc.Error("HY000", f"[duckdb] {ex}")
+
+
+class DuckDBCursor:
+    """
+    The slice of the pyodbc cursor API the pipeline uses, on top of a shared DuckDB connection.
+    - execute(sql, *params) / executemany / fetchone / fetchall, rows with attribute access like pyodbc.Row
+    - Results are fetched right away (cursors share one DuckDB connection, so a pending result would be clobbered)
+    - fast_executemany / setinputsizes are accepted and ignored
+    """
+
+    dialect = DUCKDB
+
+    def __init__(self, conn: "DuckDBConnection"):
+        self.connection = conn
+        self.fast_executemany = False
+        self.rowcount = -1
+        self.description = None
+        self._rows: list = []
+
+    def setinputsizes(self, sizes) -> None:
+        pass
+
+    def execute(self, sql: str, *params) -> "DuckDBCursor":
+        if len(params) == 1 and isinstance(params[0], (list, tuple)):
+            params = params[0]  # pyodbc also takes one sequence of params
+        con = self.connection.raw
+        try:
+            con.execute(sql, list(params)) if params else con.execute(sql)
+            self.description = con.description
+            rows = con.fetchall() if self.description else []
+        except self.connection.errors as ex:
+            raise _error(ex) from ex
+
+        if self.description:
+            row_type = namedtuple("Row", [d[0] for d in self.description], rename=True)
+            rows = [row_type(*r) for r in rows]
+        self._rows = rows
+        return self
+
+    def executemany(self, sql: str, seq_of_params) -> None:
+        try:
+            self.connection.raw.executemany(sql, [list(p) for p in seq_of_params])
+        except self.connection.errors as ex:
+            raise _error(ex) from ex
+        self.description = None
+        self._rows = []
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self) -> list:
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self) -> None:
+        self._rows = []
+
+
+class DuckDBConnection:
+    """
+    pyodbc-like connection on a DuckDB database file (autocommit off: there's always an open transaction,
+    commit()/rollback() end it and start the next one, same as pyodbc with autocommit=False).
+    """
+
+    dialect = DUCKDB
+
+    def __init__(self, path: str):
+        import duckdb  # optional dependency, only for --backend duckdb
+
+        self.path = path
+        self.errors = duckdb.Error
+        try:
+            self.raw = duckdb.connect(path)
+            self.raw.execute("BEGIN TRANSACTION;")
+        except duckdb.Error as ex:
+            raise _error(ex) from ex
+
+    def cursor(self) -> DuckDBCursor:
+        return DuckDBCursor(self)
+
+    def commit(self) -> None:
+        try:
+            self.raw.execute("COMMIT;")
+            self.raw.execute("BEGIN TRANSACTION;")
+        except self.errors as ex:
+            raise _error(ex) from ex
+
+    def rollback(self) -> None:
+        try:
+            self.raw.execute("ROLLBACK;")
+        except self.errors:
+            pass  # nothing open (an error already aborted it)
+        self.raw.execute("BEGIN TRANSACTION;")
+
+    def close(self) -> None:
+        try:
+            self.raw.execute("ROLLBACK;")
+        except self.errors:
+            pass
+        self.raw.close()
+
+
+def connect(path: str) -> DuckDBConnection:
+    """Open (or create) the DuckDB file and make sure the ems schema exists."""
+    conn = DuckDBConnection(path)
+    conn.cursor().execute(SCHEMA_SQL)
+    conn.commit()
+    return conn
+
+
+def _literal(value: str) -> str:
+    # table functions take the file path as a literal
+    return "'" + value.replace("'", "''") + "'"
+
+
+def load_csv(conn: DuckDBConnection, run_id: str, path: str, file_name: str) -> int:
+    """
+    Bronze load for this backend: DuckDB reads the CSV itself (all columns as text) instead of the
+    row-by-row executemany. SourceRowNum = 1-based data row, same as bronze.read_chunks. Returns rows loaded.
+    """
+    cur = conn.cursor()
+    cur.execute(f"""
+        CREATE OR REPLACE TEMP TABLE bronze_file AS
+        SELECT * FROM read_csv({_literal(path)}, header = true, all_varchar = true, normalize_names = false);
+    """)
+    cur.execute("DESCRIBE bronze_file;")
+    have = {r[0].strip().upper(): r[0] for r in cur.fetchall()}
+    missing = [c for c in BRONZE_COLUMNS if c not in have]
+    if missing:
+        raise ValueError(f"CSV is missing bronze columns: {', '.join(missing)}")
+
+    select = ", ".join(f'"{have[c]}"' for c in BRONZE_COLUMNS)
+    cur.execute(f"""
+        INSERT INTO bronze.ems_raw (RunId, FileName, SourceRowNum, {', '.join(BRONZE_COLUMNS)})
+        SELECT ?, ?, rowid + 1, {select}
+        FROM bronze_file
+        ORDER BY rowid;
+    """, run_id, file_name)
+    rows = int(cur.fetchone()[0])
+    cur.execute("DROP TABLE bronze_file;")
+    return rows
+
+
+def import_bronze(conn: DuckDBConnection, path: str) -> int:
+    """
+    Put the rows of one bronze archive file (bronze_archive.py) back into bronze.ems_raw with their original BronzeIds.
+    Rows whose BronzeId is still in bronze are skipped. Caller commits. Returns rows inserted.
+    """
+    cols = ", ".join(["BronzeId", "RunId", "FileName", "LoadUtc", "SourceRowNum"] + BRONZE_COLUMNS)
+    cur = conn.cursor()
+    cur.execute(f"""
+        INSERT INTO bronze.ems_raw ({cols})
+        SELECT {cols}
+        FROM read_parquet({_literal(path)}) p
+        WHERE NOT EXISTS (SELECT 1 FROM bronze.ems_raw b WHERE b.BronzeId = p.BronzeId)
+        ORDER BY BronzeId;
+    """)
+    return int(cur.fetchone()[0])
+
+
+def import_silver(conn: DuckDBConnection, path: str) -> int:
+    """
+    Replace silver.ems_clean with an exported silver table (Parquet, same column names as SQL Server),
+    so gold can be rebuilt locally. SilverIds are reassigned in the export's SilverId order and the gold
+    watermark goes back to 0 and the daily summary is emptied (run gold with --full-refresh next). Returns rows imported.
+    """
+    cols = ", ".join(SILVER_COLUMNS)
+    cur = conn.cursor()
+    cur.execute("DELETE FROM silver.ems_clean;")
+    cur.execute(f"""
+        INSERT INTO silver.ems_clean ({cols})
+        SELECT {cols}
+        FROM read_parquet({_literal(path)})
+        ORDER BY SilverId;
+    """)
+    rows = int(cur.fetchone()[0])
+    conn.commit()
+
+    set_last_bronze_id(conn, 0, GOLD_PIPELINE_NAME)
+    set_last_bronze_id(conn, 0, GOLD_DIMS_PIPELINE_NAME)
+    reset_summary(conn)
+    return rows
@@ -0,0 +1,544 @@
+# src/duckdb_sql.py
+# DuckDB versions of the statements that aren't portable T-SQL (temp tables, TOP, CROSS APPLY, MERGE, OUTPUT,
+# IF OBJECT_ID, HASHBYTES, ...). Same names / params / result shapes as the T-SQL they replace, so the
+# modules only pick the text (see dialect.py).
+#
+# Differences on purpose:
+# - no NkHash columns: dims and fact joins match on the normalized natural key itself (upper + '' for NULL,
+#   like the case-insensitive SQL Server collation), which DuckDB does as a hash join anyway
+# - no unique indexes: dedupe within a batch is done in the statement (QUALIFY / DISTINCT ON)
+from .dedupe import record_hash_sql, not_exists_hash_sql
+from .dialect import DUCKDB
+from .dq_profile import PROFILE_COLUMNS, TEXT, DATE, INT, FLAG, blank_mask_sql, parse_fail_mask_sql
+
+UTC_NOW = "timezone('UTC', now())"
+
+# --------------------------
+# etl.* (watermark.py, step_log.py, run_audit.py)
+# --------------------------
+WATERMARK_TABLE_SQL = f"""
+CREATE SCHEMA IF NOT EXISTS etl;
+CREATE TABLE IF NOT EXISTS etl.watermark (
+    PipelineName VARCHAR NOT NULL PRIMARY KEY,
+    LastBronzeId BIGINT NOT NULL,
+    UpdatedUtc   TIMESTAMP NOT NULL DEFAULT {UTC_NOW}
+);
+"""
+
+SET_WATERMARK_SQL = f"""
+INSERT INTO etl.watermark (PipelineName, LastBronzeId)
+VALUES (?, ?)
+ON CONFLICT (PipelineName) DO UPDATE SET LastBronzeId = excluded.LastBronzeId, UpdatedUtc = {UTC_NOW};
+"""
+
+START_STEP_SQL = """
+INSERT INTO etl.run_step_log (RunId, StepName, Status)
+VALUES (?, ?, 'STARTED')
+RETURNING StepLogId;
+"""
+
+END_STEP_SQL = f"""
+UPDATE etl.run_step_log
+SET EndedUtc = {UTC_NOW},
+    Status = ?,
+    RowsIn = ?,
+    RowsOut = ?,
+    RowsReject = ?,
+    ErrorMessage = ?
+WHERE StepLogId = ?;
+"""
+
+START_RUN_SQL = f"""
+INSERT INTO etl.run_audit (RunId, StartedUtc, Status, FileName)
+VALUES (CAST(CAST(? AS UUID) AS VARCHAR), {UTC_NOW}, 'RUNNING', ?);
+"""
+
+END_RUN_SQL = f"""
+UPDATE etl.run_audit
+SET EndedUtc = {UTC_NOW},
+    Status = ?,
+    RowsBronze = ?,
+    ErrorMessage = ?
+WHERE RunId = CAST(CAST(? AS UUID) AS VARCHAR);  -- stored the way start_run normalized it
+"""
+
+RUN_STATUS_SQL = """
+SELECT Status FROM etl.run_audit WHERE RunId = CAST(CAST(? AS UUID) AS VARCHAR);
+"""
+
+# --------------------------
+# silver.py: work set is a session temp table (silver_batch)
+# --------------------------
+CREATE_STAGE_SQL = """
+CREATE OR REPLACE TEMP TABLE silver_batch (
+    BronzeId     BIGINT  NOT NULL,
+    RunId        VARCHAR NOT NULL,
+    FileName     VARCHAR NOT NULL,
+    SourceRowNum BIGINT  NOT NULL,
+
+    IncidentDttm   TIMESTAMP,
+    IncidentCounty VARCHAR,
+
+    ChiefComplaintDispatch    VARCHAR,
+    ChiefComplaintAnatomicLoc VARCHAR,
+    PrimarySymptom            VARCHAR,
+    ProviderImpressionPrimary VARCHAR,
+
+    DispositionED       VARCHAR,
+    DispositionHospital VARCHAR,
+    DestinationType     VARCHAR,
+
+    ProviderTypeStructure    VARCHAR,
+    ProviderTypeService      VARCHAR,
+    ProviderTypeServiceLevel VARCHAR,
+
+    ProviderToSceneMins       INTEGER,
+    ProviderToDestinationMins INTEGER,
+
+    UnitNotifiedByDispatchDttm    TIMESTAMP,
+    UnitArrivedOnSceneDttm        TIMESTAMP,
+    UnitArrivedToPatientDttm      TIMESTAMP,
+    UnitLeftSceneDttm             TIMESTAMP,
+    PatientArrivedDestinationDttm TIMESTAMP,
+
+    InjuryFlg               VARCHAR,  -- Y/N/X (X = invalid, gets rejected)
+    NaloxoneGivenFlg        VARCHAR,
+    MedicationGivenOtherFlg VARCHAR,
+
+    RecordHash BLOB NOT NULL,
+    BlankMask     INTEGER NOT NULL,  -- per column bit (dq_profile.PROFILE_COLUMNS): bronze value was only spaces
+    ParseFailMask INTEGER NOT NULL,  -- per column bit: bronze value didn't convert (date / int / flag)
+    ErrorType  VARCHAR               -- NULL = clean row
+);
+"""
+
+DROP_STAGE_SQL = "DROP TABLE IF EXISTS silver_batch;"
+
+TRUNCATE_STAGE_SQL = "TRUNCATE silver_batch;"
+
+
+def _text(col: str) -> str:
+    return f"NULLIF(trim(b.{col}), '')"
+
+
+def _dttm(col: str) -> str:
+    # ISO first (what TRY_CONVERT reads everywhere), then the US formats SQL Server also takes with us_english
+    return (
+        f"coalesce(TRY_CAST({_text(col)} AS TIMESTAMP), "
+        f"try_strptime({_text(col)}, ['%m/%d/%Y %I:%M:%S %p', '%m/%d/%Y %I:%M %p', '%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M', '%m/%d/%Y']))"
+    )
+
+
+def _int(col: str) -> str:
+    return f"TRY_CAST({_text(col)} AS INTEGER)"
+
+
+def _flag(col: str) -> str:
+    return (
+        f"CASE WHEN upper(trim(b.{col})) IN ('Y','YES','1','TRUE','T') THEN 'Y' "
+        f"WHEN upper(trim(b.{col})) IN ('N','NO','0','FALSE','F') THEN 'N' "
+        f"WHEN {_text(col)} IS NULL THEN NULL "
+        f"ELSE 'X' END"
+    )
+
+
+# converted value per silver column, for the ParseFailMask (same expressions as the SELECT below)
+_TYPED = {
+    col: {DATE: _dttm, INT: _int, FLAG: _flag, TEXT: _text}[kind](src)
+    for col, src, kind in PROFILE_COLUMNS
+}
+
+# params ($n so the order matches silver._STAGE_SQL): $1 batch_size, $2 last_bronze_id, $3 upper BronzeId bound
+STAGE_SQL = f"""
+INSERT INTO silver_batch
+SELECT
+    v.*,
+    -- first failing rule wins (same order as the T-SQL stage)
+    CASE
+        WHEN v.IncidentDttm IS NULL THEN 'INVALID_INCIDENT_DT'
+        WHEN v.IncidentCounty IS NULL THEN 'MISSING_COUNTY'
+        WHEN v.InjuryFlg = 'X' THEN 'INVALID_INJURY_FLG'
+        WHEN v.NaloxoneGivenFlg = 'X' THEN 'INVALID_NALOXONE_FLG'
+        WHEN v.MedicationGivenOtherFlg = 'X' THEN 'INVALID_MED_GIVEN_FLG'
+        ELSE NULL
+    END AS ErrorType
+FROM (
+    SELECT
+        b.BronzeId,
+        b.RunId,
+        b.FileName,
+        b.SourceRowNum,
+
+        {_dttm("INCIDENT_DT")} AS IncidentDttm,
+        {_text("INCIDENT_COUNTY")} AS IncidentCounty,
+
+        {_text("CHIEF_COMPLAINT_DISPATCH")} AS ChiefComplaintDispatch,
+        {_text("CHIEF_COMPLAINT_ANATOMIC_LOC")} AS ChiefComplaintAnatomicLoc,
+        {_text("PRIMARY_SYMPTOM")} AS PrimarySymptom,
+        {_text("PROVIDER_IMPRESSION_PRIMARY")} AS ProviderImpressionPrimary,
+
+        {_text("DISPOSITION_ED")} AS DispositionED,
+        {_text("DISPOSITION_HOSPITAL")} AS DispositionHospital,
+        {_text("DESTINATION_TYPE")} AS DestinationType,
+
+        {_text("PROVIDER_TYPE_STRUCTURE")} AS ProviderTypeStructure,
+        {_text("PROVIDER_TYPE_SERVICE")} AS ProviderTypeService,
+        {_text("PROVIDER_TYPE_SERVICE_LEVEL")} AS ProviderTypeServiceLevel,
+
+        {_int("PROVIDER_TO_SCENE_MINS")} AS ProviderToSceneMins,
+        {_int("PROVIDER_TO_DESTINATION_MINS")} AS ProviderToDestinationMins,
+
+        {_dttm("UNIT_NOTIFIED_BY_DISPATCH_DT")} AS UnitNotifiedByDispatchDttm,
+        {_dttm("UNIT_ARRIVED_ON_SCENE_DT")} AS UnitArrivedOnSceneDttm,
+        {_dttm("UNIT_ARRIVED_TO_PATIENT_DT")} AS UnitArrivedToPatientDttm,
+        {_dttm("UNIT_LEFT_SCENE_DT")} AS UnitLeftSceneDttm,
+        {_dttm("PATIENT_ARRIVED_DESTINATION_DT")} AS PatientArrivedDestinationDttm,
+
+        {_flag("INJURY_FLG")} AS InjuryFlg,
+        {_flag("NALOXONE_GIVEN_FLG")} AS NaloxoneGivenFlg,
+        {_flag("MEDICATION_GIVEN_OTHER_FLG")} AS MedicationGivenOtherFlg,
+
+        {record_hash_sql("b", DUCKDB)} AS RecordHash,
+
+        {blank_mask_sql("b", DUCKDB)} AS BlankMask,
+        {parse_fail_mask_sql("b", lambda col: _TYPED[col], DUCKDB)} AS ParseFailMask
+    FROM bronze.ems_raw b
+    WHERE b.BronzeId > $2
+      AND b.BronzeId <= $3
+    ORDER BY b.BronzeId
+    LIMIT $1
+) v;
+"""
+
+# silver.ems_clean columns the route writes (everything but SilverId / LoadUtc / generated columns)
+SILVER_COLUMNS = [
+    "RunId", "FileName", "SourceRowNum",
+    "IncidentDttm",
+    "IncidentCounty",
+    "ChiefComplaintDispatch", "ChiefComplaintAnatomicLoc",
+    "PrimarySymptom", "ProviderImpressionPrimary",
+    "DispositionED", "DispositionHospital", "DestinationType",
+    "ProviderTypeStructure", "ProviderTypeService", "ProviderTypeServiceLevel",
+    "ProviderToSceneMins", "ProviderToDestinationMins",
+    "UnitNotifiedByDispatchDttm", "UnitArrivedOnSceneDttm", "UnitArrivedToPatientDttm",
+    "UnitLeftSceneDttm", "PatientArrivedDestinationDttm",
+    "InjuryFlg", "NaloxoneGivenFlg", "MedicationGivenOtherFlg",
+    "RecordHash",
+]
+
+# route = three statements here (no batch variables in DuckDB): rejects, clean rows, batch stats
+ROUTE_REJECT_SQL = """
+INSERT INTO silver.ems_reject (RunId, FileName, SourceRowNum, ErrorType, ErrorMessage)
+SELECT
+    t.RunId,
+    t.FileName,
+    t.SourceRowNum,
+    t.ErrorType,
+    concat('Row rejected in silver validation. BronzeId=', t.BronzeId)
+FROM silver_batch t
+WHERE t.ErrorType IS NOT NULL
+  AND NOT EXISTS (
+      SELECT 1
+      FROM silver.ems_reject x
+      WHERE x.RunId = t.RunId AND x.SourceRowNum = t.SourceRowNum
+  );
+"""
+
+ROUTE_CLEAN_SQL = f"""
+INSERT INTO silver.ems_clean ({', '.join(SILVER_COLUMNS)})
+SELECT {', '.join('t.' + c for c in SILVER_COLUMNS)}
+FROM silver_batch t
+WHERE t.ErrorType IS NULL
+  AND NOT EXISTS (
+      SELECT 1
+      FROM silver.ems_reject r
+      WHERE r.RunId = t.RunId AND r.SourceRowNum = t.SourceRowNum
+  )
+  AND {not_exists_hash_sql("silver.ems_clean", "t.RecordHash")}
+-- same hash twice in one batch: keep the first (the unique index does this on SQL Server)
+QUALIFY row_number() OVER (PARTITION BY t.RecordHash ORDER BY t.BronzeId) = 1
+ORDER BY t.BronzeId;
+"""
+
+ROUTE_STATS_SQL = "SELECT count(*), max(BronzeId) FROM silver_batch;"
+
+# --------------------------
+# gold.py
+# --------------------------
+_RANGE = "s.SilverId > ? AND s.SilverId <= ?"
+
+
+def _nk(alias: str, col: str) -> str:
+    # natural key compare value: same folding as DimKeyCache._nk and the SQL Server NkHash definition
+    return f"upper(coalesce({alias}.{col}, ''))"
+
+
+def _nk_match(dim_cols: tuple[str, ...], src_cols: tuple[str, ...], dim: str = "d", src: str = "s") -> str:
+    return " AND ".join(f"{_nk(dim, d)} = {_nk(src, c)}" for d, c in zip(dim_cols, src_cols))
+
+
+SLICE_DATE_BOUNDS_SQL = f"""
+SELECT
+    min(k) FILTER (WHERE k BETWEEN w.FirstKey AND w.LastKey),
+    max(k) FILTER (WHERE k BETWEEN w.FirstKey AND w.LastKey),
+    count(k) FILTER (WHERE k NOT BETWEEN w.FirstKey AND w.LastKey)
+FROM (
+    SELECT unnest([
+        s.IncidentDateKey,
+        s.UnitNotifiedDateKey,
+        s.ArrivedSceneDateKey,
+        s.ArrivedPatientDateKey,
+        s.LeftSceneDateKey,
+        s.ArrivedDestinationDateKey
+    ]) AS k
+    FROM silver.ems_clean s
+    WHERE {_RANGE}
+) v
+CROSS JOIN (SELECT ?::INTEGER AS FirstKey, ?::INTEGER AS LastKey) w;
+"""
+
+SLICE_OUTSIDE_DATES_SQL = f"""
+SELECT DISTINCT k
+FROM (
+    SELECT unnest([
+        s.IncidentDateKey,
+        s.UnitNotifiedDateKey,
+        s.ArrivedSceneDateKey,
+        s.ArrivedPatientDateKey,
+        s.LeftSceneDateKey,
+        s.ArrivedDestinationDateKey
+    ]) AS k
+    FROM silver.ems_clean s
+    WHERE {_RANGE}
+) v
+WHERE k < ? OR k > ?;
+"""
+
+
+def _dim_sql(table: str, dim_cols: tuple[str, ...], src_cols: tuple[str, ...], extra: str = "") -> str:
+    # one member per normalized natural key (DISTINCT ON), only keys the dim doesn't have yet
+    src_list = ", ".join(f"s.{c}" for c in src_cols)
+    any_not_null = " OR ".join(f"s.{c} IS NOT NULL" for c in src_cols)
+    return f"""
+    INSERT INTO {table} ({', '.join(dim_cols)})
+    SELECT DISTINCT ON ({', '.join(_nk('s', c) for c in src_cols)}) {src_list}
+    FROM silver.ems_clean s
+    WHERE {_RANGE}
+      AND ({any_not_null})
+      AND NOT EXISTS (
+          SELECT 1 FROM {table} d WHERE {_nk_match(dim_cols, src_cols)}{extra}
+      );
+    """
+
+
+DIM_SQL = {
+    "DimCounty": _dim_sql("dw.DimCounty", ("CountyName",), ("IncidentCounty",)),
+    "DimComplaint": _dim_sql(
+        "dw.DimComplaint",
+        ("ChiefComplaintDispatch", "ChiefComplaintAnatomicLoc"),
+        ("ChiefComplaintDispatch", "ChiefComplaintAnatomicLoc"),
+    ),
+    "DimSymptom": _dim_sql(
+        "dw.DimSymptom",
+        ("PrimarySymptom", "ProviderImpressionPrimary"),
+        ("PrimarySymptom", "ProviderImpressionPrimary"),
+    ),
+    "DimProvider": _dim_sql(
+        "dw.DimProvider",
+        ("ProviderTypeStructure", "ProviderTypeService", "ProviderTypeServiceLevel"),
+        ("ProviderTypeStructure", "ProviderTypeService", "ProviderTypeServiceLevel"),
+        extra=" AND d.IsCurrent = 1",
+    ),
+    # disposition comes from two columns (ED and Hospital) so unpivot them into one dim
+    "DimDisposition": f"""
+    INSERT INTO dw.DimDisposition (DispositionName)
+    SELECT DISTINCT ON (upper(v.DispositionName)) v.DispositionName
+    FROM (
+        SELECT unnest([s.DispositionED, s.DispositionHospital]) AS DispositionName
+        FROM silver.ems_clean s
+        WHERE {_RANGE}
+    ) v
+    WHERE v.DispositionName IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM dw.DimDisposition d WHERE upper(d.DispositionName) = upper(v.DispositionName)
+      );
+    """,
+    "DimDestinationType": _dim_sql("dw.DimDestinationType", ("DestinationTypeName",), ("DestinationType",)),
+}
+
+# params: 7 unknown keys, then the slice bounds (same as gold._FACT_SQL)
+FACT_SQL = f"""
+INSERT INTO dw.FactEMS_Encounter (
+    IncidentDateKey, UnitNotifiedDateKey, ArrivedSceneDateKey, ArrivedPatientDateKey, LeftSceneDateKey, ArrivedDestinationDateKey,
+    CountyKey, ComplaintKey, SymptomKey, ProviderKey, DispositionEDKey, DispositionHospitalKey, DestinationTypeKey,
+    ProviderToSceneMins, ProviderToDestinationMins, InjuryFlg, NaloxoneGivenFlg, MedicationGivenOtherFlg,
+    RunId, FileName, SourceRowNumber, RecordHash
+)
+SELECT
+    s.IncidentDateKey,
+    s.UnitNotifiedDateKey,
+    s.ArrivedSceneDateKey,
+    s.ArrivedPatientDateKey,
+    s.LeftSceneDateKey,
+    s.ArrivedDestinationDateKey,
+
+    coalesce(c.CountyKey, ?),
+    coalesce(cc.ComplaintKey, ?),
+    coalesce(sm.SymptomKey, ?),
+    coalesce(p.ProviderKey, ?),
+    coalesce(ded.DispositionKey, ?),
+    coalesce(dh.DispositionKey, ?),
+    coalesce(dt.DestinationTypeKey, ?),
+
+    s.ProviderToSceneMins,
+    s.ProviderToDestinationMins,
+    s.InjuryFlg,
+    s.NaloxoneGivenFlg,
+    s.MedicationGivenOtherFlg,
+
+    s.RunId,
+    s.FileName,
+    s.SourceRowNum,
+    s.RecordHash
+FROM silver.ems_clean s
+LEFT JOIN dw.DimCounty c
+    ON {_nk_match(("CountyName",), ("IncidentCounty",), "c")}
+LEFT JOIN dw.DimComplaint cc
+    ON {_nk_match(("ChiefComplaintDispatch", "ChiefComplaintAnatomicLoc"), ("ChiefComplaintDispatch", "ChiefComplaintAnatomicLoc"), "cc")}
+LEFT JOIN dw.DimSymptom sm
+    ON {_nk_match(("PrimarySymptom", "ProviderImpressionPrimary"), ("PrimarySymptom", "ProviderImpressionPrimary"), "sm")}
+LEFT JOIN dw.DimProvider p
+    ON {_nk_match(("ProviderTypeStructure", "ProviderTypeService", "ProviderTypeServiceLevel"), ("ProviderTypeStructure", "ProviderTypeService", "ProviderTypeServiceLevel"), "p")}
+   AND p.IsCurrent = 1
+LEFT JOIN dw.DimDisposition ded
+    ON upper(ded.DispositionName) = upper(s.DispositionED)
+LEFT JOIN dw.DimDisposition dh
+    ON upper(dh.DispositionName) = upper(s.DispositionHospital)
+LEFT JOIN dw.DimDestinationType dt
+    ON upper(dt.DestinationTypeName) = upper(s.DestinationType)
+WHERE {_RANGE}
+  AND {not_exists_hash_sql("dw.FactEMS_Encounter", "s.RecordHash")};
+"""
+
+# --publish check: silver rows of the range the fact doesn't have yet (params: range bounds)
+PUBLISH_EXPECTED_SQL = f"""
+SELECT count(*)
+FROM silver.ems_clean s
+WHERE {_RANGE}
+  AND {not_exists_hash_sql("dw.FactEMS_Encounter", "s.RecordHash")};
+"""
+
+# params ($n so the order matches gold._NEXT_SLICE_SQL): $1 batch_size, $2 lo, $3 upper
+NEXT_SLICE_SQL = """
+SELECT count(*), max(SilverId)
+FROM (
+    SELECT SilverId
+    FROM silver.ems_clean
+    WHERE SilverId > $2 AND SilverId <= $3
+    ORDER BY SilverId
+    LIMIT $1
+) x;
+"""
+
+# --------------------------
+# daily_summary.py: MERGE = INSERT ... ON CONFLICT on the (IncidentDate, IncidentCounty) primary key
+# params ($n so the order matches the T-SQL MERGEs): $1 lo, $2 hi, $3 / $4 run_id
+# --------------------------
+RESET_SUMMARY_SQL = "DELETE FROM dw.ems_daily_summary;"
+
+
+def _keep_min(col: str) -> str:
+    return f"{col} = CASE WHEN {col} IS NULL OR excluded.{col} < {col} THEN excluded.{col} ELSE {col} END"
+
+
+def _keep_max(col: str) -> str:
+    return f"{col} = CASE WHEN {col} IS NULL OR excluded.{col} > {col} THEN excluded.{col} ELSE {col} END"
+
+
+SUMMARY_SLICE_SQL = f"""
+INSERT INTO dw.ems_daily_summary (
+    RunId, IncidentDate, IncidentCounty,
+    TotalIncidents, InjuryYes, NaloxoneYes, MedicationYes,
+    SceneMinsSum, SceneMinsCount, SceneMinsMin, SceneMinsMax,
+    DestinationMinsSum, DestinationMinsCount, DestinationMinsMin, DestinationMinsMax
+)
+SELECT
+    $3,
+    s.IncidentDate,
+    s.IncidentCounty,
+    count(*),
+    count(*) FILTER (WHERE s.InjuryFlg = 'Y'),
+    count(*) FILTER (WHERE s.NaloxoneGivenFlg = 'Y'),
+    count(*) FILTER (WHERE s.MedicationGivenOtherFlg = 'Y'),
+    coalesce(sum(s.ProviderToSceneMins), 0),
+    count(s.ProviderToSceneMins),
+    min(s.ProviderToSceneMins),
+    max(s.ProviderToSceneMins),
+    coalesce(sum(s.ProviderToDestinationMins), 0),
+    count(s.ProviderToDestinationMins),
+    min(s.ProviderToDestinationMins),
+    max(s.ProviderToDestinationMins)
+FROM silver.ems_clean s
+WHERE s.SilverId > $1 AND s.SilverId <= $2
+  AND s.IncidentDttm IS NOT NULL
+  AND s.IncidentCounty IS NOT NULL
+GROUP BY s.IncidentDate, s.IncidentCounty
+ON CONFLICT (IncidentDate, IncidentCounty) DO UPDATE SET
+    TotalIncidents = TotalIncidents + excluded.TotalIncidents,
+    InjuryYes = InjuryYes + excluded.InjuryYes,
+    NaloxoneYes = NaloxoneYes + excluded.NaloxoneYes,
+    MedicationYes = MedicationYes + excluded.MedicationYes,
+    SceneMinsSum = SceneMinsSum + excluded.SceneMinsSum,
+    SceneMinsCount = SceneMinsCount + excluded.SceneMinsCount,
+    {_keep_min("SceneMinsMin")},
+    {_keep_max("SceneMinsMax")},
+    DestinationMinsSum = DestinationMinsSum + excluded.DestinationMinsSum,
+    DestinationMinsCount = DestinationMinsCount + excluded.DestinationMinsCount,
+    {_keep_min("DestinationMinsMin")},
+    {_keep_max("DestinationMinsMax")},
+    RunId = $4,
+    LoadUtc = {UTC_NOW};
+"""
+
+SUMMARY_REJECTS_SQL = f"""
+INSERT INTO dw.ems_daily_summary (RunId, IncidentDate, IncidentCounty, RejectCount)
+SELECT $3, v.IncidentDate, v.IncidentCounty, count(*)
+FROM (
+    SELECT
+        CAST({_dttm("INCIDENT_DT")} AS DATE) AS IncidentDate,
+        coalesce({_text("INCIDENT_COUNTY")}, 'UNKNOWN') AS IncidentCounty
+    FROM silver.ems_reject r
+    JOIN bronze.ems_raw b
+        ON b.RunId = r.RunId
+       AND b.SourceRowNum = r.SourceRowNum
+    WHERE r.RejectId > $1 AND r.RejectId <= $2
+) v
+WHERE v.IncidentDate IS NOT NULL
+GROUP BY v.IncidentDate, v.IncidentCounty
+ON CONFLICT (IncidentDate, IncidentCounty) DO UPDATE SET
+    RejectCount = RejectCount + excluded.RejectCount,
+    RunId = $4,
+    LoadUtc = {UTC_NOW};
+"""
+
+# --------------------------
+# calendar_dim.py / dim_cache.py
+# --------------------------
+CALENDAR_INSERT_SQL = """
+INSERT INTO dw.DimDate (
+    DateKey, FullDate, "Year", "Quarter", "Month", "Day",
+    DayOfWeek, DayName, MonthName, IsWeekend,
+    IsoYear, IsoWeek, FiscalYear, FiscalQuarter, FiscalMonth
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+CALENDAR_RANGE_SQL = "SELECT min(DateKey), max(DateKey), count(*) FROM dw.DimDate WHERE DateKey BETWEEN ? AND ?;"
+
+
+def insert_member_sql(table: str, key_col: str, nk_cols: tuple[str, ...]) -> str:
+    return f"""
+    INSERT INTO {table} ({', '.join(nk_cols)})
+    VALUES ({', '.join('?' for _ in nk_cols)})
+    RETURNING {key_col};
+    """
@@ -0,0 +1,162 @@
+# src/fact_partitions.py
+# dw.FactEMS_Encounter is partitioned by IncidentDateKey month (see SQL's/DDL/gold/fact table):
+# - pf_FactMonth is RANGE RIGHT on yyyymm01 keys, so every calendar month is its own partition (NULL dates sit in partition 1)
+# - dw.FactEMS_Encounter_stage / _old have the same columns, indexes, FKs and partition scheme, so a month moves between
+#   them with ALTER TABLE ... SWITCH PARTITION (metadata only, nothing logged per row)
+# - boundaries only exist inside the date window (date_window.py, --date-window): at most MAX_WINDOW_YEARS x 12, under
+#   SQL Server's 15,000 partitions per table; fact rows dated outside it sit in the first / last partition
+# SQL Server only; the duckdb backend has no partitions (gold.rebuild_range deletes + reloads there).
+from .db import pyodbc
+from .date_window import FIRST_YEAR, LAST_YEAR
+
+PARTITION_FUNCTION = "pf_FactMonth"
+PARTITION_SCHEME = "ps_FactMonth"
+STAGE_TABLE = "dw.FactEMS_Encounter_stage"
+OLD_TABLE = "dw.FactEMS_Encounter_old"
+
+_PARTITIONED_SQL = """
+SELECT COUNT(1)
+FROM sys.indexes i
+JOIN sys.partition_schemes ps ON ps.data_space_id = i.data_space_id
+WHERE i.object_id = OBJECT_ID('dw.FactEMS_Encounter')
+  AND i.index_id <= 1
+  AND ps.name = ?;
+"""
+
+# partitions the silver rows lo < SilverId <= hi land in (NULL dates -> partition 1)
+_SLICE_PARTITIONS_SQL = f"""
+SELECT DISTINCT $PARTITION.{PARTITION_FUNCTION}(IncidentDateKey)
+FROM silver.ems_clean
+WHERE SilverId > ? AND SilverId <= ?;
+"""
+
+_BOUNDARIES_SQL = """
+SELECT CAST(rv.value AS INT)
+FROM sys.partition_functions pf
+JOIN sys.partition_range_values rv ON rv.function_id = pf.function_id
+WHERE pf.name = ?;
+"""
+
+
+# any fact / _stage / _old row in [?, ?) - a split there would move rows instead of being metadata only
+_RANGE_HAS_ROWS_SQL = f"""
+SELECT CASE WHEN
+       EXISTS (SELECT 1 FROM dw.FactEMS_Encounter WHERE IncidentDateKey >= ? AND IncidentDateKey < ?)
+    OR EXISTS (SELECT 1 FROM {STAGE_TABLE} WHERE IncidentDateKey >= ? AND IncidentDateKey < ?)
+    OR EXISTS (SELECT 1 FROM {OLD_TABLE} WHERE IncidentDateKey >= ? AND IncidentDateKey < ?)
+THEN 1 ELSE 0 END;
+"""
+
+
+def month_start(key: int) -> int:
+    # yyyymmdd -> yyyymm01
+    return key // 100 * 100 + 1
+
+
+def next_month(key: int) -> int:
+    # yyyymmdd -> first day of the following month
+    year, month = key // 10000, key // 100 % 100
+    return (year + 1) * 10000 + 101 if month == 12 else year * 10000 + (month + 1) * 100 + 1
+
+
+def month_keys(first_key: int, last_key: int) -> list[int]:
+    """yyyymm01 of every month from first_key's month through last_key's month."""
+    keys, k = [], month_start(first_key)
+    while k <= last_key:
+        keys.append(k)
+        k = next_month(k)
+    return keys
+
+
+def fact_partitioned(cur: pyodbc.Cursor) -> bool:
+    # False on databases still on the unpartitioned fact (run SQL's/DDL/migration - fact partitions)
+    cur.execute(_PARTITIONED_SQL, PARTITION_SCHEME)
+    return int(cur.fetchone()[0]) > 0
+
+
+def _boundaries(cur: pyodbc.Cursor) -> set[int]:
+    cur.execute(_BOUNDARIES_SQL, PARTITION_FUNCTION)
+    return {int(r[0]) for r in cur.fetchall()}
+
+
+def extend_partitions(
+    cur: pyodbc.Cursor,
+    first_key: int,
+    last_key: int,
+    first_year: int = FIRST_YEAR,
+    last_year: int = LAST_YEAR
+) -> int:
+    """
+    Split in the month boundaries first_key..last_key (+ the month after) that pf_FactMonth doesn't have yet,
+    clamped to first_year-01 .. (last_year + 1)-01.
+    - Called when DimDate grows by a year, i.e. normally before any fact row of those months exists
+    - Each split is checked first: when the range it would cut off (boundary .. next boundary) has rows in the fact,
+      _stage or _old, it's skipped rather than moving them; those months stay in the wider partition (--rebuild-range
+      refuses them) until a split is done by hand in a maintenance window
+    - No-op on an unpartitioned fact. Returns boundaries added. Caller commits.
+    """
+    if not fact_partitioned(cur):
+        return 0
+    first_key = max(first_key, first_year * 10000 + 101)
+    last_key = min(last_key, last_year * 10000 + 1231)
+    if first_key > last_key:
+        return 0
+
+    boundaries = _boundaries(cur)
+    added = 0
+    for key in sorted(set(month_keys(first_key, next_month(last_key))) - boundaries):
+        upper = min((b for b in boundaries if b > key), default=100000000)  # past any yyyymmdd
+        cur.execute(_RANGE_HAS_ROWS_SQL, key, upper, key, upper, key, upper)
+        if int(cur.fetchone()[0]):
+            continue
+        cur.execute(f"ALTER PARTITION SCHEME {PARTITION_SCHEME} NEXT USED [PRIMARY];")
+        cur.execute(f"ALTER PARTITION FUNCTION {PARTITION_FUNCTION}() SPLIT RANGE ({int(key)});")
+        boundaries.add(key)
+        added += 1
+    return added
+
+
+def range_partitions(cur: pyodbc.Cursor, first_key: int, end_key: int) -> list[int]:
+    """
+    Partition numbers holding IncidentDateKey first_key <= key < end_key (both yyyymm01).
+    Raises ValueError when the fact isn't partitioned or a month boundary is missing (a partition would span more
+    than the requested months, and switching it would take other months with it).
+    """
+    if not fact_partitioned(cur):
+        raise ValueError("dw.FactEMS_Encounter isn't partitioned; run SQL's/DDL/migration - fact partitions")
+    months = month_keys(first_key, end_key)  # includes end_key: it has to be a boundary too
+    missing = sorted(set(months) - _boundaries(cur))
+    if missing:
+        raise ValueError(f"{PARTITION_FUNCTION} has no boundary for {', '.join(map(str, missing))}")
+    cur.execute(
+        f"SELECT $PARTITION.{PARTITION_FUNCTION}(?), $PARTITION.{PARTITION_FUNCTION}(?);",
+        first_key, end_key
+    )
+    first, end = cur.fetchone()
+    return list(range(int(first), int(end)))
+
+
+def silver_partitions(cur: pyodbc.Cursor, lo: int, hi: int) -> list[int]:
+    """
+    Partition numbers the silver rows lo < SilverId <= hi fall into (what a --publish run has to rebuild).
+    Raises ValueError when the fact isn't partitioned.
+    """
+    if not fact_partitioned(cur):
+        raise ValueError("dw.FactEMS_Encounter isn't partitioned; run SQL's/DDL/migration - fact partitions")
+    cur.execute(_SLICE_PARTITIONS_SQL, lo, hi)
+    return sorted(int(r[0]) for r in cur.fetchall())
+
+
+def switch_sql(partition: int, wait_minutes: int | None = None) -> str:
+    """
+    One month: live -> _old, rebuilt rows _stage -> live (both empty/full by construction, so metadata only).
+    - wait_minutes: wait at low priority for running queries to let go of the fact (new ones aren't queued behind the
+      switch), give up with an error after that many minutes
+    """
+    option = ""
+    if wait_minutes is not None:
+        option = f" WITH (WAIT_AT_LOW_PRIORITY (MAX_DURATION = {int(wait_minutes)} MINUTES, ABORT_AFTER_WAIT = SELF))"
+    return (
+        f"ALTER TABLE dw.FactEMS_Encounter SWITCH PARTITION {int(partition)} TO {OLD_TABLE} PARTITION {int(partition)}{option};\n"
+        f"ALTER TABLE {STAGE_TABLE} SWITCH PARTITION {int(partition)} TO dw.FactEMS_Encounter PARTITION {int(partition)}{option};"
+    )
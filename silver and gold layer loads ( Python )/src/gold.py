@@ -1,290 +1,1022 @@
 # src/gold.py
-import pyodbc
+import queue
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from .db import pyodbc, ConnectionPool, RetryPolicy, DEFAULT_RETRY, execute_rowcount
 from .step_log import start_step, end_step
+from .dedupe import not_exists_hash_sql
+from .watermark import get_last_bronze_id, set_last_bronze_id, write_last_bronze_id, GOLD_PIPELINE_NAME, GOLD_DIMS_PIPELINE_NAME
+from .dim_cache import DIMS, DimKeyCache
+from .calendar_dim import CalendarDim, key_to_date
+from .date_window import DATE_WINDOW
+from .metrics import StepMetrics, NULL_METRICS
+from .daily_summary import summary_enabled, merge_slice, merge_rejects, reset_summary
+from .rollups import maintain_rollups, reset_rollups, retract_range, existing_rollups
+from .fact_partitions import PARTITION_FUNCTION, STAGE_TABLE, OLD_TABLE, month_start, next_month, extend_partitions, range_partitions
+from .fact_partitions import silver_partitions, switch_sql
+from .dialect import DUCKDB, dialect_of
+from . import duckdb_sql
 
 GOLD_STEP = "GOLD_LOAD"
+REBUILD_STEP = "GOLD_REBUILD"
+PUBLISH_STEP = "GOLD_PUBLISH"
+
+# --publish: how long a partition switch waits at low priority for running queries before it gives up
+DEFAULT_SWITCH_WAIT_MINUTES = 5
+
+# run_gold's sub-steps, in order; each gets its own etl.run_step_log row (GOLD_LOAD:<PHASE>) under the run's RunId
+GOLD_PHASES = ("dims", "fact", "summary", "rollups")
+DEFAULT_BATCH_SIZE = 50000
+
+# fact step engines: "sql" = set-based insert with dim LEFT JOINs, "python" = in-process key cache + bulk insert
+FACT_ENGINES = ("sql", "python")
+
+# every gold statement below works on one silver slice: SilverId > ? AND SilverId <= ?
+_RANGE = "s.SilverId > ? AND s.SilverId <= ?"
+
+# --------------------------
+# DimDate is a generated calendar (calendar_dim.py); per slice we only need the date key bounds inside the date window
+# + how many dates fall outside it (params: slice bounds, window first / last key)
+# --------------------------
+_SLICE_DATE_BOUNDS_SQL = f"""
+SELECT
+    MIN(CASE WHEN k.DateKey BETWEEN w.FirstKey AND w.LastKey THEN k.DateKey END),
+    MAX(CASE WHEN k.DateKey BETWEEN w.FirstKey AND w.LastKey THEN k.DateKey END),
+    COUNT(CASE WHEN k.DateKey NOT BETWEEN w.FirstKey AND w.LastKey THEN 1 END)
+FROM (
+    SELECT v.DateKey
+    FROM silver.ems_clean s
+    CROSS APPLY (VALUES
+        (s.IncidentDateKey),
+        (s.UnitNotifiedDateKey),
+        (s.ArrivedSceneDateKey),
+        (s.ArrivedPatientDateKey),
+        (s.LeftSceneDateKey),
+        (s.ArrivedDestinationDateKey)
+    ) v(DateKey)
+    WHERE {_RANGE}
+) k
+CROSS JOIN (SELECT ? AS FirstKey, ? AS LastKey) w;
+"""
+
+# dates of the slice outside the date window (params: slice bounds, window first / last key)
+_SLICE_OUTSIDE_DATES_SQL = f"""
+SELECT DISTINCT v.DateKey
+FROM silver.ems_clean s
+CROSS APPLY (VALUES
+    (s.IncidentDateKey),
+    (s.UnitNotifiedDateKey),
+    (s.ArrivedSceneDateKey),
+    (s.ArrivedPatientDateKey),
+    (s.LeftSceneDateKey),
+    (s.ArrivedDestinationDateKey)
+) v(DateKey)
+WHERE {_RANGE}
+  AND (v.DateKey < ? OR v.DateKey > ?);
+"""
+
+# --------------------------
+# dims (type 1 style) - each takes the slice bounds as its only params
+# multi-column dims match on NkHash (persisted on both sides, see SQL's/DDL) so lookups are index seeks
+# --------------------------
+_DIM_SQL = {
+    "DimCounty": f"""
+    INSERT INTO dw.DimCounty (CountyName)
+    SELECT DISTINCT s.IncidentCounty
+    FROM silver.ems_clean s
+    WHERE {_RANGE}
+      AND s.IncidentCounty IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM dw.DimCounty d WHERE d.CountyName = s.IncidentCounty
+      );
+    """,
+
+    "DimComplaint": f"""
+    INSERT INTO dw.DimComplaint (ChiefComplaintDispatch, ChiefComplaintAnatomicLoc)
+    SELECT DISTINCT s.ChiefComplaintDispatch, s.ChiefComplaintAnatomicLoc
+    FROM silver.ems_clean s
+    WHERE {_RANGE}
+      AND (s.ChiefComplaintDispatch IS NOT NULL OR s.ChiefComplaintAnatomicLoc IS NOT NULL)
+      AND NOT EXISTS (
+          SELECT 1 FROM dw.DimComplaint d WHERE d.NkHash = s.ComplaintNkHash
+      );
+    """,
+
+    "DimSymptom": f"""
+    INSERT INTO dw.DimSymptom (PrimarySymptom, ProviderImpressionPrimary)
+    SELECT DISTINCT s.PrimarySymptom, s.ProviderImpressionPrimary
+    FROM silver.ems_clean s
+    WHERE {_RANGE}
+      AND (s.PrimarySymptom IS NOT NULL OR s.ProviderImpressionPrimary IS NOT NULL)
+      AND NOT EXISTS (
+          SELECT 1 FROM dw.DimSymptom d WHERE d.NkHash = s.SymptomNkHash
+      );
+    """,
+
+    # provider dim is structured for SCD2 later, but for this assignment we load current rows only (type 1 style)
+    "DimProvider": f"""
+    INSERT INTO dw.DimProvider (ProviderTypeStructure, ProviderTypeService, ProviderTypeServiceLevel)
+    SELECT DISTINCT s.ProviderTypeStructure, s.ProviderTypeService, s.ProviderTypeServiceLevel
+    FROM silver.ems_clean s
+    WHERE {_RANGE}
+      AND (s.ProviderTypeStructure IS NOT NULL OR s.ProviderTypeService IS NOT NULL OR s.ProviderTypeServiceLevel IS NOT NULL)
+      AND NOT EXISTS (
+          SELECT 1 FROM dw.DimProvider d WHERE d.NkHash = s.ProviderNkHash AND d.IsCurrent = 1
+      );
+    """,
+
+    # disposition comes from two columns (ED and Hospital) so unpivot them into one dim
+    "DimDisposition": f"""
+    INSERT INTO dw.DimDisposition (DispositionName)
+    SELECT DISTINCT v.DispositionName
+    FROM silver.ems_clean s
+    CROSS APPLY (VALUES (s.DispositionED), (s.DispositionHospital)) v(DispositionName)
+    WHERE {_RANGE}
+      AND v.DispositionName IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM dw.DimDisposition d WHERE d.DispositionName = v.DispositionName
+      );
+    """,
+
+    "DimDestinationType": f"""
+    INSERT INTO dw.DimDestinationType (DestinationTypeName)
+    SELECT DISTINCT s.DestinationType
+    FROM silver.ems_clean s
+    WHERE {_RANGE}
+      AND s.DestinationType IS NOT NULL
+      AND NOT EXISTS (
+          SELECT 1 FROM dw.DimDestinationType d WHERE d.DestinationTypeName = s.DestinationType
+      );
+    """,
+}
+
+# --------------------------
+# fact (dedupe by RecordHash + IncidentDateKey, one seek on UX_Fact_RecordHash in the row's month partition)
+# --------------------------
+# every fact column but EncounterKey (IDENTITY)
+_FACT_COLUMNS = """
+    IncidentDateKey, UnitNotifiedDateKey, ArrivedSceneDateKey, ArrivedPatientDateKey, LeftSceneDateKey, ArrivedDestinationDateKey,
+    CountyKey, ComplaintKey, SymptomKey, ProviderKey, DispositionEDKey, DispositionHospitalKey, DestinationTypeKey,
+    ProviderToSceneMins, ProviderToDestinationMins, InjuryFlg, NaloxoneGivenFlg, MedicationGivenOtherFlg,
+    RunId, FileName, SourceRowNumber, RecordHash
+"""
+
+
+def _fact_sql(target: str, where: str) -> str:
+    # silver -> fact insert with the 7 dim LEFT JOINs; params: 7 unknown keys, then whatever `where` takes
+    return f"""
+INSERT INTO {target} ({_FACT_COLUMNS})
+SELECT
+    -- date keys are persisted on silver (yyyymmdd ints), so this is a plain copy
+    s.IncidentDateKey,
+    s.UnitNotifiedDateKey,
+    s.ArrivedSceneDateKey,
+    s.ArrivedPatientDateKey,
+    s.LeftSceneDateKey,
+    s.ArrivedDestinationDateKey,
+
+    ISNULL(c.CountyKey, ?) AS CountyKey,
+    ISNULL(cc.ComplaintKey, ?) AS ComplaintKey,
+    ISNULL(sm.SymptomKey, ?) AS SymptomKey,
+    ISNULL(p.ProviderKey, ?) AS ProviderKey,
+    ISNULL(ded.DispositionKey, ?) AS DispositionEDKey,
+    ISNULL(dh.DispositionKey, ?) AS DispositionHospitalKey,
+    ISNULL(dt.DestinationTypeKey, ?) AS DestinationTypeKey,
+
+    s.ProviderToSceneMins,
+    s.ProviderToDestinationMins,
+    s.InjuryFlg,
+    s.NaloxoneGivenFlg,
+    s.MedicationGivenOtherFlg,
+
+    s.RunId,
+    s.FileName,
+    s.SourceRowNum AS SourceRowNumber,  -- fact DDL uses SourceRowNumber
+    s.RecordHash
+FROM silver.ems_clean s
+LEFT JOIN dw.DimCounty c
+    ON c.CountyName = s.IncidentCounty
+LEFT JOIN dw.DimComplaint cc
+    ON cc.NkHash = s.ComplaintNkHash
+LEFT JOIN dw.DimSymptom sm
+    ON sm.NkHash = s.SymptomNkHash
+LEFT JOIN dw.DimProvider p
+    ON p.NkHash = s.ProviderNkHash
+   AND p.IsCurrent = 1
+LEFT JOIN dw.DimDisposition ded
+    ON ded.DispositionName = s.DispositionED
+LEFT JOIN dw.DimDisposition dh
+    ON dh.DispositionName = s.DispositionHospital
+LEFT JOIN dw.DimDestinationType dt
+    ON dt.DestinationTypeName = s.DestinationType
+WHERE {where};
+"""
+
+
+# slice load, params: 7 unknown keys, then the slice bounds
+_FACT_SQL = _fact_sql(
+    "dw.FactEMS_Encounter",
+    f"{_RANGE}\n  AND {not_exists_hash_sql('dw.FactEMS_Encounter', 's.RecordHash', 's.IncidentDateKey')}"
+)
+
+# --rebuild-range: the months' silver rows (up to the gold watermark) into the stage table, switched in afterwards
+# params: 7 unknown keys, first IncidentDateKey, end IncidentDateKey (exclusive), gold watermark
+_REBUILD_STAGE_SQL = _fact_sql(
+    f"{STAGE_TABLE} WITH (TABLOCK)",
+    "s.IncidentDateKey >= ? AND s.IncidentDateKey < ?\n  AND s.SilverId <= ?"
+)
+
+# stage starts empty (a failed earlier rebuild / publish may have left rows in stage / _old) and continues the live EncounterKeys:
+# new rows need new keys, the rollup watermark is an EncounterKey. After a TRUNCATE the first insert gets the reseed value itself
+_REBUILD_PREPARE_SQL = f"""
+TRUNCATE TABLE {STAGE_TABLE};
+TRUNCATE TABLE {OLD_TABLE};
+DECLARE @next BIGINT = IDENT_CURRENT('dw.FactEMS_Encounter') + 1;
+DBCC CHECKIDENT ('{STAGE_TABLE}', RESEED, @next) WITH NO_INFOMSGS;
+"""
+
+# after the switch: live identity continues past the keys the stage handed out
+_REBUILD_RESEED_SQL = f"""
+DECLARE @last BIGINT = IDENT_CURRENT('{STAGE_TABLE}');
+IF @last > IDENT_CURRENT('dw.FactEMS_Encounter')
+    DBCC CHECKIDENT ('dw.FactEMS_Encounter', RESEED, @last) WITH NO_INFOMSGS;
+"""
+
+# duckdb has no partitions: the months are deleted and reloaded (params: first key, end key exclusive)
+_REBUILD_DELETE_SQL = "DELETE FROM dw.FactEMS_Encounter WHERE IncidentDateKey >= ? AND IncidentDateKey < ?;"
+
+# --publish: the live rows of one partition copied into the stage with their EncounterKeys (rollups already have them),
+# under SET IDENTITY_INSERT. param: partition number
+_PUBLISH_COPY_SQL = f"""
+INSERT INTO {STAGE_TABLE} WITH (TABLOCK) (EncounterKey, {_FACT_COLUMNS})
+SELECT EncounterKey, {_FACT_COLUMNS}
+FROM dw.FactEMS_Encounter
+WHERE $PARTITION.{PARTITION_FUNCTION}(IncidentDateKey) = ?;
+"""
+
+# --publish: one silver slice of new rows into the stage, deduped against the live fact. params: 7 unknown keys, slice bounds
+_PUBLISH_STAGE_SQL = _fact_sql(
+    STAGE_TABLE,
+    f"{_RANGE}\n  AND {not_exists_hash_sql('dw.FactEMS_Encounter', 's.RecordHash', 's.IncidentDateKey')}"
+)
+
+# --publish check: silver rows of the range the fact doesn't have yet. Exact hash check (no month hint), so NULL-date
+# duplicates count the way the unique index treats them. params: range bounds
+_PUBLISH_EXPECTED_SQL = f"""
+SELECT COUNT_BIG(1)
+FROM silver.ems_clean s
+WHERE {_RANGE}
+  AND {not_exists_hash_sql('dw.FactEMS_Encounter', 's.RecordHash')};
+"""
+
+# python fact engine: silver rows of the slice that aren't in the fact yet (params: slice bounds)
+_FACT_SOURCE_SQL = f"""
+SELECT
+    s.IncidentDateKey, s.UnitNotifiedDateKey, s.ArrivedSceneDateKey,
+    s.ArrivedPatientDateKey, s.LeftSceneDateKey, s.ArrivedDestinationDateKey,
+    s.IncidentCounty,
+    s.ChiefComplaintDispatch, s.ChiefComplaintAnatomicLoc,
+    s.PrimarySymptom, s.ProviderImpressionPrimary,
+    s.ProviderTypeStructure, s.ProviderTypeService, s.ProviderTypeServiceLevel,
+    s.DispositionED, s.DispositionHospital, s.DestinationType,
+    s.ProviderToSceneMins, s.ProviderToDestinationMins,
+    s.InjuryFlg, s.NaloxoneGivenFlg, s.MedicationGivenOtherFlg,
+    s.RunId, s.FileName, s.SourceRowNum, s.RecordHash
+FROM silver.ems_clean s
+WHERE {_RANGE}
+  AND {not_exists_hash_sql("dw.FactEMS_Encounter", "s.RecordHash", "s.IncidentDateKey")}
+ORDER BY s.SilverId;
+"""
+
+_FACT_INSERT_SQL = """
+INSERT INTO dw.FactEMS_Encounter (
+    IncidentDateKey, UnitNotifiedDateKey, ArrivedSceneDateKey, ArrivedPatientDateKey, LeftSceneDateKey, ArrivedDestinationDateKey,
+    CountyKey, ComplaintKey, SymptomKey, ProviderKey, DispositionEDKey, DispositionHospitalKey, DestinationTypeKey,
+    ProviderToSceneMins, ProviderToDestinationMins, InjuryFlg, NaloxoneGivenFlg, MedicationGivenOtherFlg,
+    RunId, FileName, SourceRowNumber, RecordHash
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+# next silver slice: (row count, last SilverId) of the next TOP (batch_size) rows past the watermark
+_NEXT_SLICE_SQL = """
+SELECT COUNT_BIG(1), MAX(SilverId)
+FROM (
+    SELECT TOP (?) SilverId
+    FROM silver.ems_clean
+    WHERE SilverId > ? AND SilverId <= ?
+    ORDER BY SilverId
+) x;
+"""
+
+
+def _get_unknown_keys(cur: pyodbc.Cursor) -> dict[str, int]:
+    # cache UNKNOWN keys once per run (dim name -> surrogate key)
+    keys = {}
+    for name, spec in DIMS.items():
+        cur.execute(f"SELECT {spec.key_col} FROM {spec.table} WHERE UnknownFlag=1;")
+        keys[name] = int(cur.fetchone()[0])
+    return keys
+
+
+def _fact_unknown_params(unknown_keys: dict[str, int]) -> tuple[int, ...]:
+    # _FACT_SQL parameter order (disposition is used twice: ED + hospital)
+    return (
+        unknown_keys["county"],
+        unknown_keys["complaint"],
+        unknown_keys["symptom"],
+        unknown_keys["provider"],
+        unknown_keys["disposition"],
+        unknown_keys["disposition"],
+        unknown_keys["destination_type"],
+    )
+
+
+def _load_fact_python(cur: pyodbc.Cursor, cache: DimKeyCache, lo: int, hi: int) -> int:
+    # python fact engine: keys resolved from the in-memory cache, facts bulk inserted with fast_executemany
+    cur.execute(_FACT_SOURCE_SQL, lo, hi)
+    rows = cur.fetchall()
+
+    facts = []
+    seen = set()
+    for r in rows:
+        if r.RecordHash in seen:
+            continue  # same record twice in one slice (the unique index would drop it anyway)
+        seen.add(r.RecordHash)
+
+        facts.append((
+            r.IncidentDateKey,
+            r.UnitNotifiedDateKey,
+            r.ArrivedSceneDateKey,
+            r.ArrivedPatientDateKey,
+            r.LeftSceneDateKey,
+            r.ArrivedDestinationDateKey,
+
+            cache.resolve(cur, "county", (r.IncidentCounty,)),
+            cache.resolve(cur, "complaint", (r.ChiefComplaintDispatch, r.ChiefComplaintAnatomicLoc)),
+            cache.resolve(cur, "symptom", (r.PrimarySymptom, r.ProviderImpressionPrimary)),
+            cache.resolve(cur, "provider", (r.ProviderTypeStructure, r.ProviderTypeService, r.ProviderTypeServiceLevel)),
+            cache.resolve(cur, "disposition", (r.DispositionED,)),
+            cache.resolve(cur, "disposition", (r.DispositionHospital,)),
+            cache.resolve(cur, "destination_type", (r.DestinationType,)),
+
+            r.ProviderToSceneMins,
+            r.ProviderToDestinationMins,
+            r.InjuryFlg,
+            r.NaloxoneGivenFlg,
+            r.MedicationGivenOtherFlg,
+
+            r.RunId,
+            r.FileName,
+            r.SourceRowNum,
+            r.RecordHash,
+        ))
+
+    if facts:
+        cur.fast_executemany = True
+        try:
+            cur.executemany(_FACT_INSERT_SQL, facts)
+        finally:
+            cur.fast_executemany = False
+
+    return len(facts)
+
+
+def _ensure_dates(cur: pyodbc.Cursor, lo: int, hi: int, calendar: CalendarDim, metrics: StepMetrics) -> None:
+    # DimDate: make sure the calendar covers every date in the slice (inside the window: whole years, outside: the days)
+    with metrics.measure(GOLD_STEP, "dim:date", lo, hi) as m:
+        duck = dialect_of(cur) == DUCKDB
+        cur.execute(duckdb_sql.SLICE_DATE_BOUNDS_SQL if duck else _SLICE_DATE_BOUNDS_SQL,
+                    lo, hi, calendar.first_key, calendar.last_key)
+        min_key, max_key, outside = cur.fetchone()
+        m.rows = added = calendar.ensure(cur, min_key, max_key)
+
+        if outside:
+            cur.execute(duckdb_sql.SLICE_OUTSIDE_DATES_SQL if duck else _SLICE_OUTSIDE_DATES_SQL,
+                        lo, hi, calendar.first_key, calendar.last_key)
+            m.rows += calendar.ensure_days(cur, [r[0] for r in cur.fetchall()])
+
+    # a new calendar year = new fact months: give them their partitions while they're still empty
+    if added and dialect_of(cur) != DUCKDB:
+        with metrics.measure(GOLD_STEP, "fact:partitions", lo, hi) as p:
+            p.rows = extend_partitions(cur, calendar.min_key, calendar.max_key, calendar.first_year, calendar.last_year)
+
+
+def _load_dim(cur: pyodbc.Cursor, name: str, lo: int, hi: int, metrics: StepMetrics) -> None:
+    with metrics.measure(GOLD_STEP, f"dim:{name}", lo, hi) as m:
+        sql = duckdb_sql.DIM_SQL[name] if dialect_of(cur) == DUCKDB else _DIM_SQL[name]
+        m.rows = execute_rowcount(cur, sql, lo, hi)
+
+
+class _DimRunner:
+    """
+    Runs DimDate + the six dim inserts of a slice concurrently, each on its own pooled connection.
+    - Every dim commits on its own; run() returns only when all of them have, so the fact sees every new member
+    - Any failure is raised after the others finished (no worker is left writing behind the caller's back)
+    - Dims are NOT EXISTS inserts, so a slice that fails after its dims committed just finds them there on rerun
+      (same reason a single dim that hits a deadlock/timeout is simply retried on a fresh checkout)
+    """
+
+    def __init__(self, pool: ConnectionPool, workers: int, metrics: StepMetrics, retry: RetryPolicy = DEFAULT_RETRY):
+        self.pool = pool
+        self.metrics = metrics
+        self.retry = retry
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gold-dim")
+
+    def _load(self, name: str, lo: int, hi: int, calendar: CalendarDim) -> None:
+        with self.pool.connection() as dconn:
+            cur = dconn.cursor()
+            if name == "date":
+                _ensure_dates(cur, lo, hi, calendar, self.metrics)
+            else:
+                _load_dim(cur, name, lo, hi, self.metrics)
+            dconn.commit()
+
+    def _task(self, name: str, lo: int, hi: int, calendar: CalendarDim) -> None:
+        # a rolled back DimDate insert leaves the calendar's cached range ahead of the table -> re-read it
+        on_retry = calendar.reset if name == "date" else None
+        self.retry.run(lambda: self._load(name, lo, hi, calendar), on_retry=on_retry)
+
+    def run(self, lo: int, hi: int, calendar: CalendarDim) -> None:
+        futures = [self.executor.submit(self._task, name, lo, hi, calendar) for name in ("date", *_DIM_SQL)]
+        wait(futures)
+        for f in futures:
+            f.result()  # re-raises the first worker error
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+
+
+def _load_slice_dims(
+    cur: pyodbc.Cursor,
+    lo: int,
+    hi: int,
+    calendar: CalendarDim,
+    cache: DimKeyCache | None = None,
+    metrics: StepMetrics = NULL_METRICS,
+    dim_runner: _DimRunner | None = None
+) -> None:
+    # DimDate + dims for silver rows with lo < SilverId <= hi
+    if cache is not None:
+        # python engine: dims are upserted through the cache as members show up, only the calendar goes first
+        _ensure_dates(cur, lo, hi, calendar, metrics)
+        return
+
+    if dim_runner is not None:
+        # all dims in parallel, each committed on its own
+        with metrics.measure(GOLD_STEP, "dims", lo, hi):
+            dim_runner.run(lo, hi, calendar)
+    else:
+        _ensure_dates(cur, lo, hi, calendar, metrics)
+        for name in _DIM_SQL:
+            _load_dim(cur, name, lo, hi, metrics)
+
+
+def _load_slice_fact(
+    cur: pyodbc.Cursor,
+    lo: int,
+    hi: int,
+    unknown_keys: dict[str, int],
+    cache: DimKeyCache | None = None,
+    metrics: StepMetrics = NULL_METRICS
+) -> int:
+    # fact for silver rows with lo < SilverId <= hi (their dims are loaded). returns fact rows inserted
+    if cache is not None:
+        with metrics.measure(GOLD_STEP, "fact:python", lo, hi) as m:
+            m.rows = rows = _load_fact_python(cur, cache, lo, hi)
+        return rows
+
+    with metrics.measure(GOLD_STEP, "fact", lo, hi) as m:
+        sql = duckdb_sql.FACT_SQL if dialect_of(cur) == DUCKDB else _FACT_SQL
+        m.rows = rows = execute_rowcount(cur, sql, *_fact_unknown_params(unknown_keys), lo, hi)
+    return rows
+
+
+def reset_gold(conn: pyodbc.Connection) -> None:
+    """Full refresh (dev/testing): wipe DW business rows + summary + rollups and move the gold watermark back to 0."""
+    cur = conn.cursor()
+
+    # fact first because of FK constraints. TRUNCATE deallocates every month partition instead of logging each row
+    # (nothing references the fact, so it's allowed); duckdb has no TRUNCATE semantics to gain
+    if dialect_of(conn) == DUCKDB:
+        cur.execute("DELETE FROM dw.FactEMS_Encounter;")
+    else:
+        cur.execute("TRUNCATE TABLE dw.FactEMS_Encounter;")
+
+    # keep UNKNOWN rows in dims (UnknownFlag=1), delete only business rows
+    cur.execute("DELETE FROM dw.DimComplaint WHERE UnknownFlag = 0;")
+    cur.execute("DELETE FROM dw.DimSymptom WHERE UnknownFlag = 0;")
+    cur.execute("DELETE FROM dw.DimProvider WHERE UnknownFlag = 0;")
+    cur.execute("DELETE FROM dw.DimCounty WHERE UnknownFlag = 0;")
+    cur.execute("DELETE FROM dw.DimDisposition WHERE UnknownFlag = 0;")
+    cur.execute("DELETE FROM dw.DimDestinationType WHERE UnknownFlag = 0;")
+
+    # DimDate is a static calendar (not derived from silver) so it stays as is
+
+    conn.commit()
+    set_last_bronze_id(conn, 0, GOLD_PIPELINE_NAME)
+    set_last_bronze_id(conn, 0, GOLD_DIMS_PIPELINE_NAME)
+    # summary is rebuilt along with gold (it always covers silver up to the gold watermark)
+    reset_summary(conn)
+    # rollups are built from the fact, which is empty now
+    reset_rollups(conn)
+
+
+class _GoldLoader:
+    # per-run gold state (unknown keys, calendar, dim cache) + the slice loop, shared by run_gold and run_gold_stream
+
+    def __init__(
+        self,
+        conn: pyodbc.Connection,
+        run_id: str,
+        batch_size: int,
+        fact_engine: str,
+        metrics: StepMetrics,
+        dim_workers: int = 1,
+        pool: ConnectionPool | None = None,
+        retry: RetryPolicy = DEFAULT_RETRY,
+        date_window: tuple[int, int] = DATE_WINDOW
+    ):
+        if dim_workers > 1 and dialect_of(conn) == DUCKDB:
+            raise ValueError("the duckdb backend loads dims serially (dim_workers = 1)")
+
+        self.conn = conn
+        self.run_id = run_id
+        self.cur = conn.cursor()
+        self.next_slice_sql = duckdb_sql.NEXT_SLICE_SQL if dialect_of(conn) == DUCKDB else _NEXT_SLICE_SQL
+        self.batch_size = batch_size
+        self.metrics = metrics
+        self.retry = retry
+        self.stale = False  # a slice was rolled back: calendar range / dim cache may hold rows that never committed
+        self.rows_in = 0
+        self.rows_out = 0
+
+        self.last_silver_id = get_last_bronze_id(conn, GOLD_PIPELINE_NAME)
+        # dims can be loaded ahead of the fact (dims phase); never behind it
+        self.dims_upto = max(get_last_bronze_id(conn, GOLD_DIMS_PIPELINE_NAME), self.last_silver_id)
+        self.unknown_keys = _get_unknown_keys(self.cur)
+        self.calendar = CalendarDim(first_year=date_window[0], last_year=date_window[1])
+        self.summary = summary_enabled(self.cur)
+
+        self.cache = None
+        if fact_engine == "python":
+            self.cache = DimKeyCache(self.unknown_keys)
+            self.cache.load(self.cur)
+
+        # the python engine resolves dims through the cache, so parallel dims only apply to the sql engine
+        self.dim_runner = None
+        if dim_workers > 1 and self.cache is None:
+            self.dim_runner = _DimRunner(pool, dim_workers, metrics, retry)
+
+    def close(self) -> None:
+        if self.dim_runner is not None:
+            self.dim_runner.close()
+
+    def _next_slice(self, lo: int, max_silver_id: int) -> tuple[int, int | None]:
+        # (rows, last SilverId) of the next batch_size silver rows past lo
+        with self.metrics.measure(GOLD_STEP, "next_slice", lo) as m:
+            self.cur.execute(self.next_slice_sql, self.batch_size, lo, max_silver_id)
+            slice_rows, hi = self.cur.fetchone()
+            m.rows = slice_rows = int(slice_rows or 0)
+        return slice_rows, None if hi is None else int(hi)
+
+    def slices(self, lo: int, max_silver_id: int):
+        """(lo, hi, rows) of each batch_size slice of silver rows lo < SilverId <= max_silver_id, in SilverId order."""
+        while lo < max_silver_id:
+            slice_rows, hi = self._next_slice(lo, max_silver_id)
+            if hi is None:
+                return  # safety check (prevents infinite loop)
+            yield lo, hi, slice_rows
+            lo = hi
+
+    def load_dims_upto(self, max_silver_id: int) -> tuple[int, None]:
+        # dims phase: DimDate + dims for silver rows dims_upto < SilverId <= max_silver_id, own watermark per slice
+        rows_in = 0
+        for lo, hi, slice_rows in self.slices(self.dims_upto, max_silver_id):
+            self.retry.run(lambda: self._load_dims(lo, hi), self.conn, self._mark_stale)
+            rows_in += slice_rows
+            self.dims_upto = hi
+        return rows_in, None
+
+    def load_upto(self, max_silver_id: int) -> tuple[int, int]:
+        # fact phase: silver rows last_silver_id < SilverId <= max_silver_id in batch_size slices
+        rows_in = rows_out = 0
+        for lo, hi, slice_rows in self.slices(self.last_silver_id, max_silver_id):
+            rows_out += self.retry.run(lambda: self._load_slice(lo, hi), self.conn, self._mark_stale)
+            rows_in += slice_rows
+            self.last_silver_id = hi
+        self.rows_in += rows_in
+        self.rows_out += rows_out
+        return rows_in, rows_out
+
+    def _mark_stale(self) -> None:
+        self.stale = True
+
+    def _refresh_if_stale(self) -> None:
+        if self.stale:
+            self.calendar.reset()
+            if self.cache is not None:
+                self.cache.reload(self.cur)
+            self.stale = False
+
+    def _load_dims(self, lo: int, hi: int) -> None:
+        self._refresh_if_stale()
+        _load_slice_dims(self.cur, lo, hi, self.calendar, self.cache, self.metrics, self.dim_runner)
+        with self.metrics.measure(GOLD_STEP, "commit:dims", lo, hi):
+            write_last_bronze_id(self.conn, hi, GOLD_DIMS_PIPELINE_NAME)
+            self.conn.commit()
+
+    def _load_slice(self, lo: int, hi: int) -> int:
+        self._refresh_if_stale()
+
+        # dims not loaded ahead (streaming, or the dims phase was skipped): the slice loads its own first
+        if hi > self.dims_upto:
+            _load_slice_dims(self.cur, lo, hi, self.calendar, self.cache, self.metrics, self.dim_runner)
+        rows = _load_slice_fact(self.cur, lo, hi, self.unknown_keys, self.cache, self.metrics)
+
+        if self.summary:
+            with self.metrics.measure(GOLD_STEP, "daily_summary", lo, hi) as m:
+                m.rows = merge_slice(self.cur, self.run_id, lo, hi)
+
+        # dims + fact + summary + watermark for the slice commit together (a retried slice starts from nothing)
+        with self.metrics.measure(GOLD_STEP, "commit", lo, hi):
+            write_last_bronze_id(self.conn, hi, GOLD_PIPELINE_NAME)
+            self.conn.commit()
+        return rows
+
+    def daily_summary(self) -> tuple[None, int]:
+        # silver rows were merged slice by slice; what's left are the rejects silver added since the last run
+        rows = 0
+        if self.summary:
+            with self.metrics.measure(GOLD_STEP, "daily_summary:rejects") as m:
+                m.rows = rows = merge_rejects(self.conn, self.run_id)
+        return None, rows
+
+
+def _check_args(fact_engine: str, dim_workers: int, pool: ConnectionPool | None) -> None:
+    if fact_engine not in FACT_ENGINES:
+        raise ValueError(f"fact_engine must be one of {FACT_ENGINES}, got {fact_engine!r}")
+    if dim_workers > 1 and pool is None:
+        raise ValueError("gold with dim_workers > 1 needs a ConnectionPool")
+
+
+def _fail_step(conn: pyodbc.Connection, step_log_id: int, loader: _GoldLoader | None, metrics: StepMetrics, ex: Exception) -> None:
+    try:
+        conn.rollback()
+        metrics.flush(conn)  # timings up to the failure are the interesting part
+    except (pyodbc.Error, OSError):
+        pass
+    rows_in = loader.rows_in if loader else 0
+    rows_out = loader.rows_out if loader else 0
+    end_step(conn, step_log_id, "FAILED", rows_in=rows_in, rows_out=rows_out, rows_reject=0, error_message=str(ex))
 
 
-def run_gold(conn: pyodbc.Connection, run_id: str, full_refresh: bool = False) -> None:
-    # Gold = dimensional model (dims + fact) built from silver.ems_clean
-    step_log_id = start_step(conn, run_id, GOLD_STEP)
-    rows_in = 0
-    rows_out = 0
+def gold_phase_step(phase: str) -> str:
+    # step_log name of a gold phase, e.g. GOLD_LOAD:FACT
+    return f"{GOLD_STEP}:{phase.upper()}"
+
 
+def _run_phase(conn: pyodbc.Connection, run_id: str, phase: str, fn) -> None:
+    # one phase = one step_log row; fn returns (rows_in, rows_out)
+    step_log_id = start_step(conn, run_id, gold_phase_step(phase))
     try:
-        cur = conn.cursor()
+        rows_in, rows_out = fn()
+    except Exception as ex:
+        try:
+            conn.rollback()
+        except pyodbc.Error:
+            pass
+        end_step(conn, step_log_id, "FAILED", error_message=str(ex))
+        raise
+    end_step(conn, step_log_id, "SUCCESS", rows_in=rows_in, rows_out=rows_out, rows_reject=0)
+
+
+def run_gold(
+    conn: pyodbc.Connection,
+    run_id: str,
+    full_refresh: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    fact_engine: str = "sql",
+    metrics: StepMetrics = NULL_METRICS,
+    dim_workers: int = 1,
+    pool: ConnectionPool | None = None,
+    retry: RetryPolicy = DEFAULT_RETRY,
+    rollups=(),
+    from_phase: str = GOLD_PHASES[0],
+    date_window: tuple[int, int] = DATE_WINDOW
+) -> None:
+    """
+    Gold = dimensional model (dims + fact) built from silver.ems_clean.
+    - Incremental: own watermark (GOLD_PIPELINE_NAME) on SilverId, so only new silver rows are read
+    - Batched: each slice of batch_size silver rows loads dims and fact, then moves the watermark
+    - DimDate: generated calendar, only extended when a slice has dates outside the loaded range; whole years inside
+      date_window (first, last year), single days outside it (see calendar_dim.py)
+    - Full refresh: wipes DW business rows and reloads all of silver (watermark back to 0)
+    - fact_engine="python": dim keys come from an in-memory DimKeyCache instead of 7 LEFT JOINs
+    - metrics: per-slice timings for every dim/fact statement (see metrics.py), flushed when the step ends
+    - dim_workers > 1: DimDate + the six dims of each slice load concurrently on `pool`, the fact starts once all committed
+    - retry: a slice that hits a deadlock/timeout is rolled back and loaded again (NOT EXISTS dims/fact, watermark in the same commit)
+    - dw.ems_daily_summary (optional): one row per IncidentDate + county, MERGEd from every slice in the slice's commit
+      (see daily_summary.py), plus the new rejects at the end
+    - rollups: RollupSpecs merged from the fact rows this run added, after the last slice, along with every rollup table
+      that already exists (see rollups.py)
+    - Phases (GOLD_PHASES): dims -> fact -> summary rejects -> rollups, each logged as its own GOLD_LOAD:<PHASE> step.
+      Dims have their own watermark (GOLD_DIMS_PIPELINE_NAME), so every phase picks up where it stopped;
+      from_phase skips the phases before it (a resumed run, see run_pipeline --resume)
+    """
+    _check_args(fact_engine, dim_workers, pool)
+    if from_phase not in GOLD_PHASES:
+        raise ValueError(f"from_phase must be one of {', '.join(GOLD_PHASES)}")
+    if full_refresh and from_phase != GOLD_PHASES[0]:
+        raise ValueError("full_refresh reloads every phase; it can't start at " + from_phase)
+
+    step_log_id = start_step(conn, run_id, GOLD_STEP)
+    loader = None
 
-        # --------------------------
-        # Full refresh (dev/testing)
-        # --------------------------
+    try:
         if full_refresh:
-            # fact first because of FK constraints
-            cur.execute("DELETE FROM dw.FactEMS_Encounter;")
-
-            # keep UNKNOWN rows in dims (UnknownFlag=1), delete only business rows
-            cur.execute("DELETE FROM dw.DimComplaint WHERE UnknownFlag = 0;")
-            cur.execute("DELETE FROM dw.DimSymptom WHERE UnknownFlag = 0;")
-            cur.execute("DELETE FROM dw.DimProvider WHERE UnknownFlag = 0;")
-            cur.execute("DELETE FROM dw.DimCounty WHERE UnknownFlag = 0;")
-            cur.execute("DELETE FROM dw.DimDisposition WHERE UnknownFlag = 0;")
-            cur.execute("DELETE FROM dw.DimDestinationType WHERE UnknownFlag = 0;")
-
-            # date dim can be rebuilt anytime
-            cur.execute("DELETE FROM dw.DimDate;")
-
-            # optional summary reset (only if the table exists)
-            cur.execute("""
-                IF OBJECT_ID('dw.ems_daily_summary','U') IS NOT NULL
-                    DELETE FROM dw.ems_daily_summary;
-            """)
-            conn.commit()
+            reset_gold(conn)
 
-        # --------------------------
-        # basic counts (for step log)
-        # --------------------------
-        cur.execute("SELECT COUNT(1) FROM silver.ems_clean;")
-        rows_in = int(cur.fetchone()[0])
-
-        # --------------------------
-        # DimDate (build from all datetime columns)
-        # --------------------------
-        cur.execute("""
-        ;WITH d AS (
-            SELECT CAST(IncidentDttm AS date) AS dt FROM silver.ems_clean WHERE IncidentDttm IS NOT NULL
-            UNION
-            SELECT CAST(UnitNotifiedByDispatchDttm AS date) FROM silver.ems_clean WHERE UnitNotifiedByDispatchDttm IS NOT NULL
-            UNION
-            SELECT CAST(UnitArrivedOnSceneDttm AS date) FROM silver.ems_clean WHERE UnitArrivedOnSceneDttm IS NOT NULL
-            UNION
-            SELECT CAST(UnitArrivedToPatientDttm AS date) FROM silver.ems_clean WHERE UnitArrivedToPatientDttm IS NOT NULL
-            UNION
-            SELECT CAST(UnitLeftSceneDttm AS date) FROM silver.ems_clean WHERE UnitLeftSceneDttm IS NOT NULL
-            UNION
-            SELECT CAST(PatientArrivedDestinationDttm AS date) FROM silver.ems_clean WHERE PatientArrivedDestinationDttm IS NOT NULL
-        )
-        INSERT INTO dw.DimDate (DateKey, FullDate, [Year], [Quarter], [Month], [Day], DayOfWeek, DayName, MonthName, IsWeekend)
-        SELECT
-            CONVERT(int, CONVERT(char(8), dt, 112)) AS DateKey,
-            dt AS FullDate,
-            DATEPART(year, dt) AS [Year],
-            DATEPART(quarter, dt) AS [Quarter],
-            DATEPART(month, dt) AS [Month],
-            DATEPART(day, dt) AS [Day],
-            DATEPART(isowk, dt) * 0 + DATEPART(weekday, dt) AS DayOfWeek,  -- simple weekday number
-            DATENAME(weekday, dt) AS DayName,
-            DATENAME(month, dt) AS MonthName,
-            CASE WHEN DATENAME(weekday, dt) IN ('Saturday','Sunday') THEN 1 ELSE 0 END AS IsWeekend
-        FROM (SELECT DISTINCT dt FROM d) x
-        WHERE NOT EXISTS (
-            SELECT 1 FROM dw.DimDate dd
-            WHERE dd.DateKey = CONVERT(int, CONVERT(char(8), x.dt, 112))
-        );
-        """)
-        conn.commit()
+        loader = _GoldLoader(conn, run_id, batch_size, fact_engine, metrics, dim_workers, pool, retry, date_window)
 
-        # --------------------------
-        # cache UNKNOWN keys once
-        # --------------------------
-        cur.execute("SELECT CountyKey FROM dw.DimCounty WHERE UnknownFlag=1;")
-        unk_county = int(cur.fetchone()[0])
-
-        cur.execute("SELECT ComplaintKey FROM dw.DimComplaint WHERE UnknownFlag=1;")
-        unk_complaint = int(cur.fetchone()[0])
-
-        cur.execute("SELECT SymptomKey FROM dw.DimSymptom WHERE UnknownFlag=1;")
-        unk_symptom = int(cur.fetchone()[0])
-
-        cur.execute("SELECT ProviderKey FROM dw.DimProvider WHERE UnknownFlag=1;")
-        unk_provider = int(cur.fetchone()[0])
-
-        cur.execute("SELECT DispositionKey FROM dw.DimDisposition WHERE UnknownFlag=1;")
-        unk_disposition = int(cur.fetchone()[0])
-
-        cur.execute("SELECT DestinationTypeKey FROM dw.DimDestinationType WHERE UnknownFlag=1;")
-        unk_desttype = int(cur.fetchone()[0])
-
-        # --------------------------
-        # load dims (type 1 style)
-        # --------------------------
-        cur.execute("""
-        INSERT INTO dw.DimCounty (CountyName)
-        SELECT DISTINCT s.IncidentCounty
-        FROM silver.ems_clean s
-        WHERE s.IncidentCounty IS NOT NULL
-          AND NOT EXISTS (
-              SELECT 1 FROM dw.DimCounty d WHERE d.CountyName = s.IncidentCounty
-          );
-        """)
-
-        cur.execute("""
-        INSERT INTO dw.DimComplaint (ChiefComplaintDispatch, ChiefComplaintAnatomicLoc)
-        SELECT DISTINCT s.ChiefComplaintDispatch, s.ChiefComplaintAnatomicLoc
-        FROM silver.ems_clean s
-        WHERE (s.ChiefComplaintDispatch IS NOT NULL OR s.ChiefComplaintAnatomicLoc IS NOT NULL)
-          AND NOT EXISTS (
-              SELECT 1
-              FROM dw.DimComplaint d
-              WHERE ISNULL(d.ChiefComplaintDispatch,'') = ISNULL(s.ChiefComplaintDispatch,'')
-                AND ISNULL(d.ChiefComplaintAnatomicLoc,'') = ISNULL(s.ChiefComplaintAnatomicLoc,'')
-          );
-        """)
-
-        cur.execute("""
-        INSERT INTO dw.DimSymptom (PrimarySymptom, ProviderImpressionPrimary)
-        SELECT DISTINCT s.PrimarySymptom, s.ProviderImpressionPrimary
-        FROM silver.ems_clean s
-        WHERE (s.PrimarySymptom IS NOT NULL OR s.ProviderImpressionPrimary IS NOT NULL)
-          AND NOT EXISTS (
-              SELECT 1
-              FROM dw.DimSymptom d
-              WHERE ISNULL(d.PrimarySymptom,'') = ISNULL(s.PrimarySymptom,'')
-                AND ISNULL(d.ProviderImpressionPrimary,'') = ISNULL(s.ProviderImpressionPrimary,'')
-          );
-        """)
-
-        # provider dim is structured for SCD2 later, but for this assignment we load current rows only (type 1 style)
-        cur.execute("""
-        INSERT INTO dw.DimProvider (ProviderTypeStructure, ProviderTypeService, ProviderTypeServiceLevel)
-        SELECT DISTINCT s.ProviderTypeStructure, s.ProviderTypeService, s.ProviderTypeServiceLevel
-        FROM silver.ems_clean s
-        WHERE (s.ProviderTypeStructure IS NOT NULL OR s.ProviderTypeService IS NOT NULL OR s.ProviderTypeServiceLevel IS NOT NULL)
-          AND NOT EXISTS (
-              SELECT 1
-              FROM dw.DimProvider d
-              WHERE d.IsCurrent = 1
-                AND ISNULL(d.ProviderTypeStructure,'') = ISNULL(s.ProviderTypeStructure,'')
-                AND ISNULL(d.ProviderTypeService,'') = ISNULL(s.ProviderTypeService,'')
-                AND ISNULL(d.ProviderTypeServiceLevel,'') = ISNULL(s.ProviderTypeServiceLevel,'')
-          );
-        """)
-
-        # disposition comes from two columns (ED and Hospital) so union them into one dim
-        cur.execute("""
-        INSERT INTO dw.DimDisposition (DispositionName)
-        SELECT DISTINCT x.DispositionName
-        FROM (
-            SELECT s.DispositionED AS DispositionName
-            FROM silver.ems_clean s
-            WHERE s.DispositionED IS NOT NULL
-            UNION
-            SELECT s.DispositionHospital
-            FROM silver.ems_clean s
-            WHERE s.DispositionHospital IS NOT NULL
-        ) x
-        WHERE NOT EXISTS (
-            SELECT 1 FROM dw.DimDisposition d WHERE d.DispositionName = x.DispositionName
-        );
-        """)
-
-        cur.execute("""
-        INSERT INTO dw.DimDestinationType (DestinationTypeName)
-        SELECT DISTINCT s.DestinationType
-        FROM silver.ems_clean s
-        WHERE s.DestinationType IS NOT NULL
-          AND NOT EXISTS (
-              SELECT 1 FROM dw.DimDestinationType d WHERE d.DestinationTypeName = s.DestinationType
-          );
-        """)
-        conn.commit()
+        # find current max silver id so we know when to stop batching (same bound for dims and fact)
+        loader.cur.execute("SELECT COALESCE(MAX(SilverId), 0) FROM silver.ems_clean;")
+        upto = int(loader.cur.fetchone()[0])
 
-        # --------------------------
-        # load fact (dedupe by RecordHash)
-        # --------------------------
-        cur.execute("""
-        INSERT INTO dw.FactEMS_Encounter (
-            IncidentDateKey, UnitNotifiedDateKey, ArrivedSceneDateKey, ArrivedPatientDateKey, LeftSceneDateKey, ArrivedDestinationDateKey,
-            CountyKey, ComplaintKey, SymptomKey, ProviderKey, DispositionEDKey, DispositionHospitalKey, DestinationTypeKey,
-            ProviderToSceneMins, ProviderToDestinationMins, InjuryFlg, NaloxoneGivenFlg, MedicationGivenOtherFlg,
-            RunId, FileName, SourceRowNumber, RecordHash
-        )
-        SELECT
-            CASE WHEN s.IncidentDttm IS NULL THEN NULL ELSE CONVERT(int, CONVERT(char(8), CAST(s.IncidentDttm AS date), 112)) END,
-            CASE WHEN s.UnitNotifiedByDispatchDttm IS NULL THEN NULL ELSE CONVERT(int, CONVERT(char(8), CAST(s.UnitNotifiedByDispatchDttm AS date), 112)) END,
-            CASE WHEN s.UnitArrivedOnSceneDttm IS NULL THEN NULL ELSE CONVERT(int, CONVERT(char(8), CAST(s.UnitArrivedOnSceneDttm AS date), 112)) END,
-            CASE WHEN s.UnitArrivedToPatientDttm IS NULL THEN NULL ELSE CONVERT(int, CONVERT(char(8), CAST(s.UnitArrivedToPatientDttm AS date), 112)) END,
-            CASE WHEN s.UnitLeftSceneDttm IS NULL THEN NULL ELSE CONVERT(int, CONVERT(char(8), CAST(s.UnitLeftSceneDttm AS date), 112)) END,
-            CASE WHEN s.PatientArrivedDestinationDttm IS NULL THEN NULL ELSE CONVERT(int, CONVERT(char(8), CAST(s.PatientArrivedDestinationDttm AS date), 112)) END,
-
-            ISNULL(c.CountyKey, ?) AS CountyKey,
-            ISNULL(cc.ComplaintKey, ?) AS ComplaintKey,
-            ISNULL(sm.SymptomKey, ?) AS SymptomKey,
-            ISNULL(p.ProviderKey, ?) AS ProviderKey,
-            ISNULL(ded.DispositionKey, ?) AS DispositionEDKey,
-            ISNULL(dh.DispositionKey, ?) AS DispositionHospitalKey,
-            ISNULL(dt.DestinationTypeKey, ?) AS DestinationTypeKey,
-
-            s.ProviderToSceneMins,
-            s.ProviderToDestinationMins,
-            s.InjuryFlg,
-            s.NaloxoneGivenFlg,
-            s.MedicationGivenOtherFlg,
-
-            s.RunId,
-            s.FileName,
-            s.SourceRowNum AS SourceRowNumber,  -- fact DDL uses SourceRowNumber
-            s.RecordHash
-        FROM silver.ems_clean s
-        LEFT JOIN dw.DimCounty c
-            ON c.CountyName = s.IncidentCounty
-        LEFT JOIN dw.DimComplaint cc
-            ON ISNULL(cc.ChiefComplaintDispatch,'') = ISNULL(s.ChiefComplaintDispatch,'')
-           AND ISNULL(cc.ChiefComplaintAnatomicLoc,'') = ISNULL(s.ChiefComplaintAnatomicLoc,'')
-        LEFT JOIN dw.DimSymptom sm
-            ON ISNULL(sm.PrimarySymptom,'') = ISNULL(s.PrimarySymptom,'')
-           AND ISNULL(sm.ProviderImpressionPrimary,'') = ISNULL(s.ProviderImpressionPrimary,'')
-        LEFT JOIN dw.DimProvider p
-            ON p.IsCurrent = 1
-           AND ISNULL(p.ProviderTypeStructure,'') = ISNULL(s.ProviderTypeStructure,'')
-           AND ISNULL(p.ProviderTypeService,'') = ISNULL(s.ProviderTypeService,'')
-           AND ISNULL(p.ProviderTypeServiceLevel,'') = ISNULL(s.ProviderTypeServiceLevel,'')
-        LEFT JOIN dw.DimDisposition ded
-            ON ded.DispositionName = s.DispositionED
-        LEFT JOIN dw.DimDisposition dh
-            ON dh.DispositionName = s.DispositionHospital
-        LEFT JOIN dw.DimDestinationType dt
-            ON dt.DestinationTypeName = s.DestinationType
-        WHERE NOT EXISTS (
-            SELECT 1
-            FROM dw.FactEMS_Encounter f
-            WHERE f.RecordHash = s.RecordHash
-        );
-        """,
-        unk_county, unk_complaint, unk_symptom, unk_provider, unk_disposition, unk_disposition, unk_desttype)
+        phases = {
+            "dims": lambda: loader.load_dims_upto(upto),
+            "fact": lambda: loader.load_upto(upto),
+            "summary": loader.daily_summary,
+            "rollups": lambda: (maintain_rollups(conn, rollups, batch_size, metrics, retry), None),
+        }
+        for phase in GOLD_PHASES[GOLD_PHASES.index(from_phase):]:
+            _run_phase(conn, run_id, phase, phases[phase])
 
-        try:
-            rows_out = max(cur.rowcount or 0, 0)
-        except Exception:
-            rows_out = 0
+        metrics.flush(conn)
+        end_step(conn, step_log_id, "SUCCESS", rows_in=loader.rows_in, rows_out=loader.rows_out, rows_reject=0)
 
-        conn.commit()
+    except Exception as ex:
+        _fail_step(conn, step_log_id, loader, metrics, ex)
+        raise
+
+    finally:
+        if loader is not None:
+            loader.close()
+
+
+def run_gold_stream(
+    conn: pyodbc.Connection,
+    run_id: str,
+    silver_ids: queue.Queue,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    fact_engine: str = "sql",
+    metrics: StepMetrics = NULL_METRICS,
+    dim_workers: int = 1,
+    pool: ConnectionPool | None = None,
+    retry: RetryPolicy = DEFAULT_RETRY,
+    rollups=(),
+    date_window: tuple[int, int] = DATE_WINDOW
+) -> None:
+    """
+    Streaming gold consumer (see stream.py): same step as run_gold, but fed by silver as it goes.
+    - silver_ids carries "silver is committed up to this SilverId" marks; None = silver is done
+    - Marks that queued up while a slice was loading are merged, so a lagging consumer catches up in bigger steps
+    - Daily summary rejects + rollups + step end once silver is done
+    """
+    _check_args(fact_engine, dim_workers, pool)
 
-        # --------------------------
-        # optional daily summary 
-        # --------------------------
-        cur.execute("""
-        IF OBJECT_ID('dw.ems_daily_summary','U') IS NOT NULL
-        BEGIN
-            -- rerunnable for same run_id
-            DELETE FROM dw.ems_daily_summary WHERE RunId = ?;
-
-            INSERT INTO dw.ems_daily_summary (RunId, IncidentDate, IncidentCounty, TotalIncidents, InjuryYes, NaloxoneYes)
-            SELECT
-                ?,
-                CAST(IncidentDttm AS date),
-                IncidentCounty,
-                COUNT_BIG(1),
-                SUM(CASE WHEN InjuryFlg = 'Y' THEN 1 ELSE 0 END),
-                SUM(CASE WHEN NaloxoneGivenFlg = 'Y' THEN 1 ELSE 0 END)
-            FROM silver.ems_clean
-            WHERE RunId = ?
-              AND IncidentDttm IS NOT NULL
-            GROUP BY CAST(IncidentDttm AS date), IncidentCounty;
-        END
-        """, run_id, run_id, run_id)
+    step_log_id = start_step(conn, run_id, GOLD_STEP)
+    loader = None
+
+    try:
+        loader = _GoldLoader(conn, run_id, batch_size, fact_engine, metrics, dim_workers, pool, retry, date_window)
+
+        done = False
+        while not done:
+            upto = silver_ids.get()
+            if upto is None:
+                done = True
+            # take everything that's already waiting
+            while not done:
+                try:
+                    nxt = silver_ids.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    done = True
+                else:
+                    upto = max(upto or 0, nxt)
+
+            if upto is not None:
+                loader.load_upto(upto)
+
+        loader.daily_summary()
+        maintain_rollups(conn, rollups, batch_size, metrics, retry)
+
+        metrics.flush(conn)
+        end_step(conn, step_log_id, "SUCCESS", rows_in=loader.rows_in, rows_out=loader.rows_out, rows_reject=0)
+
+    except Exception as ex:
+        _fail_step(conn, step_log_id, loader, metrics, ex)
+        raise
+
+    finally:
+        if loader is not None:
+            loader.close()
+
+
+def rebuild_range(
+    conn: pyodbc.Connection,
+    run_id: str,
+    date_from: int,
+    date_to: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    metrics: StepMetrics = NULL_METRICS,
+    retry: RetryPolicy = DEFAULT_RETRY
+) -> int:
+    """
+    Rebuild the fact rows of the months date_from..date_to (yyyymmdd, widened to whole months) from silver,
+    e.g. after a fix to the fact logic; every other month stays as it is. Returns fact rows loaded.
+    - SQL Server: the months are loaded into dw.FactEMS_Encounter_stage (same partition scheme as the fact), then one short
+      transaction switches each live partition out to _old and the staged one in, and _old is truncated.
+      No logged row deletes, and readers see the old month or the new one, never a gap
+    - duckdb (no partitions): the months are deleted and reloaded in one transaction
+    - Uses silver rows up to the gold watermark with the dims as they are (they already cover that silver)
+    - Rollups: the replaced rows are retracted in the same transaction, the new ones merged right after
+    - Don't run it next to a gold load: rows gold adds to these months between stage and switch would be switched out
+    """
+    key_to_date(date_from), key_to_date(date_to)  # ValueError on anything that isn't a yyyymmdd date
+    if date_to < date_from:
+        raise ValueError("rebuild range: date_to is before date_from")
+    first_key, end_key = month_start(date_from), next_month(date_to)
+
+    step_log_id = start_step(conn, run_id, REBUILD_STEP)
+    removed = rows = 0
+
+    try:
+        cur = conn.cursor()
+        upto = get_last_bronze_id(conn, GOLD_PIPELINE_NAME)
+        unknown = _fact_unknown_params(_get_unknown_keys(cur))
+
+        if dialect_of(conn) == DUCKDB:
+            with metrics.measure(REBUILD_STEP, "delete", first_key, end_key) as m:
+                retract_range(conn, first_key, end_key, metrics)
+                m.rows = removed = execute_rowcount(cur, _REBUILD_DELETE_SQL, first_key, end_key)
+            # the slice insert over all loaded silver: NOT EXISTS skips every row that's still there
+            with metrics.measure(REBUILD_STEP, "fact", first_key, end_key) as m:
+                m.rows = rows = execute_rowcount(cur, duckdb_sql.FACT_SQL, *unknown, 0, upto)
+            conn.commit()
+        else:
+            partitions = range_partitions(cur, first_key, end_key)
+
+            with metrics.measure(REBUILD_STEP, "stage", first_key, end_key) as m:
+                cur.execute(_REBUILD_PREPARE_SQL)
+                m.rows = rows = execute_rowcount(cur, _REBUILD_STAGE_SQL, *unknown, first_key, end_key, upto)
+                conn.commit()
+
+            # rollups + every month + identity in one commit
+            with metrics.measure(REBUILD_STEP, "switch", first_key, end_key) as m:
+                retract_range(conn, first_key, end_key, metrics)
+                for partition in partitions:
+                    cur.execute(switch_sql(partition))
+                cur.execute(_REBUILD_RESEED_SQL)
+                conn.commit()
+                m.rows = len(partitions)
+
+            with metrics.measure(REBUILD_STEP, "truncate_old", first_key, end_key) as m:
+                cur.execute(f"SELECT COUNT_BIG(1) FROM {OLD_TABLE};")
+                m.rows = removed = int(cur.fetchone()[0])
+                cur.execute(f"TRUNCATE TABLE {OLD_TABLE};")
+                conn.commit()
+
+        maintain_rollups(conn, existing_rollups(conn), batch_size, metrics, retry)
+
+        metrics.flush(conn)
+        end_step(conn, step_log_id, "SUCCESS", rows_in=removed, rows_out=rows, rows_reject=0)
+        return rows
+
+    except Exception as ex:
+        _fail_step(conn, step_log_id, None, metrics, ex)
+        raise
+
+
+def _publish_stage(conn: pyodbc.Connection, loader: _GoldLoader, lo: int, upto: int, metrics: StepMetrics) -> tuple[list[int], int, int]:
+    # SQL Server: the partitions the new rows go to, rebuilt in the stage = live rows + new rows. returns (partitions, copied, new)
+    cur = loader.cur
+    partitions = silver_partitions(cur, lo, upto)
+
+    with metrics.measure(PUBLISH_STEP, "copy_live", lo, upto) as m:
+        cur.execute(_REBUILD_PREPARE_SQL)  # empty stage / _old, stage keys continue after the live ones
+        cur.execute(f"SET IDENTITY_INSERT {STAGE_TABLE} ON;")
+        m.rows = copied = sum(execute_rowcount(cur, _PUBLISH_COPY_SQL, p) for p in partitions)
+        cur.execute(f"SET IDENTITY_INSERT {STAGE_TABLE} OFF;")
         conn.commit()
 
-        end_step(conn, step_log_id, "SUCCESS", rows_in=rows_in, rows_out=rows_out, rows_reject=0)
+    # new rows slice by slice (stage isn't visible to anyone, so each slice just commits)
+    unknown = _fact_unknown_params(loader.unknown_keys)
+    new = 0
+    for first, hi, _ in loader.slices(lo, upto):
+        def stage_slice(lo=first, hi=hi) -> int:
+            with metrics.measure(PUBLISH_STEP, "stage", lo, hi) as m:
+                m.rows = staged = execute_rowcount(cur, _PUBLISH_STAGE_SQL, *unknown, lo, hi)
+                conn.commit()
+            return staged
+
+        new += loader.retry.run(stage_slice, conn)
+    return partitions, copied, new
+
+
+def publish_gold(
+    conn: pyodbc.Connection,
+    run_id: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    metrics: StepMetrics = NULL_METRICS,
+    dim_workers: int = 1,
+    pool: ConnectionPool | None = None,
+    retry: RetryPolicy = DEFAULT_RETRY,
+    rollups=(),
+    wait_minutes: int = DEFAULT_SWITCH_WAIT_MINUTES,
+    date_window: tuple[int, int] = DATE_WINDOW
+) -> int:
+    """
+    Blue/green gold load: readers keep seeing the last published fact while the new rows are built and checked,
+    then all of them show up at once. Returns fact rows published.
+    - Dims: the dims phase of run_gold (new members only, Type 1 NOT EXISTS inserts; no fact row points at them yet)
+    - SQL Server: every month partition the new silver rows fall into is rebuilt in dw.FactEMS_Encounter_stage
+      (live rows copied with their EncounterKeys + the new rows), then one short transaction merges the summary,
+      switches the months in and moves the gold watermark. The switch waits at low priority (wait_minutes) behind
+      running queries instead of queueing new ones behind it; readers on snapshot isolation never block
+      (SQL's/DDL/migration - snapshot isolation)
+    - Check before publishing: new rows = silver rows the fact doesn't have yet, stage = copied + new.
+      A mismatch raises ValueError and nothing is published (the stage is emptied by the next run)
+    - duckdb (MVCC, readers never block): all slices in one transaction with the summary and the watermark
+    - Then summary rejects + rollups, as in run_gold
+    - SQL fact engine only; don't run it next to --rebuild-range (same stage table)
+    """
+    step_log_id = start_step(conn, run_id, PUBLISH_STEP)
+    loader = None
+    expected = rows = 0
+
+    try:
+        loader = _GoldLoader(conn, run_id, batch_size, "sql", metrics, dim_workers, pool, retry, date_window)
+        cur = loader.cur
+        cur.execute("SELECT COALESCE(MAX(SilverId), 0) FROM silver.ems_clean;")
+        upto = int(cur.fetchone()[0])
+        lo = loader.last_silver_id
+
+        # dims first (this also splits in the partitions of new years)
+        loader.load_dims_upto(upto)
+
+        if upto > lo:
+            duck = dialect_of(conn) == DUCKDB
+            cur.execute(duckdb_sql.PUBLISH_EXPECTED_SQL if duck else _PUBLISH_EXPECTED_SQL, lo, upto)
+            expected = int(cur.fetchone()[0])
+
+            if duck:
+                with metrics.measure(PUBLISH_STEP, "fact", lo, upto) as m:
+                    m.rows = rows = execute_rowcount(cur, duckdb_sql.FACT_SQL, *_fact_unknown_params(loader.unknown_keys), lo, upto)
+                partitions, copied, staged = [], 0, rows
+            else:
+                partitions, copied, rows = _publish_stage(conn, loader, lo, upto, metrics)
+                cur.execute(f"SELECT COUNT_BIG(1) FROM {STAGE_TABLE};")
+                staged = int(cur.fetchone()[0]) - copied
+
+            if rows != expected or staged != rows:
+                raise ValueError(
+                    f"publish check failed: {rows} new fact rows for {expected} new silver rows "
+                    f"({staged} in stage next to {copied} copied); nothing published"
+                )
+
+            # summary first, then the switches: their schema locks on the fact are only held for the commit
+            with metrics.measure(PUBLISH_STEP, "publish", lo, upto) as m:
+                if loader.summary:
+                    merge_slice(cur, run_id, lo, upto)
+                for partition in partitions:
+                    cur.execute(switch_sql(partition, wait_minutes))
+                if partitions:
+                    cur.execute(_REBUILD_RESEED_SQL)
+                # summary + switches + watermark: nothing is committed before this
+                write_last_bronze_id(conn, upto, GOLD_PIPELINE_NAME)
+                conn.commit()
+                m.rows = len(partitions)
+            loader.last_silver_id = upto
+
+            if partitions:
+                with metrics.measure(PUBLISH_STEP, "truncate_old", lo, upto):
+                    cur.execute(f"TRUNCATE TABLE {OLD_TABLE};")
+                    conn.commit()
+
+        loader.daily_summary()
+        maintain_rollups(conn, rollups, batch_size, metrics, retry)
+
+        metrics.flush(conn)
+        end_step(conn, step_log_id, "SUCCESS", rows_in=expected, rows_out=rows, rows_reject=0)
+        return rows
 
     except Exception as ex:
-        end_step(conn, step_log_id, "FAILED", rows_in=rows_in, rows_out=rows_out, rows_reject=0, error_message=str(ex))
+        _fail_step(conn, step_log_id, None, metrics, ex)
         raise
+
+    finally:
+        if loader is not None:
+            loader.close()
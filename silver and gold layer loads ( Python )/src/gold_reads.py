@@ -0,0 +1,262 @@
+# src/gold_reads.py
+# read-only queries for dashboards over dw.ems_daily_summary, with an in-process result cache:
+# - a fixed set of parameterized queries (daily counts, injury / naloxone rates, response times) -> tuples of NamedTuples
+# - results are kept LRU (max_entries) for at most ttl_seconds
+# - the whole cache is dropped when gold publishes: the count of SUCCESS gold rows in etl.run_step_log (load, phases,
+#   rebuild, publish) is the data version. Checking it is one small query, run before every read by default
+#   (check_seconds=0), so the first read after a publish is a miss. A miss also checks it right after its read, and
+#   only keeps the rows when the version didn't move
+# - check_seconds > 0 is opt-in staleness: the version is checked at most that often, and in between a hit can be a
+#   result from before a publish for up to check_seconds (one round trip per read saved, fresh answers not guaranteed)
+# - stats(): hits / misses / expired / evicted / invalidations + hit_rate
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
+from typing import NamedTuple
+
+from .db import pyodbc, ConnectionPool
+from .daily_summary import summary_enabled
+from .gold import GOLD_STEP, REBUILD_STEP, PUBLISH_STEP, GOLD_PHASES, gold_phase_step
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL_SECONDS = 300.0
+DEFAULT_CHECK_SECONDS = 0.0
+
+# every step whose SUCCESS means gold (and so the summary) changed
+GOLD_STEPS = (GOLD_STEP, REBUILD_STEP, PUBLISH_STEP) + tuple(gold_phase_step(p) for p in GOLD_PHASES)
+
+_VERSION_SQL = f"""
+SELECT COUNT(1)
+FROM etl.run_step_log
+WHERE Status = 'SUCCESS'
+  AND StepName IN ({', '.join('?' for _ in GOLD_STEPS)});
+"""
+
+
+class DailyCount(NamedTuple):
+    incident_date: date
+    county: str
+    encounters: int
+    rejects: int
+
+
+class FlagRates(NamedTuple):
+    county: str
+    encounters: int
+    injury_yes: int
+    naloxone_yes: int
+    injury_rate: float | None
+    naloxone_rate: float | None
+
+
+class ResponseTimes(NamedTuple):
+    county: str
+    scene_count: int
+    scene_avg: float | None
+    scene_min: int | None
+    scene_max: int | None
+    destination_count: int
+    destination_avg: float | None
+    destination_min: int | None
+    destination_max: int | None
+
+
+# query name -> SELECT over the summary; params: first / last IncidentDate (inclusive), {county} = optional filter
+_QUERIES = {
+    "daily_counts": """
+SELECT IncidentDate, IncidentCounty, TotalIncidents, RejectCount
+FROM dw.ems_daily_summary
+WHERE IncidentDate BETWEEN ? AND ?{county}
+ORDER BY IncidentDate, IncidentCounty;
+""",
+    "flag_rates": """
+SELECT IncidentCounty, SUM(TotalIncidents), SUM(InjuryYes), SUM(NaloxoneYes)
+FROM dw.ems_daily_summary
+WHERE IncidentDate BETWEEN ? AND ?{county}
+GROUP BY IncidentCounty
+ORDER BY IncidentCounty;
+""",
+    "response_times": """
+SELECT
+    IncidentCounty,
+    SUM(SceneMinsSum), SUM(SceneMinsCount), MIN(SceneMinsMin), MAX(SceneMinsMax),
+    SUM(DestinationMinsSum), SUM(DestinationMinsCount), MIN(DestinationMinsMin), MAX(DestinationMinsMax)
+FROM dw.ems_daily_summary
+WHERE IncidentDate BETWEEN ? AND ?{county}
+GROUP BY IncidentCounty
+ORDER BY IncidentCounty;
+""",
+}
+
+
+def _ratio(num, den) -> float | None:
+    # rates / averages from the additive sums (the summary keeps sum + count, never a stored average)
+    return float(num) / float(den) if den else None
+
+
+def _daily_count(r) -> DailyCount:
+    return DailyCount(r[0], r[1], int(r[2]), int(r[3]))
+
+
+def _flag_rates(r) -> FlagRates:
+    total, injury, naloxone = int(r[1]), int(r[2]), int(r[3])
+    return FlagRates(r[0], total, injury, naloxone, _ratio(injury, total), _ratio(naloxone, total))
+
+
+def _response_times(r) -> ResponseTimes:
+    scene_n, dest_n = int(r[2]), int(r[6])
+    return ResponseTimes(
+        r[0],
+        scene_n, _ratio(r[1], scene_n), r[3], r[4],
+        dest_n, _ratio(r[5], dest_n), r[7], r[8],
+    )
+
+
+_ROW_TYPES = {"daily_counts": _daily_count, "flag_rates": _flag_rates, "response_times": _response_times}
+
+
+class GoldReads:
+    """
+    Cached dashboard queries over dw.ems_daily_summary.
+    - source: a connection (reads are serialized on it) or a ConnectionPool (one checkout per database read)
+    - answers are shared between callers: tuples of NamedTuples, nothing to mutate
+    - a miss re-checks the version after its read and only caches the rows if it still matches the version seen
+      before the read, so rows read across a publish are returned but never kept
+    - check_seconds: 0 (default) asks for the version before every read; > 0 allows hits up to that old after a publish
+    - invalidate() drops everything now (e.g. right after a gold load in the same process)
+    """
+
+    def __init__(
+        self,
+        source: pyodbc.Connection | ConnectionPool,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        check_seconds: float = DEFAULT_CHECK_SECONDS,
+        clock=time.monotonic
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.source = source
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.check_seconds = check_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn_lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[float, tuple]] = OrderedDict()  # key -> (expires at, rows)
+        self._version: int | None = None
+        self._checked_at: float | None = None
+        self._checked = False  # summary table checked once
+        self._counts = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0, "invalidations": 0, "version_checks": 0}
+
+    # -------- queries
+    def daily_counts(self, date_from: date, date_to: date, county: str | None = None) -> tuple[DailyCount, ...]:
+        # encounters + rejects per (day, county)
+        return self._get("daily_counts", date_from, date_to, county)
+
+    def flag_rates(self, date_from: date, date_to: date, county: str | None = None) -> tuple[FlagRates, ...]:
+        # injury / naloxone yes counts and rates per county over the range
+        return self._get("flag_rates", date_from, date_to, county)
+
+    def response_times(self, date_from: date, date_to: date, county: str | None = None) -> tuple[ResponseTimes, ...]:
+        # provider-to-scene / -destination minutes per county over the range: count, avg, min, max
+        return self._get("response_times", date_from, date_to, county)
+
+    # -------- cache
+    def invalidate(self) -> None:
+        with self._lock:
+            self._drop()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+            entries = len(self._entries)
+        reads = counts["hits"] + counts["misses"]
+        return {**counts, "entries": entries, "hit_rate": round(counts["hits"] / reads, 4) if reads else 0.0}
+
+    def _drop(self) -> None:
+        # caller holds self._lock
+        if self._entries:
+            self._counts["invalidations"] += 1
+        self._entries.clear()
+
+    def _get(self, name: str, date_from: date, date_to: date, county: str | None) -> tuple:
+        key = (name, date_from, date_to, county)
+        version = self._current_version()
+
+        now = self._clock()
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                if hit[0] > now:
+                    self._entries.move_to_end(key)
+                    self._counts["hits"] += 1
+                    return hit[1]
+                del self._entries[key]
+                self._counts["expired"] += 1
+            self._counts["misses"] += 1
+
+        rows = self._read(name, date_from, date_to, county)
+
+        # gold can publish while the read runs (and the check before it may be up to check_seconds old), so ask again
+        # now: if gold published in between, the rows may be from before or after it - return them, but don't keep them
+        after = self._current_version(force=True)
+
+        with self._lock:
+            if after == version and self._version == version:
+                self._entries[key] = (self._clock() + self.ttl_seconds, rows)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counts["evicted"] += 1
+        return rows
+
+    def _current_version(self, force: bool = False) -> int:
+        with self._lock:
+            now = self._clock()
+            if not force and self._checked_at is not None and now - self._checked_at < self.check_seconds:
+                return self._version
+        version = self._query_version()
+        with self._lock:
+            self._counts["version_checks"] += 1
+            if version != self._version:
+                self._drop()
+                self._version = version
+            self._checked_at = self._clock()
+            return self._version
+
+    # -------- database
+    @contextmanager
+    def _cursor(self):
+        if isinstance(self.source, ConnectionPool):
+            with self.source.connection() as conn:
+                yield conn.cursor()
+                conn.rollback()  # read-only; end the transaction before the connection goes back
+        else:
+            with self._conn_lock:
+                try:
+                    yield self.source.cursor()
+                finally:
+                    self.source.rollback()
+
+    def _query_version(self) -> int:
+        with self._cursor() as cur:
+            cur.execute(_VERSION_SQL, *GOLD_STEPS)
+            return int(cur.fetchone()[0])
+
+    def _read(self, name: str, date_from: date, date_to: date, county: str | None) -> tuple:
+        params = [date_from, date_to]
+        where = ""
+        if county is not None:
+            where = "\n  AND IncidentCounty = ?"
+            params.append(county)
+        with self._cursor() as cur:
+            if not self._checked:
+                if not summary_enabled(cur):
+                    raise ValueError("dw.ems_daily_summary isn't deployed; run SQL's/DDL/gold layer daily summary snapshot")
+                self._checked = True
+            cur.execute(_QUERIES[name].format(county=where), *params)
+            make = _ROW_TYPES[name]
+            return tuple(make(r) for r in cur.fetchall())
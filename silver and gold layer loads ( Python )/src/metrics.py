@@ -0,0 +1,150 @@
+# src/metrics.py
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+
+from .db import pyodbc
+
+_INSERT_SQL = """
+INSERT INTO etl.run_step_metric (RunId, StepName, StatementName, LowId, HighId, StartedUtc, DurationMs, RowsAffected, RowsPerSec)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+
+@dataclass
+class StatementMetric:
+    # one timed statement (or one batch of statements) inside a step
+    step_name: str
+    statement: str
+    low_id: int | None = None    # batch bounds (BronzeId for bronze/silver, SilverId for gold)
+    high_id: int | None = None
+    started_utc: datetime | None = None
+    seconds: float = 0.0
+    rows: int | None = None      # set by the caller once the statement has run
+
+    @property
+    def rows_per_sec(self) -> float | None:
+        if self.rows is None or self.seconds <= 0:
+            return None
+        return self.rows / self.seconds
+
+
+class StepMetrics:
+    """
+    Per-statement timing for the pipeline steps.
+    - measure() wraps a statement, caller fills in .rows (rowcount / counts it already has)
+    - flush() writes what's been collected to etl.run_step_metric (to_db) and/or a file:
+      *.prom = Prometheus textfile (totals per step/statement, rewritten each flush), anything else = JSON lines
+    - Thread-safe, so parallel silver workers can share one instance
+    """
+
+    enabled = True
+
+    def __init__(self, run_id: str, to_db: bool = False, path: str | None = None):
+        self.run_id = run_id
+        self.to_db = to_db
+        self.path = path
+        self._pending: list[StatementMetric] = []
+        self._totals: dict[tuple[str, str], list[float]] = {}  # (step, statement) -> [executions, seconds, rows]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, step_name: str, statement: str, low_id: int | None = None, high_id: int | None = None):
+        m = StatementMetric(step_name, statement, low_id, high_id, datetime.now(timezone.utc))
+        t0 = time.perf_counter()
+        try:
+            yield m
+        finally:
+            m.seconds = time.perf_counter() - t0
+            with self._lock:
+                self._pending.append(m)
+
+    def flush(self, conn: pyodbc.Connection) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+            # totals are rolled up here (not in measure) since callers may set .rows after the block exits
+            for m in pending:
+                t = self._totals.setdefault((m.step_name, m.statement), [0, 0.0, 0])
+                t[0] += 1
+                t[1] += m.seconds
+                t[2] += m.rows or 0
+            totals = {k: list(v) for k, v in self._totals.items()}
+
+        if self.to_db and pending:
+            cur = conn.cursor()
+            cur.fast_executemany = True
+            cur.executemany(_INSERT_SQL, [
+                (
+                    self.run_id, m.step_name, m.statement, m.low_id, m.high_id,
+                    m.started_utc.replace(tzinfo=None), round(m.seconds * 1000, 3), m.rows,
+                    None if m.rows_per_sec is None else round(m.rows_per_sec, 1),
+                )
+                for m in pending
+            ])
+            conn.commit()
+
+        if self.path:
+            if self.path.endswith(".prom"):
+                self._write_prometheus(totals)
+            elif pending:
+                self._write_jsonl(pending)
+
+    def _write_jsonl(self, pending: list[StatementMetric]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for m in pending:
+                rec = asdict(m)
+                rec["run_id"] = self.run_id
+                rec["started_utc"] = m.started_utc.isoformat()
+                rec["rows_per_sec"] = m.rows_per_sec
+                f.write(json.dumps(rec) + "\n")
+
+    def _write_prometheus(self, totals: dict[tuple[str, str], list[float]]) -> None:
+        lines = []
+        for name, idx, help_text in (
+            ("ems_etl_statement_executions_total", 0, "Statements executed"),
+            ("ems_etl_statement_seconds_total", 1, "Wall time spent in the statement"),
+            ("ems_etl_statement_rows_total", 2, "Rows affected by the statement"),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (step_name, statement), t in sorted(totals.items()):
+                lines.append(f'{name}{{step="{step_name}",statement="{statement}"}} {t[idx]}')
+
+        # textfile collectors may read at any time -> write to a temp file and swap it in
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, self.path)
+
+
+class _NoMetric:
+    # absorbs `m.rows = ...` when metrics are off
+    __slots__ = ("rows",)
+
+
+class _NullMetrics:
+    """Metrics turned off: measure() is a shared no-op context, flush() does nothing."""
+
+    enabled = False
+
+    def __init__(self):
+        self._m = _NoMetric()
+
+    def __enter__(self):
+        return self._m
+
+    def __exit__(self, *exc):
+        return False
+
+    def measure(self, step_name: str, statement: str, low_id: int | None = None, high_id: int | None = None):
+        return self
+
+    def flush(self, conn: pyodbc.Connection) -> None:
+        pass
+
+
+NULL_METRICS = _NullMetrics()
@@ -0,0 +1,433 @@
+# src/rollups.py
+# Aggregate tables over the gold star (dw.rollup_<grain>_<dims>) + a router that answers a grain from the smallest one.
+# - declared as "grain:dim,dim" specs (DEFAULT_ROLLUPS, or --rollups / config)
+# - maintained at the end of every gold run from ONE scan of the fact rows added since the last run (EncounterKey
+#   watermark): the new rows are aggregated once to day x county x provider x complaint, every rollup is merged from that
+# - measures are additive only (counts + sums + non-NULL counts), so any coarser answer is a plain SUM over a finer rollup
+from dataclasses import dataclass
+
+from .db import pyodbc, RetryPolicy, DEFAULT_RETRY, execute_rowcount
+from .watermark import get_last_bronze_id, set_last_bronze_id, write_last_bronze_id, ROLLUP_PIPELINE_NAME
+from .dialect import TSQL, DUCKDB, dialect_of
+from .metrics import StepMetrics, NULL_METRICS
+
+ROLLUP_STEP = "ROLLUPS"
+
+# finest -> coarsest; a rollup can answer its own grain and anything it rolls up to
+TIME_GRAINS = ("day", "week", "month")
+_ROLLS_UP_TO = {"day": ("day", "week", "month"), "week": ("week",), "month": ("month",)}
+
+# rollup dim name -> fact surrogate key column
+ROLLUP_DIMS = {"county": "CountyKey", "provider": "ProviderKey", "complaint": "ComplaintKey"}
+
+# measure column -> aggregate over fact rows ({a} = fact alias); rollups and router both just SUM these
+_MEASURES = {
+    "Encounters": "COUNT(*)",
+    "InjuryYes": "SUM(CASE WHEN {a}.InjuryFlg = 'Y' THEN 1 ELSE 0 END)",
+    "NaloxoneYes": "SUM(CASE WHEN {a}.NaloxoneGivenFlg = 'Y' THEN 1 ELSE 0 END)",
+    "MedicationYes": "SUM(CASE WHEN {a}.MedicationGivenOtherFlg = 'Y' THEN 1 ELSE 0 END)",
+    "SceneMinsSum": "COALESCE(SUM(CAST({a}.ProviderToSceneMins AS BIGINT)), 0)",
+    "SceneMinsCount": "COUNT({a}.ProviderToSceneMins)",
+    "DestinationMinsSum": "COALESCE(SUM(CAST({a}.ProviderToDestinationMins AS BIGINT)), 0)",
+    "DestinationMinsCount": "COUNT({a}.ProviderToDestinationMins)",
+}
+
+
+def _fact_measures(a: str) -> list[str]:
+    return [f"{sql.format(a=a)} AS {m}" for m, sql in _MEASURES.items()]
+
+
+@dataclass(frozen=True)
+class RollupSpec:
+    # one aggregate table: time grain + the dims it keeps (always in ROLLUP_DIMS order)
+    grain: str
+    dims: tuple[str, ...]
+
+    @property
+    def name(self) -> str:
+        return "_".join((self.grain, *self.dims))
+
+    @property
+    def table(self) -> str:
+        return f"dw.rollup_{self.name}"
+
+    def can_answer(self, grain: str, dims) -> bool:
+        return grain in _ROLLS_UP_TO[self.grain] and set(dims) <= set(self.dims)
+
+
+def parse_rollup(text: str) -> RollupSpec:
+    """'month:county,provider' -> RollupSpec('month', ('county', 'provider')). A bare grain ('week') = no dims."""
+    grain, _, dims_text = text.strip().partition(":")
+    dims = {d.strip() for d in dims_text.split(",") if d.strip()}
+    if grain not in TIME_GRAINS:
+        raise ValueError(f"rollup grain must be one of {TIME_GRAINS}, got {grain!r}")
+    unknown = dims - set(ROLLUP_DIMS)
+    if unknown:
+        raise ValueError(f"rollup dims must be from {tuple(ROLLUP_DIMS)}, got {', '.join(sorted(unknown))}")
+    return RollupSpec(grain, tuple(d for d in ROLLUP_DIMS if d in dims))
+
+
+DEFAULT_ROLLUPS = tuple(parse_rollup(t) for t in (
+    "day:county",
+    "day:provider",
+    "day:complaint",
+    "week:county,provider,complaint",
+    "month:county,provider,complaint",
+))
+
+
+def route(grain: str, dims=(), specs=DEFAULT_ROLLUPS) -> RollupSpec | None:
+    """
+    Smallest rollup that can answer `grain` x `dims`, None = only the fact can.
+    Smallest = fewest dims first, then the coarsest grain (both shrink the row count, dims far more than time).
+    """
+    if grain not in TIME_GRAINS:
+        raise ValueError(f"grain must be one of {TIME_GRAINS}, got {grain!r}")
+    candidates = [s for s in specs if s.can_answer(grain, dims)]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda s: (len(s.dims), -TIME_GRAINS.index(s.grain)))
+
+
+# --------------------------
+# SQL text (per dialect: period math, temp table, upsert)
+# --------------------------
+def _period_sql(grain: str, d: str, dialect: str) -> str:
+    # DateKey (yyyymmdd) of the period start, from a DimDate row `d`: the day itself / ISO Monday / 1st of the month
+    if grain == "day":
+        return f"{d}.DateKey"
+    if dialect == DUCKDB:
+        if grain == "week":
+            return f"CAST(strftime({d}.FullDate - CAST({d}.DayOfWeek - 1 AS INTEGER), '%Y%m%d') AS INTEGER)"
+        return f'{d}."Year" * 10000 + {d}."Month" * 100 + 1'
+    if grain == "week":
+        return f"CONVERT(INT, CONVERT(CHAR(8), DATEADD(DAY, 1 - {d}.DayOfWeek, {d}.FullDate), 112))"
+    return f"{d}.[Year] * 10000 + {d}.[Month] * 100 + 1"
+
+
+def _key_cols(spec: RollupSpec) -> list[str]:
+    return ["PeriodKey"] + [ROLLUP_DIMS[d] for d in spec.dims]
+
+
+def _create_sql(spec: RollupSpec, dialect: str) -> str:
+    measures = ",\n    ".join(f"{m} BIGINT NOT NULL" for m in _MEASURES)
+    keys = ",\n    ".join(f"{c} INT NOT NULL" for c in _key_cols(spec))
+    if dialect == DUCKDB:
+        return f"""
+        CREATE TABLE IF NOT EXISTS {spec.table} (
+            {keys},
+            {measures},
+            LoadUtc TIMESTAMP NOT NULL DEFAULT timezone('UTC', now()),
+            PRIMARY KEY ({', '.join(_key_cols(spec))})
+        );
+        """
+    return f"""
+    CREATE TABLE {spec.table} (
+        {keys},
+        {measures},
+        LoadUtc DATETIME2(3) NOT NULL DEFAULT SYSUTCDATETIME(),
+        CONSTRAINT PK_rollup_{spec.name} PRIMARY KEY CLUSTERED ({', '.join(_key_cols(spec))})
+    );
+    """
+
+
+# fact rows of one maintenance chunk: EncounterKey > ? AND <= ?
+_CHUNK_WHERE = "f.EncounterKey > ? AND f.EncounterKey <= ?"
+
+# fact rows of a rebuilt date range that were already rolled up: IncidentDateKey >= ? AND < ?, EncounterKey <= ? (watermark)
+_RETRACT_WHERE = "f.IncidentDateKey >= ? AND f.IncidentDateKey < ? AND f.EncounterKey <= ?"
+
+
+def _delta_sql(dialect: str, where: str = _CHUNK_WHERE) -> str:
+    # the one fact scan per chunk: fact rows matching `where` at the finest grain every rollup can be built from
+    keys = ", ".join(f"f.{c}" for c in ROLLUP_DIMS.values())
+    measures = ",\n        ".join(_fact_measures("f"))
+    select = f"""
+    SELECT
+        f.IncidentDateKey AS DateKey, {keys},
+        {measures}
+    {{into}}
+    FROM dw.FactEMS_Encounter f
+    WHERE {where}
+      AND f.IncidentDateKey IS NOT NULL
+    GROUP BY f.IncidentDateKey, {keys}
+    """
+    if dialect == DUCKDB:
+        return f"CREATE OR REPLACE TEMP TABLE rollup_delta AS {select.format(into='')};"
+    return f"""
+    IF OBJECT_ID('tempdb..#rollup_delta') IS NOT NULL
+        DROP TABLE #rollup_delta;
+    {select.format(into='INTO #rollup_delta')};
+    """
+
+
+def _source_sql(spec: RollupSpec, source: str, dialect: str) -> str:
+    # rows of `spec` aggregated from `source`: "delta" (this chunk) or "fact" (backfill of a new rollup, param = max EncounterKey)
+    period = _period_sql(spec.grain, "d", dialect)
+    if source == "fact":
+        a = "f"
+        src = "dw.FactEMS_Encounter f\n    JOIN dw.DimDate d ON d.DateKey = f.IncidentDateKey"
+        measures = _fact_measures(a)
+        where = "WHERE f.EncounterKey <= ?"
+    else:
+        a = "x"
+        src = ("rollup_delta" if dialect == DUCKDB else "#rollup_delta") + " x\n    JOIN dw.DimDate d ON d.DateKey = x.DateKey"
+        measures = [f"SUM(x.{m}) AS {m}" for m in _MEASURES]
+        where = ""
+    dims = [f"{a}.{ROLLUP_DIMS[d]}" for d in spec.dims]
+    return f"""
+    SELECT {', '.join([period + ' AS PeriodKey'] + dims + measures)}
+    FROM {src}
+    {where}
+    GROUP BY {', '.join([period] + dims)}
+    """
+
+
+def _merge_sql(spec: RollupSpec, dialect: str) -> str:
+    keys = _key_cols(spec)
+    cols = keys + list(_MEASURES)
+    if dialect == DUCKDB:
+        sets = ",\n            ".join(f"{m} = {m} + excluded.{m}" for m in _MEASURES)
+        return f"""
+        INSERT INTO {spec.table} ({', '.join(cols)})
+        {_source_sql(spec, "delta", dialect)}
+        ON CONFLICT ({', '.join(keys)}) DO UPDATE SET
+            {sets},
+            LoadUtc = timezone('UTC', now());
+        """
+    on = " AND ".join(f"t.{c} = s.{c}" for c in keys)
+    sets = ",\n        ".join(f"{m} = t.{m} + s.{m}" for m in _MEASURES)
+    return f"""
+    MERGE {spec.table} WITH (HOLDLOCK) AS t
+    USING ({_source_sql(spec, "delta", dialect)}) AS s
+        ON {on}
+    WHEN MATCHED THEN UPDATE SET
+        {sets},
+        LoadUtc = SYSUTCDATETIME()
+    WHEN NOT MATCHED THEN INSERT ({', '.join(cols)})
+    VALUES ({', '.join('s.' + c for c in cols)});
+    """
+
+
+# fact rows in the current delta
+_DELTA_ROWS_SQL = {
+    TSQL: "SELECT COALESCE(SUM(Encounters), 0) FROM #rollup_delta;",
+    DUCKDB: "SELECT COALESCE(SUM(Encounters), 0) FROM rollup_delta;",
+}
+
+
+def _retract_sql(spec: RollupSpec, dialect: str) -> str:
+    # subtract the delta from the rows it was added to (they all exist: these fact rows were rolled up before)
+    on = " AND ".join(f"t.{c} = s.{c}" for c in _key_cols(spec))
+    if dialect == DUCKDB:
+        sets = ",\n            ".join(f"{m} = t.{m} - s.{m}" for m in _MEASURES)
+        return f"""
+        UPDATE {spec.table} AS t SET
+            {sets},
+            LoadUtc = timezone('UTC', now())
+        FROM ({_source_sql(spec, "delta", dialect)}) AS s
+        WHERE {on};
+        DELETE FROM {spec.table} WHERE Encounters = 0;
+        """
+    sets = ",\n        ".join(f"{m} = t.{m} - s.{m}" for m in _MEASURES)
+    return f"""
+    UPDATE t SET
+        {sets},
+        LoadUtc = SYSUTCDATETIME()
+    FROM {spec.table} t
+    JOIN ({_source_sql(spec, "delta", dialect)}) AS s
+        ON {on};
+    DELETE FROM {spec.table} WHERE Encounters = 0;
+    """
+
+
+def _table_exists(cur: pyodbc.Cursor, spec: RollupSpec) -> bool:
+    if dialect_of(cur) == DUCKDB:
+        cur.execute(
+            "SELECT count(*) FROM information_schema.tables WHERE table_schema = 'dw' AND table_name = ?;",
+            f"rollup_{spec.name}"
+        )
+        return int(cur.fetchone()[0]) > 0
+    cur.execute("SELECT OBJECT_ID(?, 'U');", spec.table)
+    return cur.fetchone()[0] is not None
+
+
+def _rollup_tables(cur: pyodbc.Cursor) -> list[str]:
+    # every dw.rollup_* table that exists, declared in this run or not
+    if dialect_of(cur) == DUCKDB:
+        cur.execute(
+            "SELECT table_name FROM information_schema.tables WHERE table_schema = 'dw' AND table_name LIKE 'rollup\\_%' ESCAPE '\\';"
+        )
+    else:
+        cur.execute("SELECT name FROM sys.tables WHERE schema_id = SCHEMA_ID('dw') AND name LIKE 'rollup[_]%';")
+    return [f"dw.{r[0]}" for r in cur.fetchall()]
+
+
+# --------------------------
+# maintenance
+# --------------------------
+def ensure_rollups(conn: pyodbc.Connection, specs, metrics: StepMetrics = NULL_METRICS) -> None:
+    """
+    Create missing rollup tables. A new table is backfilled from the fact up to the rollup watermark
+    in the same commit, so a rollup added later starts out as complete as the others.
+    """
+    cur = conn.cursor()
+    dialect = dialect_of(conn)
+    upto = get_last_bronze_id(conn, ROLLUP_PIPELINE_NAME)
+    for spec in specs:
+        if _table_exists(cur, spec):
+            continue
+        with metrics.measure(ROLLUP_STEP, f"create:{spec.name}", 0, upto) as m:
+            cur.execute(_create_sql(spec, dialect))
+            m.rows = execute_rowcount(
+                cur,
+                f"INSERT INTO {spec.table} ({', '.join(_key_cols(spec) + list(_MEASURES))})" + _source_sql(spec, "fact", dialect) + ";",
+                upto
+            )
+            conn.commit()
+
+
+def maintain_rollups(
+    conn: pyodbc.Connection,
+    specs,
+    batch_size: int,
+    metrics: StepMetrics = NULL_METRICS,
+    retry: RetryPolicy = DEFAULT_RETRY
+) -> int:
+    """
+    Merge fact rows added since the last call into every rollup in `specs` and every dw.rollup_* table that already
+    exists. Returns fact rows rolled up.
+    - The watermark is shared, so all existing tables move with it whether this run declared them or not
+      (a run with fewer --rollups, or none, doesn't leave the others behind for good while route() still reads them)
+    - One scan of the new fact rows per EncounterKey chunk (batch_size keys): aggregated once into a delta, every rollup
+      is merged from the (small) delta
+    - Each chunk commits with the rollup watermark, so a failed run resumes at the first unmerged chunk
+      (and a retried chunk can't be added twice)
+    """
+    ensure_rollups(conn, specs, metrics)
+    specs = tuple(dict.fromkeys((*specs, *existing_rollups(conn))))
+    if not specs:
+        return 0
+
+    cur = conn.cursor()
+    dialect = dialect_of(conn)
+    delta_sql = _delta_sql(dialect)
+    delta_rows_sql = _DELTA_ROWS_SQL[dialect]
+    merge_sql = [(spec, _merge_sql(spec, dialect)) for spec in specs]
+
+    def chunk(lo: int, hi: int) -> int:
+        with metrics.measure(ROLLUP_STEP, "delta", lo, hi) as m:
+            cur.execute(delta_sql, lo, hi)
+            cur.execute(delta_rows_sql)
+            m.rows = fact_rows = int(cur.fetchone()[0])
+        for spec, sql in merge_sql:
+            with metrics.measure(ROLLUP_STEP, f"merge:{spec.name}", lo, hi):
+                cur.execute(sql)
+        # all rollups + the watermark in one commit
+        write_last_bronze_id(conn, hi, ROLLUP_PIPELINE_NAME)
+        conn.commit()
+        return fact_rows
+
+    last = get_last_bronze_id(conn, ROLLUP_PIPELINE_NAME)
+    cur.execute("SELECT COALESCE(MAX(EncounterKey), 0) FROM dw.FactEMS_Encounter;")
+    max_key = int(cur.fetchone()[0])
+
+    rows = 0
+    while last < max_key:
+        hi = min(last + batch_size, max_key)
+        rows += retry.run(lambda: chunk(last, hi), conn)
+        last = hi
+    return rows
+
+
+def existing_rollups(conn: pyodbc.Connection) -> tuple[RollupSpec, ...]:
+    # specs of every dw.rollup_* table in the database (their names are the spec: rollup_<grain>_<dims>)
+    specs = []
+    for table in _rollup_tables(conn.cursor()):
+        grain, *dims = table[len("dw.rollup_"):].split("_")
+        specs.append(parse_rollup(f"{grain}:{','.join(dims)}"))
+    return tuple(specs)
+
+
+def retract_range(conn: pyodbc.Connection, first_key: int, end_key: int, metrics: StepMetrics = NULL_METRICS) -> int:
+    """
+    Take the fact rows with first_key <= IncidentDateKey < end_key back out of every rollup (before those rows are replaced).
+    - Only rows at or below the rollup watermark are in the rollups; the replacements get new EncounterKeys, so the next
+      maintain_rollups adds them like any new rows
+    - Doesn't commit: the caller commits together with the fact change. Returns fact rows retracted.
+    """
+    specs = existing_rollups(conn)
+    if not specs:
+        return 0
+    cur = conn.cursor()
+    dialect = dialect_of(conn)
+    upto = get_last_bronze_id(conn, ROLLUP_PIPELINE_NAME)
+    with metrics.measure(ROLLUP_STEP, "retract:delta", first_key, end_key) as m:
+        cur.execute(_delta_sql(dialect, _RETRACT_WHERE), first_key, end_key, upto)
+        cur.execute(_DELTA_ROWS_SQL[dialect])
+        m.rows = rows = int(cur.fetchone()[0])
+    for spec in specs:
+        with metrics.measure(ROLLUP_STEP, f"retract:{spec.name}", first_key, end_key):
+            cur.execute(_retract_sql(spec, dialect))
+    return rows
+
+
+def reset_rollups(conn: pyodbc.Connection) -> None:
+    """Empty every rollup table and move the rollup watermark back to 0 (gold full refresh)."""
+    cur = conn.cursor()
+    for table in _rollup_tables(cur):
+        cur.execute(f"DELETE FROM {table};")
+    conn.commit()
+    set_last_bronze_id(conn, 0, ROLLUP_PIPELINE_NAME)
+
+
+# --------------------------
+# router
+# --------------------------
+def query_sql(grain: str, dims, spec: RollupSpec | None, dialect: str) -> str:
+    """
+    SELECT for `grain` x `dims` from `spec` (None = straight from the fact).
+    Params: period start DateKey from / to (inclusive). Columns: PeriodKey, the dim keys, every measure.
+    """
+    dim_cols = [ROLLUP_DIMS[d] for d in ROLLUP_DIMS if d in set(dims)]
+    period = _period_sql(grain, "d", dialect)
+    if spec is None:
+        src = "dw.FactEMS_Encounter r\nJOIN dw.DimDate d ON d.DateKey = r.IncidentDateKey"
+        measures = _fact_measures("r")
+    elif spec.grain == grain:
+        # already at the grain: PeriodKey as stored (a week's Monday isn't always a loaded DimDate row)
+        period = "r.PeriodKey"
+        src = spec.table + " r"
+        measures = [f"SUM(r.{m}) AS {m}" for m in _MEASURES]
+    else:
+        # day rollup -> map each day to the requested period start
+        src = f"{spec.table} r\nJOIN dw.DimDate d ON d.DateKey = r.PeriodKey"
+        measures = [f"SUM(r.{m}) AS {m}" for m in _MEASURES]
+    group = ", ".join([period] + [f"r.{c}" for c in dim_cols])
+    return f"""
+SELECT {', '.join([period + ' AS PeriodKey'] + [f'r.{c}' for c in dim_cols] + measures)}
+FROM {src}
+WHERE {period} BETWEEN ? AND ?
+GROUP BY {group}
+ORDER BY {group};
+"""
+
+
+def query(
+    conn: pyodbc.Connection,
+    grain: str,
+    dims=(),
+    date_from: int = 19000101,
+    date_to: int = 99991231,
+    specs=DEFAULT_ROLLUPS
+) -> list:
+    """
+    Encounter measures at `grain` x `dims` for periods starting between date_from and date_to (yyyymmdd),
+    answered from the smallest rollup in `specs` that can (falls back to the fact).
+    """
+    unknown = set(dims) - set(ROLLUP_DIMS)
+    if unknown:
+        raise ValueError(f"dims must be from {tuple(ROLLUP_DIMS)}, got {', '.join(sorted(unknown))}")
+    cur = conn.cursor()
+    cur.execute(query_sql(grain, dims, route(grain, dims, specs), dialect_of(conn)), date_from, date_to)
+    return cur.fetchall()
@@ -0,0 +1,63 @@
+from .db import pyodbc
+from .dialect import DUCKDB, dialect_of
+from . import duckdb_sql
+
+
+def start_run(conn: pyodbc.Connection, run_id: str, file_name: str) -> None:
+    # same statement as the SSIS RunAuditStart task (CAST also rejects a RunId that isn't a GUID)
+    cur = conn.cursor()
+    if dialect_of(conn) == DUCKDB:
+        cur.execute(duckdb_sql.START_RUN_SQL, run_id, file_name)
+        conn.commit()
+        return
+
+    cur.execute(
+        """
+        INSERT INTO etl.run_audit (RunId, StartedUtc, Status, FileName)
+        VALUES (CAST(? AS uniqueidentifier), SYSUTCDATETIME(), 'RUNNING', ?);
+        """,
+        run_id, file_name
+    )
+    conn.commit()
+
+
+def end_run(
+    conn: pyodbc.Connection,
+    run_id: str,
+    status: str,
+    rows_bronze: int | None = None,
+    error_message: str | None = None
+) -> None:
+    # close the run header (SUCCESS/FAILED + bronze row count), like the SSIS RunAuditEnd task
+    cur = conn.cursor()
+    if dialect_of(conn) == DUCKDB:
+        cur.execute(duckdb_sql.END_RUN_SQL, status, rows_bronze, error_message, run_id)
+        conn.commit()
+        return
+
+    cur.execute(
+        """
+        UPDATE etl.run_audit
+        SET EndedUtc = SYSUTCDATETIME(),
+            Status = ?,
+            RowsBronze = ?,
+            ErrorMessage = ?
+        WHERE RunId = ?;
+        """,
+        status, rows_bronze, error_message, run_id
+    )
+    conn.commit()
+
+
+def run_status(conn: pyodbc.Connection, run_id: str) -> str | None:
+    # Status of the run header (RUNNING/SUCCESS/FAILED), None if this RunId never loaded bronze
+    cur = conn.cursor()
+    if dialect_of(conn) == DUCKDB:
+        cur.execute(duckdb_sql.RUN_STATUS_SQL, run_id)
+    else:
+        cur.execute(
+            "SELECT Status FROM etl.run_audit WHERE RunId = CAST(CAST(? AS uniqueidentifier) AS NVARCHAR(36));",
+            run_id
+        )
+    row = cur.fetchone()
+    return row[0] if row else None
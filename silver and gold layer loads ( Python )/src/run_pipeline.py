@@ -3,46 +3,350 @@ import json
 import os
 import sys
 
-from .db import connect
-from .silver import run_silver
-from .gold import run_gold
+from .db import connect, ConnectionPool, RetryPolicy
+from .bronze import load_file
+from .metrics import StepMetrics, NULL_METRICS
+from .dq_profile import SilverProfile, NULL_PROFILE
+from .batch_sizer import AdaptiveBatchSize, DEFAULT_TARGET_SECONDS, DEFAULT_MIN_BATCH_SIZE, DEFAULT_MAX_BATCH_SIZE
+from .stream import run_streaming, DEFAULT_QUEUE_SIZE
+from .silver import run_silver, check_engine_parity, SILVER_ENGINES, SILVER_STEP
+from .gold import run_gold, rebuild_range, publish_gold, FACT_ENGINES, GOLD_PHASES, gold_phase_step, DEFAULT_SWITCH_WAIT_MINUTES
+from .run_audit import run_status
+from .step_log import succeeded_steps
+from .watermark import get_last_bronze_id, BRONZE_ARCHIVE_PIPELINE_NAME
+from .dialect import BACKENDS
+from .rollups import DEFAULT_ROLLUPS, parse_rollup, route, query
+from .config import load_config
+from .date_window import DATE_WINDOW, check_date_window
 
+# --resume / --from-step units, in run order (gold is split into its phases)
+RUN_STEPS = ("bronze", "silver", *GOLD_PHASES)
 
-def parse_args():
+
+def parse_args(argv=None):
     # CLI args so SSIS (or cmd) can trigger the same pipeline without code changes
     p = argparse.ArgumentParser()
-    p.add_argument("--conn", required=True, help="ODBC connection string for SQL Server")
-    p.add_argument("--run-id", required=True, help="RunId (GUID string) used for step logging")
+    p.add_argument("--config",
+                   help="JSON config (see config.example.json): SQL Server connection, run_id and option defaults; "
+                        "flags given on the command line win")
+    p.add_argument("--conn",
+                   help="ODBC connection string for SQL Server (--backend duckdb: path of the DuckDB database file)")
+    p.add_argument("--backend", choices=sorted(BACKENDS), default="sqlserver",
+                   help="Where the pipeline runs: SQL Server (default) or an embedded DuckDB file for local runs (needs duckdb)")
+    p.add_argument("--import-silver",
+                   help="--backend duckdb: replace silver with this Parquet export of silver.ems_clean first (gold then rebuilds locally)")
+    p.add_argument("--run-id", help="RunId (GUID string) used for step logging")
     p.add_argument("--full-refresh", action="store_true",
                    help="Rebuild silver & gold from scratch and reset watermark")
+    p.add_argument("--load-file",
+                   help="Load this EMS CSV into bronze (+ etl.run_audit) first, instead of the SSIS data flow")
     p.add_argument("--silver-only", action="store_true", help="Run only the silver step")
     p.add_argument("--gold-only", action="store_true", help="Run only the gold step")
+    p.add_argument("--resume", action="store_true",
+                   help="Rerun of --run-id: skip the steps it already finished (etl.run_audit / etl.run_step_log) "
+                        "and start at the first one that didn't")
+    p.add_argument("--from-step", choices=RUN_STEPS,
+                   help="Start at this step and run the ones after it (gold phases: dims, fact, summary, rollups)")
     p.add_argument("--batch-size", type=int, default=50000,
-                   help="Bronze batch size per loop (default 50000)")
-    return p.parse_args()
+                   help="Bronze/silver batch size per loop (default 50000)")
+    p.add_argument("--adaptive-batch", action="store_true",
+                   help="Silver: resize every batch toward --target-batch-seconds (--batch-size is the starting size)")
+    p.add_argument("--target-batch-seconds", type=float, default=DEFAULT_TARGET_SECONDS,
+                   help=f"--adaptive-batch target wall time per silver batch (default {DEFAULT_TARGET_SECONDS})")
+    p.add_argument("--min-batch-size", type=int, default=DEFAULT_MIN_BATCH_SIZE,
+                   help=f"--adaptive-batch lower bound (default {DEFAULT_MIN_BATCH_SIZE})")
+    p.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                   help=f"--adaptive-batch upper bound (default {DEFAULT_MAX_BATCH_SIZE})")
+    p.add_argument("--workers", type=int, default=1,
+                   help="Parallel silver workers, each on its own pooled connection (default 1 = serial)")
+    p.add_argument("--dim-workers", type=int, default=1,
+                   help="Gold: load DimDate + the six dims of each slice concurrently on this many pooled connections (default 1)")
+    p.add_argument("--engine", choices=SILVER_ENGINES, default="sql",
+                   help="Silver stage engine: one T-SQL statement (default) or arrow = vectorized python (needs pyarrow)")
+    p.add_argument("--check-parity", action="store_true",
+                   help="Stage the next pending bronze batch with both silver engines, compare, print the result and exit")
+    p.add_argument("--fact-engine", choices=FACT_ENGINES, default="sql",
+                   help="Gold fact step: set-based SQL joins (default) or python dim key cache + bulk insert")
+    p.add_argument("--stream", action="store_true",
+                   help="Run silver and gold together: each committed silver batch is loaded into gold right away")
+    p.add_argument("--stream-queue", type=int, default=DEFAULT_QUEUE_SIZE,
+                   help=f"--stream backpressure: silver batches gold may fall behind (default {DEFAULT_QUEUE_SIZE})")
+    p.add_argument("--retries", type=int, default=3,
+                   help="Retry a batch/slice this many times on deadlocks, timeouts and dropped connections (default 3, 0 = off)")
+    p.add_argument("--pool-stats", action="store_true",
+                   help="Print connection pool stats (checkouts, waits, discarded connections) and retries at the end")
+    p.add_argument("--metrics", action="store_true",
+                   help="Record per-statement timings / rows / rows-per-sec in etl.run_step_metric")
+    p.add_argument("--profile", action="store_true",
+                   help="Silver: collect a per column data-quality profile from every batch into etl.silver_profile "
+                        "(nulls, blanks, parse failures, flag counts, min/max, approx distinct)")
+    p.add_argument("--metrics-file",
+                   help="Also write the timings to a file: *.prom = Prometheus textfile, anything else = JSON lines")
+    p.add_argument("--rebuild-range", nargs=2, type=int, metavar=("FROM", "TO"),
+                   help="Rebuild the fact for the months FROM..TO (yyyymmdd) from silver and switch them in, nothing else runs")
+    p.add_argument("--publish", action="store_true",
+                   help="Blue/green gold: build the new fact rows off to the side, check them against silver, "
+                        "then make them visible at once (partition switch)")
+    p.add_argument("--switch-wait-minutes", type=int, default=DEFAULT_SWITCH_WAIT_MINUTES,
+                   help=f"--publish: wait this long at low priority for running queries before a switch gives up "
+                        f"(default {DEFAULT_SWITCH_WAIT_MINUTES})")
+    p.add_argument("--rollups", nargs="*", metavar="GRAIN:DIMS",
+                   help="Maintain dw.rollup_* tables after gold, e.g. month:county,provider "
+                        "(grains day/week/month, dims county/provider/complaint; no value = the default set)")
+    p.add_argument("--query", metavar="GRAIN:DIMS",
+                   help="Read-only: print encounter measures at this grain from the smallest rollup that has it (else the fact)")
+    p.add_argument("--date-window", nargs=2, type=int, default=list(DATE_WINDOW), metavar=("FIRST", "LAST"),
+                   help="Gold: years DimDate is a contiguous calendar for and the fact gets month partitions for "
+                        f"(default {DATE_WINDOW[0]} {DATE_WINDOW[1]}); dates outside get just their own DimDate day")
+    p.add_argument("--date-from", type=int, default=19000101, help="--query: first period start (yyyymmdd)")
+    p.add_argument("--date-to", type=int, default=99991231, help="--query: last period start (yyyymmdd)")
+    p.add_argument("--archive-bronze", metavar="DIR",
+                   help="Move bronze rows silver already processed to Parquet files + manifest in DIR, check them, "
+                        "purge them from bronze and exit (needs pyarrow)")
+    p.add_argument("--purge-batch-size", type=int, default=10000,
+                   help="--archive-bronze: BronzeIds deleted per statement / commit (default 10000)")
+    p.add_argument("--replay-archive", metavar="DIR",
+                   help="--full-refresh: put the rows archived in DIR back into bronze first, so silver rebuilds from all of them")
+    args = p.parse_args(argv)
+    if args.config:
+        try:
+            p.set_defaults(**load_config(args.config).cli_defaults())
+        except (OSError, ValueError, KeyError) as ex:
+            p.error(f"--config {args.config}: {ex}")
+        args = p.parse_args(argv)
+    if not args.conn or not args.run_id:
+        p.error("--conn and --run-id are required (on the command line or in --config)")
+    return args
+
+
+def resume_step(conn, run_id: str, steps: tuple[str, ...]) -> str | None:
+    # first of `steps` this RunId hasn't finished (None = all of them did)
+    if "bronze" in steps:
+        status = run_status(conn, run_id)
+        if status is None:
+            return "bronze"
+        if status != "SUCCESS":
+            # bronze rows of a failed load are deleted, and the run header can't be reused
+            raise SystemExit(f"bronze for this RunId is {status}; load the file again under a new --run-id")
+
+    done = succeeded_steps(conn, run_id)
+    names = {"silver": SILVER_STEP, **{phase: gold_phase_step(phase) for phase in GOLD_PHASES}}
+    for step in steps:
+        if step != "bronze" and names[step] not in done:
+            return step
+    return None
 
 
 def main():
     args = parse_args()
 
+    if args.backend == "duckdb":
+        # in-process engine: one connection, no pool, so everything that fans out over connections is off
+        if args.workers > 1 or args.dim_workers > 1 or args.stream:
+            raise SystemExit("--backend duckdb runs serially: drop --workers / --dim-workers / --stream")
+        if args.engine != "sql" or args.check_parity:
+            raise SystemExit("--backend duckdb only has the sql silver engine (no --engine arrow / --check-parity)")
+    elif args.import_silver:
+        raise SystemExit("--import-silver is only for --backend duckdb")
+
     # connect once and reuse for both steps
-    conn = connect(args.conn)
+    if args.backend == "duckdb":
+        from .duckdb_backend import connect as connect_duckdb  # duckdb is only needed for this backend
+        conn = connect_duckdb(args.conn)
+    else:
+        conn = connect(args.conn)
 
     # avoid conflicting switches
     if args.gold_only and args.silver_only:
         raise SystemExit("Choose at most one of --silver-only or --gold-only")
 
+    if args.load_file and args.gold_only:
+        raise SystemExit("--load-file only feeds bronze; combine it with a silver run, not --gold-only")
+
+    if args.stream and (args.silver_only or args.gold_only):
+        raise SystemExit("--stream runs both silver and gold; drop --silver-only / --gold-only")
+
+    if args.stream and args.workers > 1:
+        raise SystemExit("--stream needs serial silver (--workers 1)")
+
+    if args.workers < 1 or args.dim_workers < 1:
+        raise SystemExit("--workers / --dim-workers must be >= 1")
+
+    if args.retries < 0:
+        raise SystemExit("--retries must be >= 0")
+
+    if args.rebuild_range and (args.full_refresh or args.stream or args.silver_only or args.load_file):
+        raise SystemExit("--rebuild-range is its own gold mode: drop --full-refresh / --stream / --silver-only / --load-file")
+
+    if args.adaptive_batch and args.workers > 1:
+        raise SystemExit("--adaptive-batch needs serial silver (--workers 1)")
+
+    if args.publish and (args.stream or args.rebuild_range or args.full_refresh or args.silver_only
+                         or args.resume or args.from_step):
+        raise SystemExit("--publish replaces the gold step of a normal or --gold-only run: drop --stream / --rebuild-range / "
+                         "--full-refresh / --silver-only / --resume / --from-step")
+
+    if args.publish and args.fact_engine != "sql":
+        raise SystemExit("--publish stages the fact with the sql fact engine (drop --fact-engine python)")
+
+    if args.resume and args.from_step:
+        raise SystemExit("Choose at most one of --resume or --from-step")
+
+    if (args.resume or args.from_step) and (args.stream or args.rebuild_range or args.full_refresh
+                                            or args.silver_only or args.import_silver):
+        raise SystemExit("--resume / --from-step pick up a normal run: drop --stream / --rebuild-range / --full-refresh / "
+                         "--silver-only / --import-silver")
+
+    if args.archive_bronze and (args.load_file or args.full_refresh or args.silver_only or args.gold_only or args.stream
+                                or args.rebuild_range or args.publish or args.resume or args.from_step
+                                or args.import_silver or args.replay_archive):
+        raise SystemExit("--archive-bronze runs on its own: drop the load / refresh / step options")
+
+    if args.purge_batch_size < 1:
+        raise SystemExit("--purge-batch-size must be >= 1")
+
+    if args.replay_archive and (not args.full_refresh or args.gold_only):
+        raise SystemExit("--replay-archive feeds a silver --full-refresh (not --gold-only)")
+
+    # steps this invocation would run from the top (bronze only with a file, silver not with --gold-only)
+    steps = tuple(
+        s for s in RUN_STEPS
+        if (s != "bronze" or args.load_file) and (s != "silver" or not args.gold_only)
+    )
+    if args.from_step and args.from_step not in steps:
+        raise SystemExit(f"--from-step {args.from_step} isn't part of this run (steps: {', '.join(steps)})")
+
+    try:
+        date_window = check_date_window(*args.date_window)
+    except ValueError as ex:
+        raise SystemExit(f"--date-window: {ex}")
+
+    # None = rollups off, [] = the default set
+    rollups = ()
+    if args.rollups is not None:
+        try:
+            rollups = tuple(parse_rollup(t) for t in args.rollups) or DEFAULT_ROLLUPS
+        except ValueError as ex:
+            raise SystemExit(f"--rollups: {ex}")
+
+    # rollup query is a read-only side mode (routes over --rollups, or the default set)
+    if args.query:
+        try:
+            want = parse_rollup(args.query)
+        except ValueError as ex:
+            raise SystemExit(f"--query: {ex}")
+        spec = route(want.grain, want.dims, rollups or DEFAULT_ROLLUPS)
+        print(f"-- from {spec.table if spec else 'dw.FactEMS_Encounter'}")
+        for row in query(conn, want.grain, want.dims, args.date_from, args.date_to, rollups or DEFAULT_ROLLUPS):
+            print(",".join("" if v is None else str(v) for v in row))
+        sys.exit(0)
+
+    # bronze archival is its own side mode (archive + purge, nothing else runs)
+    if args.archive_bronze:
+        from .bronze_archive import archive_bronze  # pyarrow is only needed here
+        archived, purged = archive_bronze(conn, args.run_id, args.archive_bronze, batch_size=args.batch_size,
+                                          purge_batch_size=args.purge_batch_size, retry=RetryPolicy(attempts=args.retries + 1))
+        print(f"archived {archived} bronze rows, purged {purged}")
+        sys.exit(0)
+
+    # a silver full refresh re-reads bronze from the start: purged rows have to come back from the archive
+    if (args.full_refresh and not args.gold_only and not args.replay_archive
+            and get_last_bronze_id(conn, BRONZE_ARCHIVE_PIPELINE_NAME) > 0):
+        raise SystemExit("bronze has been archived (--archive-bronze); add --replay-archive DIR to rebuild silver from all of it")
+
+    # engine parity check is a read-only side mode
+    if args.check_parity:
+        rows, only_sql, only_arrow = check_engine_parity(conn, batch_size=args.batch_size)
+        print(f"PARITY rows={rows} only_sql={only_sql} only_arrow={only_arrow}")
+        sys.exit(0 if only_sql == 0 and only_arrow == 0 else 1)
+
+    # resume: skip what this RunId already finished
+    if args.resume:
+        start = resume_step(conn, args.run_id, steps)
+        if start is None:
+            print(f"nothing to resume: every step of RunId {args.run_id} succeeded")
+        steps = steps[steps.index(start):] if start else ()
+    elif args.from_step:
+        steps = steps[steps.index(args.from_step):]
+    gold_phases = [s for s in steps if s in GOLD_PHASES]
+
+    # extra connections only when silver or the gold dims run in parallel (one pool, sized for the bigger of the two)
+    pool_size = max(args.workers, args.dim_workers)
+    pool = ConnectionPool(args.conn, size=pool_size) if pool_size > 1 else None
+
+    # idempotent units of work (bronze chunk, silver batch/range, gold slice/dim) are retried on transient errors
+    retry = RetryPolicy(attempts=args.retries + 1)
+
+    batch_sizer = None
+    if args.adaptive_batch:
+        batch_sizer = AdaptiveBatchSize(args.batch_size, target_seconds=args.target_batch_seconds,
+                                        min_size=args.min_batch_size, max_size=args.max_batch_size)
+
+    # statement timings are off (no-op) unless asked for
+    metrics = NULL_METRICS
+    if args.metrics or args.metrics_file:
+        metrics = StepMetrics(args.run_id, to_db=args.metrics, path=args.metrics_file)
+
+    # data-quality profile of the silver pass is off (no-op) unless asked for
+    profile = SilverProfile(args.run_id) if args.profile else NULL_PROFILE
+
+    if args.import_silver:
+        from .duckdb_backend import import_silver
+        rows = import_silver(conn, args.import_silver)
+        print(f"imported {rows} silver rows from {args.import_silver}")
+
+    # bronze first (same place the SSIS data flow sits in the package)
+    if "bronze" in steps:
+        load_file(conn, args.run_id, args.load_file, batch_size=args.batch_size, metrics=metrics, retry=retry)
+
+    if args.replay_archive:
+        from .bronze_archive import restore_archive
+        rows = restore_archive(conn, args.run_id, args.replay_archive, batch_size=args.batch_size, metrics=metrics)
+        print(f"restored {rows} archived bronze rows")
+
     # run modes:
+    # - stream: silver and gold at the same time, gold follows silver batch by batch
+    # - rebuild-range: reload a few months of the fact from silver (partition switch, see gold.rebuild_range)
     # - gold-only: just publish DW tables from existing silver
     # - silver-only: just build silver tables from bronze
-    # - default: run silver then gold
-    if args.gold_only:
-        run_gold(conn, args.run_id, full_refresh=args.full_refresh)
+    # - default: run silver then gold (--publish: gold as a blue/green publish, see gold.publish_gold)
+    # (--resume / --from-step trim `steps`: silver and/or the gold phases before the start are skipped)
+    if args.stream:
+        run_streaming(conn, args.conn, args.run_id, batch_size=args.batch_size, full_refresh=args.full_refresh,
+                      queue_size=args.stream_queue, fact_engine=args.fact_engine, engine=args.engine,
+                      metrics=metrics, dim_workers=args.dim_workers, pool=pool, retry=retry, batch_sizer=batch_sizer,
+                      rollups=rollups, profile=profile, date_window=date_window)
+    elif args.rebuild_range:
+        rows = rebuild_range(conn, args.run_id, *args.rebuild_range, batch_size=args.batch_size, metrics=metrics, retry=retry)
+        print(f"rebuilt {rows} fact rows")
     elif args.silver_only:
-        run_silver(conn, args.run_id, batch_size=args.batch_size, full_refresh=args.full_refresh)
+        run_silver(conn, args.run_id, batch_size=args.batch_size, full_refresh=args.full_refresh,
+                   workers=args.workers, pool=pool, metrics=metrics, engine=args.engine, retry=retry,
+                   batch_sizer=batch_sizer, profile=profile)
     else:
-        run_silver(conn, args.run_id, batch_size=args.batch_size, full_refresh=args.full_refresh)
-        run_gold(conn, args.run_id, full_refresh=args.full_refresh)
+        if "silver" in steps:
+            run_silver(conn, args.run_id, batch_size=args.batch_size, full_refresh=args.full_refresh,
+                       workers=args.workers, pool=pool, metrics=metrics, engine=args.engine, retry=retry,
+                       batch_sizer=batch_sizer, profile=profile)
+        if gold_phases and args.publish:
+            rows = publish_gold(conn, args.run_id, batch_size=args.batch_size, metrics=metrics,
+                                dim_workers=args.dim_workers, pool=pool, retry=retry, rollups=rollups,
+                                wait_minutes=args.switch_wait_minutes, date_window=date_window)
+            print(f"published {rows} fact rows")
+        elif gold_phases:
+            run_gold(conn, args.run_id, full_refresh=args.full_refresh,
+                     batch_size=args.batch_size, fact_engine=args.fact_engine, metrics=metrics,
+                     dim_workers=args.dim_workers, pool=pool, retry=retry, rollups=rollups,
+                     from_phase=gold_phases[0], date_window=date_window)
+
+    if args.pool_stats:
+        stats = pool.stats() if pool is not None else {}
+        print(" ".join(f"{k}={v}" for k, v in {**stats, "retries": retry.retries}.items()))
+
+    if pool is not None:
+        pool.close()
+    if args.backend == "duckdb":
+        conn.close()  # checkpoints the database file
 
     # keep output simple for SSIS Execute Process Task
     print("OK")
@@ -1,24 +1,447 @@
 # src/silver.py
-import pyodbc
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from typing import Callable
+
+from .db import pyodbc, ConnectionPool, RetryPolicy, DEFAULT_RETRY, execute_rowcount
+from .dialect import DUCKDB, dialect_of
+from . import duckdb_sql
 from .step_log import start_step, end_step
-from .watermark import get_last_bronze_id, set_last_bronze_id
+from .watermark import get_last_bronze_id, set_last_bronze_id, write_last_bronze_id, GOLD_PIPELINE_NAME, GOLD_DIMS_PIPELINE_NAME
+from .dedupe import record_hash_sql, not_exists_hash_sql
+from .metrics import StepMetrics, NULL_METRICS
+from .batch_sizer import AdaptiveBatchSize
+from .daily_summary import reset_summary
+from .dq_profile import SilverProfile, NULL_PROFILE, blank_mask_sql, parse_fail_mask_sql
 
 SILVER_STEP = "SILVER_LOAD"
 DEFAULT_BATCH_SIZE = 50000
 
+# stage engines: "sql" = typing/validation/hash in one T-SQL statement, "arrow" = same work in python (silver_arrow.py)
+SILVER_ENGINES = ("sql", "arrow")
+
+# per-batch work set (session temp table). each bronze batch is read, typed and validated
+# exactly once into here, then rejects / clean rows / the watermark all come from this set
+_CREATE_STAGE_SQL = """
+IF OBJECT_ID('tempdb..#silver_batch') IS NOT NULL
+    DROP TABLE #silver_batch;
+
+CREATE TABLE #silver_batch (
+    BronzeId     BIGINT        NOT NULL PRIMARY KEY,
+    RunId        NVARCHAR(36)  NOT NULL,
+    FileName     NVARCHAR(255) NOT NULL,
+    SourceRowNum BIGINT        NOT NULL,
+
+    IncidentDttm DATETIME2(0)  NULL,
+    IncidentCounty NVARCHAR(200) NULL,
+
+    ChiefComplaintDispatch    NVARCHAR(400) NULL,
+    ChiefComplaintAnatomicLoc NVARCHAR(400) NULL,
+    PrimarySymptom            NVARCHAR(400) NULL,
+    ProviderImpressionPrimary NVARCHAR(400) NULL,
+
+    DispositionED       NVARCHAR(200) NULL,
+    DispositionHospital NVARCHAR(200) NULL,
+    DestinationType     NVARCHAR(200) NULL,
+
+    ProviderTypeStructure     NVARCHAR(200) NULL,
+    ProviderTypeService       NVARCHAR(200) NULL,
+    ProviderTypeServiceLevel  NVARCHAR(4000) NULL,
+
+    ProviderToSceneMins       INT NULL,
+    ProviderToDestinationMins INT NULL,
+
+    UnitNotifiedByDispatchDttm    DATETIME2(0) NULL,
+    UnitArrivedOnSceneDttm        DATETIME2(0) NULL,
+    UnitArrivedToPatientDttm      DATETIME2(0) NULL,
+    UnitLeftSceneDttm             DATETIME2(0) NULL,
+    PatientArrivedDestinationDttm DATETIME2(0) NULL,
+
+    InjuryFlg               CHAR(1) NULL,  -- Y/N/X (X = invalid, gets rejected)
+    NaloxoneGivenFlg        CHAR(1) NULL,
+    MedicationGivenOtherFlg CHAR(1) NULL,
+
+    RecordHash BINARY(32) NOT NULL,
+    BlankMask     INT NOT NULL,       -- per column bit (dq_profile.PROFILE_COLUMNS): bronze value was only spaces
+    ParseFailMask INT NOT NULL,       -- per column bit: bronze value didn't convert (date / int / flag)
+    ErrorType  NVARCHAR(100) NULL     -- NULL = clean row
+);
+"""
+
+_DROP_STAGE_SQL = """
+IF OBJECT_ID('tempdb..#silver_batch') IS NOT NULL
+    DROP TABLE #silver_batch;
+
+IF OBJECT_ID('tempdb..#silver_convert') IS NOT NULL
+    DROP TABLE #silver_convert;
+"""
+
+# -----------------------
+# 1) Stage: read the next bronze chunk once, type + validate + hash it
+# params: batch_size, last_bronze_id, upper BronzeId bound (max bronze id when serial, range end for workers)
+# -----------------------
+_STAGE_SQL = f"""
+SET NOCOUNT ON;
+
+TRUNCATE TABLE #silver_batch;
+
+INSERT INTO #silver_batch (
+    BronzeId, RunId, FileName, SourceRowNum,
+    IncidentDttm,
+    IncidentCounty,
+    ChiefComplaintDispatch, ChiefComplaintAnatomicLoc,
+    PrimarySymptom, ProviderImpressionPrimary,
+    DispositionED, DispositionHospital, DestinationType,
+    ProviderTypeStructure, ProviderTypeService, ProviderTypeServiceLevel,
+    ProviderToSceneMins, ProviderToDestinationMins,
+    UnitNotifiedByDispatchDttm, UnitArrivedOnSceneDttm, UnitArrivedToPatientDttm,
+    UnitLeftSceneDttm, PatientArrivedDestinationDttm,
+    InjuryFlg, NaloxoneGivenFlg, MedicationGivenOtherFlg,
+    RecordHash,
+    BlankMask, ParseFailMask,
+    ErrorType
+)
+SELECT TOP (?)
+    b.BronzeId,
+    b.RunId,
+    b.FileName,
+    b.SourceRowNum,
+
+    v.IncidentDttm,
+    v.IncidentCounty,
+
+    v.ChiefComplaintDispatch, v.ChiefComplaintAnatomicLoc,
+    v.PrimarySymptom, v.ProviderImpressionPrimary,
+    v.DispositionED, v.DispositionHospital, v.DestinationType,
+    v.ProviderTypeStructure, v.ProviderTypeService, v.ProviderTypeServiceLevel,
+    v.ProviderToSceneMins, v.ProviderToDestinationMins,
+    v.UnitNotifiedByDispatchDttm, v.UnitArrivedOnSceneDttm, v.UnitArrivedToPatientDttm,
+    v.UnitLeftSceneDttm, v.PatientArrivedDestinationDttm,
+    v.InjuryFlg, v.NaloxoneGivenFlg, v.MedicationGivenOtherFlg,
+
+    -- record-level hash so we can dedupe across reruns / different RunIds (BINARY(32), see dedupe.py)
+    {record_hash_sql("b")} AS RecordHash,
+
+    -- every column that was blank / didn't convert, not just the first failing rule (data-quality profile)
+    {blank_mask_sql("b")} AS BlankMask,
+    {parse_fail_mask_sql("b", lambda col: f"v.{col}")} AS ParseFailMask,
+
+    -- first failing rule wins (same order as before)
+    CASE
+        WHEN v.IncidentDttm IS NULL THEN 'INVALID_INCIDENT_DT'
+        WHEN v.IncidentCounty IS NULL THEN 'MISSING_COUNTY'
+        WHEN v.InjuryFlg = 'X' THEN 'INVALID_INJURY_FLG'
+        WHEN v.NaloxoneGivenFlg = 'X' THEN 'INVALID_NALOXONE_FLG'
+        WHEN v.MedicationGivenOtherFlg = 'X' THEN 'INVALID_MED_GIVEN_FLG'
+        ELSE NULL
+    END AS ErrorType
+FROM bronze.ems_raw b
+CROSS APPLY (
+    SELECT
+        TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.INCIDENT_DT)), '')) AS IncidentDttm,
+
+        TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.UNIT_NOTIFIED_BY_DISPATCH_DT)), '')) AS UnitNotifiedByDispatchDttm,
+        TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.UNIT_ARRIVED_ON_SCENE_DT)), '')) AS UnitArrivedOnSceneDttm,
+        TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.UNIT_ARRIVED_TO_PATIENT_DT)), '')) AS UnitArrivedToPatientDttm,
+        TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.UNIT_LEFT_SCENE_DT)), '')) AS UnitLeftSceneDttm,
+        TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.PATIENT_ARRIVED_DESTINATION_DT)), '')) AS PatientArrivedDestinationDttm,
+
+        TRY_CONVERT(INT, NULLIF(LTRIM(RTRIM(b.PROVIDER_TO_SCENE_MINS)), '')) AS ProviderToSceneMins,
+        TRY_CONVERT(INT, NULLIF(LTRIM(RTRIM(b.PROVIDER_TO_DESTINATION_MINS)), '')) AS ProviderToDestinationMins,
+
+        NULLIF(LTRIM(RTRIM(b.INCIDENT_COUNTY)), '') AS IncidentCounty,
+
+        NULLIF(LTRIM(RTRIM(b.CHIEF_COMPLAINT_DISPATCH)), '') AS ChiefComplaintDispatch,
+        NULLIF(LTRIM(RTRIM(b.CHIEF_COMPLAINT_ANATOMIC_LOC)), '') AS ChiefComplaintAnatomicLoc,
+        NULLIF(LTRIM(RTRIM(b.PRIMARY_SYMPTOM)), '') AS PrimarySymptom,
+        NULLIF(LTRIM(RTRIM(b.PROVIDER_IMPRESSION_PRIMARY)), '') AS ProviderImpressionPrimary,
+
+        NULLIF(LTRIM(RTRIM(b.DISPOSITION_ED)), '') AS DispositionED,
+        NULLIF(LTRIM(RTRIM(b.DISPOSITION_HOSPITAL)), '') AS DispositionHospital,
+        NULLIF(LTRIM(RTRIM(b.DESTINATION_TYPE)), '') AS DestinationType,
+
+        NULLIF(LTRIM(RTRIM(b.PROVIDER_TYPE_STRUCTURE)), '') AS ProviderTypeStructure,
+        NULLIF(LTRIM(RTRIM(b.PROVIDER_TYPE_SERVICE)), '') AS ProviderTypeService,
+        NULLIF(LTRIM(RTRIM(b.PROVIDER_TYPE_SERVICE_LEVEL)), '') AS ProviderTypeServiceLevel,
+
+        -- normalize flags into Y/N; anything weird becomes 'X' so it gets rejected
+        CASE WHEN UPPER(LTRIM(RTRIM(b.INJURY_FLG))) IN ('Y','YES','1','TRUE','T') THEN 'Y'
+             WHEN UPPER(LTRIM(RTRIM(b.INJURY_FLG))) IN ('N','NO','0','FALSE','F') THEN 'N'
+             WHEN NULLIF(LTRIM(RTRIM(b.INJURY_FLG)), '') IS NULL THEN NULL
+             ELSE 'X' END AS InjuryFlg,
+
+        CASE WHEN UPPER(LTRIM(RTRIM(b.NALOXONE_GIVEN_FLG))) IN ('Y','YES','1','TRUE','T') THEN 'Y'
+             WHEN UPPER(LTRIM(RTRIM(b.NALOXONE_GIVEN_FLG))) IN ('N','NO','0','FALSE','F') THEN 'N'
+             WHEN NULLIF(LTRIM(RTRIM(b.NALOXONE_GIVEN_FLG)), '') IS NULL THEN NULL
+             ELSE 'X' END AS NaloxoneGivenFlg,
+
+        CASE WHEN UPPER(LTRIM(RTRIM(b.MEDICATION_GIVEN_OTHER_FLG))) IN ('Y','YES','1','TRUE','T') THEN 'Y'
+             WHEN UPPER(LTRIM(RTRIM(b.MEDICATION_GIVEN_OTHER_FLG))) IN ('N','NO','0','FALSE','F') THEN 'N'
+             WHEN NULLIF(LTRIM(RTRIM(b.MEDICATION_GIVEN_OTHER_FLG)), '') IS NULL THEN NULL
+             ELSE 'X' END AS MedicationGivenOtherFlg
+) v
+WHERE b.BronzeId > ?
+  AND b.BronzeId <= ?
+ORDER BY b.BronzeId;
+"""
+
+# -----------------------
+# 2) Route: rejects + clean rows straight from the staged set, then report batch stats
+# returns one row: rows_reject, rows_out, rows_in, max BronzeId in the batch
+# -----------------------
+_ROUTE_SQL = f"""
+DECLARE @rows_reject BIGINT, @rows_out BIGINT;
+
+INSERT INTO silver.ems_reject (RunId, FileName, SourceRowNum, ErrorType, ErrorMessage)
+SELECT
+    t.RunId,
+    t.FileName,
+    t.SourceRowNum,
+    t.ErrorType,
+    CONCAT('Row rejected in silver validation. BronzeId=', t.BronzeId)
+FROM #silver_batch t
+WHERE t.ErrorType IS NOT NULL
+  AND NOT EXISTS (
+      -- keep it rerunnable (avoid duplicate reject rows)
+      SELECT 1
+      FROM silver.ems_reject x
+      WHERE x.RunId = t.RunId AND x.SourceRowNum = t.SourceRowNum
+  );
+SET @rows_reject = @@ROWCOUNT;
+
+-- flags on clean rows are only ever Y/N/NULL here ('X' rows were routed to rejects above)
+INSERT INTO silver.ems_clean (
+    RunId, FileName, SourceRowNum,
+    IncidentDttm,
+    IncidentCounty,
+    ChiefComplaintDispatch, ChiefComplaintAnatomicLoc,
+    PrimarySymptom, ProviderImpressionPrimary,
+    DispositionED, DispositionHospital, DestinationType,
+    ProviderTypeStructure, ProviderTypeService, ProviderTypeServiceLevel,
+    ProviderToSceneMins, ProviderToDestinationMins,
+    UnitNotifiedByDispatchDttm, UnitArrivedOnSceneDttm, UnitArrivedToPatientDttm,
+    UnitLeftSceneDttm, PatientArrivedDestinationDttm,
+    InjuryFlg, NaloxoneGivenFlg, MedicationGivenOtherFlg,
+    RecordHash
+)
+SELECT
+    t.RunId, t.FileName, t.SourceRowNum,
+    t.IncidentDttm,
+    t.IncidentCounty,
+    t.ChiefComplaintDispatch, t.ChiefComplaintAnatomicLoc,
+    t.PrimarySymptom, t.ProviderImpressionPrimary,
+    t.DispositionED, t.DispositionHospital, t.DestinationType,
+    t.ProviderTypeStructure, t.ProviderTypeService, t.ProviderTypeServiceLevel,
+    t.ProviderToSceneMins, t.ProviderToDestinationMins,
+    t.UnitNotifiedByDispatchDttm, t.UnitArrivedOnSceneDttm, t.UnitArrivedToPatientDttm,
+    t.UnitLeftSceneDttm, t.PatientArrivedDestinationDttm,
+    t.InjuryFlg, t.NaloxoneGivenFlg, t.MedicationGivenOtherFlg,
+    t.RecordHash
+FROM #silver_batch t
+WHERE t.ErrorType IS NULL
+  AND NOT EXISTS (
+      -- anything already rejected for this run/rownum should not go to clean
+      SELECT 1
+      FROM silver.ems_reject r
+      WHERE r.RunId = t.RunId AND r.SourceRowNum = t.SourceRowNum
+  )
+  AND {not_exists_hash_sql("silver.ems_clean", "t.RecordHash")};
+SET @rows_out = @@ROWCOUNT;
+
+SELECT @rows_reject, @rows_out, COUNT_BIG(1), MAX(BronzeId)
+FROM #silver_batch;
+"""
+
+
+def _create_stage(cur: pyodbc.Cursor, engine: str) -> None:
+    if dialect_of(cur) == DUCKDB:
+        cur.execute(duckdb_sql.CREATE_STAGE_SQL)
+        return
+    cur.execute(_CREATE_STAGE_SQL)
+    if engine == "arrow":
+        from .silver_arrow import CREATE_CONVERT_SQL  # pyarrow is only needed for this engine
+        cur.execute(CREATE_CONVERT_SQL)
+
+
+def _run_batch(
+    cur: pyodbc.Cursor,
+    last_bronze_id: int,
+    batch_size: int,
+    upper_bronze_id: int,
+    metrics: StepMetrics = NULL_METRICS,
+    engine: str = "sql"
+) -> tuple[int, int, int, int]:
+    # one round trip per batch: stage + route, returns (rows_reject, rows_out, rows_in, new_last)
+    if dialect_of(cur) == DUCKDB:
+        # in-process: no round trips to save, so always the separate statements
+        with metrics.measure(SILVER_STEP, "stage", last_bronze_id, upper_bronze_id) as m_stage:
+            cur.execute(duckdb_sql.TRUNCATE_STAGE_SQL)
+            m_stage.rows = execute_rowcount(cur, duckdb_sql.STAGE_SQL, batch_size, last_bronze_id, upper_bronze_id)
+        with metrics.measure(SILVER_STEP, "route", last_bronze_id, upper_bronze_id) as m_route:
+            rows_reject = execute_rowcount(cur, duckdb_sql.ROUTE_REJECT_SQL)
+            rows_out = execute_rowcount(cur, duckdb_sql.ROUTE_CLEAN_SQL)
+            cur.execute(duckdb_sql.ROUTE_STATS_SQL)
+            rows_in, new_last = cur.fetchone()
+            m_route.rows = rows_reject + rows_out
+    elif engine == "arrow" or metrics.enabled:
+        # arrow stages in python; profiling wants separate timings -> stage and route as separate round trips
+        with metrics.measure(SILVER_STEP, "stage", last_bronze_id, upper_bronze_id) as m_stage:
+            if engine == "arrow":
+                from .silver_arrow import stage_batch_arrow
+                stage_batch_arrow(cur, last_bronze_id, batch_size, upper_bronze_id, metrics)
+            else:
+                cur.execute(_STAGE_SQL, batch_size, last_bronze_id, upper_bronze_id)
+        with metrics.measure(SILVER_STEP, "route", last_bronze_id, upper_bronze_id) as m_route:
+            cur.execute("SET NOCOUNT ON;" + _ROUTE_SQL)
+            rows_reject, rows_out, rows_in, new_last = cur.fetchone()
+            m_route.rows = int(rows_reject or 0) + int(rows_out or 0)
+        m_stage.rows = int(rows_in or 0)
+    else:
+        cur.execute(_STAGE_SQL + _ROUTE_SQL, batch_size, last_bronze_id, upper_bronze_id)
+        rows_reject, rows_out, rows_in, new_last = cur.fetchone()
+
+    if new_last is None:
+        new_last = last_bronze_id  # empty batch
+    return int(rows_reject or 0), int(rows_out or 0), int(rows_in or 0), int(new_last)
+
+
+def _split_ranges(last_bronze_id: int, max_bronze_id: int, batch_size: int) -> list[tuple[int, int]]:
+    # disjoint keyset ranges (lo, hi] over the pending BronzeIds; gaps in the identity just make a range smaller
+    return [
+        (lo, min(lo + batch_size, max_bronze_id))
+        for lo in range(last_bronze_id, max_bronze_id, batch_size)
+    ]
+
+
+def _process_range(
+    pool: ConnectionPool, lo: int, hi: int, metrics: StepMetrics, engine: str, profile: SilverProfile = NULL_PROFILE
+) -> tuple[tuple[int, int, int, int], list | None]:
+    # worker: one range, on its own pooled connection, in its own transaction; returns (batch result, batch profile)
+    with pool.connection() as wconn:
+        cur = wconn.cursor()
+        _create_stage(cur, engine)
+        result = _run_batch(cur, lo, hi - lo, hi, metrics, engine)
+        batch_profile = profile.read_batch(cur)
+        with metrics.measure(SILVER_STEP, "commit", lo, hi):
+            wconn.commit()
+        return result, batch_profile
+
+
+def _run_ranges_parallel(
+    pool: ConnectionPool,
+    ranges: list[tuple[int, int]],
+    workers: int,
+    metrics: StepMetrics,
+    engine: str,
+    retry: RetryPolicy = DEFAULT_RETRY,
+    profile: SilverProfile = NULL_PROFILE
+):
+    # yields (range index, (batch result, batch profile)) as ranges finish, in completion order
+    # a retried range starts over on a fresh checkout (the pool already rolled back / dropped the old one)
+    def task(lo: int, hi: int):
+        return retry.run(lambda: _process_range(pool, lo, hi, metrics, engine, profile))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="silver") as executor:
+        futures = {executor.submit(task, lo, hi): i for i, (lo, hi) in enumerate(ranges)}
+        try:
+            for f in as_completed(futures):
+                yield futures[f], f.result()
+        finally:
+            # on failure don't start ranges that haven't been picked up yet
+            for f in futures:
+                f.cancel()
+
+
+_PARITY_SQL = """
+SET NOCOUNT ON;
+
+SELECT
+    (SELECT COUNT_BIG(1) FROM #silver_batch_sql),
+    (SELECT COUNT_BIG(1) FROM (SELECT * FROM #silver_batch_sql EXCEPT SELECT * FROM #silver_batch) d),
+    (SELECT COUNT_BIG(1) FROM (SELECT * FROM #silver_batch EXCEPT SELECT * FROM #silver_batch_sql) d);
+"""
+
+
+def check_engine_parity(conn: pyodbc.Connection, batch_size: int = DEFAULT_BATCH_SIZE) -> tuple[int, int, int]:
+    """
+    Stage the next pending bronze batch with both engines and compare #silver_batch row for row.
+    - Read-only: nothing is routed, the watermark doesn't move (everything stays in temp tables)
+    - Returns (rows, rows only the sql engine produced, rows only the arrow engine produced); parity = (n, 0, 0)
+    """
+    from .silver_arrow import stage_batch_arrow
+
+    cur = conn.cursor()
+    last_bronze_id = get_last_bronze_id(conn)
+    cur.execute("SELECT COALESCE(MAX(BronzeId), 0) FROM bronze.ems_raw;")
+    max_bronze_id = int(cur.fetchone()[0])
+
+    try:
+        _create_stage(cur, "arrow")
+        cur.execute(_STAGE_SQL, batch_size, last_bronze_id, max_bronze_id)
+        cur.execute("""
+            IF OBJECT_ID('tempdb..#silver_batch_sql') IS NOT NULL
+                DROP TABLE #silver_batch_sql;
+            SELECT * INTO #silver_batch_sql FROM #silver_batch;
+        """)
+
+        stage_batch_arrow(cur, last_bronze_id, batch_size, max_bronze_id)
+        cur.execute(_PARITY_SQL)
+        rows, only_sql, only_arrow = cur.fetchone()
+        return int(rows), int(only_sql), int(only_arrow)
+    finally:
+        conn.rollback()
+        cur.execute("IF OBJECT_ID('tempdb..#silver_batch_sql') IS NOT NULL DROP TABLE #silver_batch_sql;")
+        cur.execute(_DROP_STAGE_SQL)
+        conn.commit()
+
 
 def run_silver(
     conn: pyodbc.Connection,
     run_id: str,
     batch_size: int = DEFAULT_BATCH_SIZE,
-    full_refresh: bool = False
+    full_refresh: bool = False,
+    workers: int = 1,
+    pool: ConnectionPool | None = None,
+    metrics: StepMetrics = NULL_METRICS,
+    engine: str = "sql",
+    on_batch: Callable[[int], None] | None = None,
+    retry: RetryPolicy = DEFAULT_RETRY,
+    batch_sizer: AdaptiveBatchSize | None = None,
+    profile: SilverProfile = NULL_PROFILE
 ) -> None:
     """
     Silver = clean/typed version of bronze + a reject table.
     - Incremental: uses watermark (LastBronzeId) so we don't rescan all bronze every run
+    - Single pass: each bronze batch is read + typed once into #silver_batch, then routed
     - Rejects: bad rows go to silver.ems_reject with a simple error type
     - Dedupe: RecordHash prevents duplicates across reruns / different RunIds
+    - workers > 1: pending BronzeIds are split into disjoint ranges processed concurrently on `pool`;
+      the watermark only moves over the contiguous prefix of finished ranges, so a crash never skips rows
+    - metrics: per-batch stage/route/commit timings (see metrics.py), flushed when the step ends
+    - engine="arrow": typing/flags/validation/hash run in python on columnar batches (silver_arrow.py),
+      routing stays the same SQL, so output is identical to engine="sql"
+    - on_batch: called after every committed batch with the highest committed SilverId (serial only, see stream.py)
+    - retry: a batch (or range) that hits a deadlock/timeout is rolled back and run again; batch + watermark
+      commit together and routing is NOT EXISTS based, so a rerun can't double-insert
+    - batch_sizer: next batch size follows the observed batch latency instead of staying at batch_size
+      (serial only; every decision goes to etl.run_batch_size)
+    - profile: per column null / blank / parse failure counts, flag histograms, min/max, distinct sketches, read off
+      each staged batch (no extra bronze read) and merged into etl.silver_profile when the step ends (see dq_profile.py)
     """
+    if engine not in SILVER_ENGINES:
+        raise ValueError(f"engine must be one of {SILVER_ENGINES}, got {engine!r}")
+    if dialect_of(conn) == DUCKDB and engine != "sql":
+        raise ValueError("the duckdb backend only has the sql silver engine")
+    if workers > 1 and pool is None:
+        raise ValueError("run_silver with workers > 1 needs a ConnectionPool")
+    if workers > 1 and on_batch is not None:
+        # parallel ranges commit out of SilverId order, so "committed up to X" wouldn't hold
+        raise ValueError("run_silver on_batch only works with workers = 1")
+    if workers > 1 and batch_sizer is not None:
+        # ranges are cut up front, there's no "next batch" to resize
+        raise ValueError("run_silver batch_sizer only works with workers = 1")
+
     step_log_id = start_step(conn, run_id, SILVER_STEP)
 
     rows_in_total = 0
@@ -34,274 +457,82 @@ def run_silver(
             cur.execute("TRUNCATE TABLE silver.ems_clean;")
             conn.commit()
             set_last_bronze_id(conn, 0)
+            # SilverId restarts after TRUNCATE, so gold has to start over from the top too (and the summary with it)
+            set_last_bronze_id(conn, 0, GOLD_PIPELINE_NAME)
+            set_last_bronze_id(conn, 0, GOLD_DIMS_PIPELINE_NAME)
+            reset_summary(conn)
 
         last_bronze_id = get_last_bronze_id(conn)
 
         # find current max bronze id so we know when to stop batching
-        cur.execute("SELECT ISNULL(MAX(BronzeId), 0) FROM bronze.ems_raw;")
+        cur.execute("SELECT COALESCE(MAX(BronzeId), 0) FROM bronze.ems_raw;")
         max_bronze_id = int(cur.fetchone()[0])
 
-        while last_bronze_id < max_bronze_id:
-            # pull the next chunk from bronze by BronzeId (simple incremental pattern)
-            # -----------------------
-            # 1) Write rejects
-            # -----------------------
-            reject_sql = """
-            ;WITH batch AS (
-                SELECT TOP (?) *
-                FROM bronze.ems_raw
-                WHERE BronzeId > ?
-                ORDER BY BronzeId
-            ),
-            validated AS (
-                SELECT
-                    b.RunId,
-                    b.FileName,
-                    b.SourceRowNum,
-                    b.BronzeId,
-
-                    TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.INCIDENT_DT)), '')) AS IncidentDttm,
-
-                    TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.UNIT_NOTIFIED_BY_DISPATCH_DT)), '')) AS UnitNotifiedByDispatchDttm,
-                    TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.UNIT_ARRIVED_ON_SCENE_DT)), '')) AS UnitArrivedOnSceneDttm,
-                    TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.UNIT_ARRIVED_TO_PATIENT_DT)), '')) AS UnitArrivedToPatientDttm,
-                    TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.UNIT_LEFT_SCENE_DT)), '')) AS UnitLeftSceneDttm,
-                    TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.PATIENT_ARRIVED_DESTINATION_DT)), '')) AS PatientArrivedDestinationDttm,
-
-                    TRY_CONVERT(INT, NULLIF(LTRIM(RTRIM(b.PROVIDER_TO_SCENE_MINS)), '')) AS ProviderToSceneMins,
-                    TRY_CONVERT(INT, NULLIF(LTRIM(RTRIM(b.PROVIDER_TO_DESTINATION_MINS)), '')) AS ProviderToDestinationMins,
-
-                    NULLIF(LTRIM(RTRIM(b.INCIDENT_COUNTY)), '') AS IncidentCounty,
-
-                    NULLIF(LTRIM(RTRIM(b.CHIEF_COMPLAINT_DISPATCH)), '') AS ChiefComplaintDispatch,
-                    NULLIF(LTRIM(RTRIM(b.CHIEF_COMPLAINT_ANATOMIC_LOC)), '') AS ChiefComplaintAnatomicLoc,
-                    NULLIF(LTRIM(RTRIM(b.PRIMARY_SYMPTOM)), '') AS PrimarySymptom,
-                    NULLIF(LTRIM(RTRIM(b.PROVIDER_IMPRESSION_PRIMARY)), '') AS ProviderImpressionPrimary,
-
-                    NULLIF(LTRIM(RTRIM(b.DISPOSITION_ED)), '') AS DispositionED,
-                    NULLIF(LTRIM(RTRIM(b.DISPOSITION_HOSPITAL)), '') AS DispositionHospital,
-                    NULLIF(LTRIM(RTRIM(b.DESTINATION_TYPE)), '') AS DestinationType,
-
-                    NULLIF(LTRIM(RTRIM(b.PROVIDER_TYPE_STRUCTURE)), '') AS ProviderTypeStructure,
-                    NULLIF(LTRIM(RTRIM(b.PROVIDER_TYPE_SERVICE)), '') AS ProviderTypeService,
-                    NULLIF(LTRIM(RTRIM(b.PROVIDER_TYPE_SERVICE_LEVEL)), '') AS ProviderTypeServiceLevel,
-
-                    -- normalize flags into Y/N; anything weird becomes 'X' so it gets rejected
-                    CASE WHEN UPPER(LTRIM(RTRIM(b.INJURY_FLG))) IN ('Y','YES','1','TRUE','T') THEN 'Y'
-                         WHEN UPPER(LTRIM(RTRIM(b.INJURY_FLG))) IN ('N','NO','0','FALSE','F') THEN 'N'
-                         WHEN NULLIF(LTRIM(RTRIM(b.INJURY_FLG)), '') IS NULL THEN NULL
-                         ELSE 'X' END AS InjuryFlg,
-
-                    CASE WHEN UPPER(LTRIM(RTRIM(b.NALOXONE_GIVEN_FLG))) IN ('Y','YES','1','TRUE','T') THEN 'Y'
-                         WHEN UPPER(LTRIM(RTRIM(b.NALOXONE_GIVEN_FLG))) IN ('N','NO','0','FALSE','F') THEN 'N'
-                         WHEN NULLIF(LTRIM(RTRIM(b.NALOXONE_GIVEN_FLG)), '') IS NULL THEN NULL
-                         ELSE 'X' END AS NaloxoneGivenFlg,
-
-                    CASE WHEN UPPER(LTRIM(RTRIM(b.MEDICATION_GIVEN_OTHER_FLG))) IN ('Y','YES','1','TRUE','T') THEN 'Y'
-                         WHEN UPPER(LTRIM(RTRIM(b.MEDICATION_GIVEN_OTHER_FLG))) IN ('N','NO','0','FALSE','F') THEN 'N'
-                         WHEN NULLIF(LTRIM(RTRIM(b.MEDICATION_GIVEN_OTHER_FLG)), '') IS NULL THEN NULL
-                         ELSE 'X' END AS MedicationGivenOtherFlg
-                FROM batch b
-            ),
-            rejected AS (
-                SELECT
-                    v.RunId, v.FileName, v.SourceRowNum, v.BronzeId,
-                    CASE
-                        WHEN v.IncidentDttm IS NULL THEN 'INVALID_INCIDENT_DT'
-                        WHEN v.IncidentCounty IS NULL THEN 'MISSING_COUNTY'
-                        WHEN v.InjuryFlg = 'X' THEN 'INVALID_INJURY_FLG'
-                        WHEN v.NaloxoneGivenFlg = 'X' THEN 'INVALID_NALOXONE_FLG'
-                        WHEN v.MedicationGivenOtherFlg = 'X' THEN 'INVALID_MED_GIVEN_FLG'
-                        ELSE NULL
-                    END AS ErrorType
-                FROM validated v
-                WHERE
-                    v.IncidentDttm IS NULL
-                    OR v.IncidentCounty IS NULL
-                    OR v.InjuryFlg = 'X'
-                    OR v.NaloxoneGivenFlg = 'X'
-                    OR v.MedicationGivenOtherFlg = 'X'
-            )
-            INSERT INTO silver.ems_reject (RunId, FileName, SourceRowNum, ErrorType, ErrorMessage)
-            SELECT
-                r.RunId,
-                r.FileName,
-                r.SourceRowNum,
-                r.ErrorType,
-                CONCAT('Row rejected in silver validation. BronzeId=', r.BronzeId)
-            FROM rejected r
-            WHERE NOT EXISTS (
-                -- keep it rerunnable (avoid duplicate reject rows)
-                SELECT 1
-                FROM silver.ems_reject x
-                WHERE x.RunId = r.RunId AND x.SourceRowNum = r.SourceRowNum
-            );
-            """
-
-            # -----------------------
-            # 2) Load clean rows
-            # -----------------------
-            clean_sql = """
-            ;WITH batch AS (
-                SELECT TOP (?) *
-                FROM bronze.ems_raw
-                WHERE BronzeId > ?
-                ORDER BY BronzeId
-            ),
-            rejected_keys AS (
-                -- anything already rejected for this run/rownum should not go to clean
-                SELECT RunId, SourceRowNum
-                FROM silver.ems_reject
-            ),
-            typed AS (
-                SELECT
-                    b.RunId,
-                    b.FileName,
-                    b.SourceRowNum,
-
-                    TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.INCIDENT_DT)), '')) AS IncidentDttm,
-
-                    NULLIF(LTRIM(RTRIM(b.INCIDENT_COUNTY)), '') AS IncidentCounty,
-
-                    NULLIF(LTRIM(RTRIM(b.CHIEF_COMPLAINT_DISPATCH)), '') AS ChiefComplaintDispatch,
-                    NULLIF(LTRIM(RTRIM(b.CHIEF_COMPLAINT_ANATOMIC_LOC)), '') AS ChiefComplaintAnatomicLoc,
-                    NULLIF(LTRIM(RTRIM(b.PRIMARY_SYMPTOM)), '') AS PrimarySymptom,
-                    NULLIF(LTRIM(RTRIM(b.PROVIDER_IMPRESSION_PRIMARY)), '') AS ProviderImpressionPrimary,
-
-                    NULLIF(LTRIM(RTRIM(b.DISPOSITION_ED)), '') AS DispositionED,
-                    NULLIF(LTRIM(RTRIM(b.DISPOSITION_HOSPITAL)), '') AS DispositionHospital,
-                    NULLIF(LTRIM(RTRIM(b.DESTINATION_TYPE)), '') AS DestinationType,
-
-                    NULLIF(LTRIM(RTRIM(b.PROVIDER_TYPE_STRUCTURE)), '') AS ProviderTypeStructure,
-                    NULLIF(LTRIM(RTRIM(b.PROVIDER_TYPE_SERVICE)), '') AS ProviderTypeService,
-                    NULLIF(LTRIM(RTRIM(b.PROVIDER_TYPE_SERVICE_LEVEL)), '') AS ProviderTypeServiceLevel,
-
-                    TRY_CONVERT(INT, NULLIF(LTRIM(RTRIM(b.PROVIDER_TO_SCENE_MINS)), '')) AS ProviderToSceneMins,
-                    TRY_CONVERT(INT, NULLIF(LTRIM(RTRIM(b.PROVIDER_TO_DESTINATION_MINS)), '')) AS ProviderToDestinationMins,
-
-                    TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.UNIT_NOTIFIED_BY_DISPATCH_DT)), '')) AS UnitNotifiedByDispatchDttm,
-                    TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.UNIT_ARRIVED_ON_SCENE_DT)), '')) AS UnitArrivedOnSceneDttm,
-                    TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.UNIT_ARRIVED_TO_PATIENT_DT)), '')) AS UnitArrivedToPatientDttm,
-                    TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.UNIT_LEFT_SCENE_DT)), '')) AS UnitLeftSceneDttm,
-                    TRY_CONVERT(DATETIME2(0), NULLIF(LTRIM(RTRIM(b.PATIENT_ARRIVED_DESTINATION_DT)), '')) AS PatientArrivedDestinationDttm,
-
-                    -- here we keep flags as Y/N/NULL only (rejects already handled above)
-                    CASE WHEN UPPER(LTRIM(RTRIM(b.INJURY_FLG))) IN ('Y','YES','1','TRUE','T') THEN 'Y'
-                         WHEN UPPER(LTRIM(RTRIM(b.INJURY_FLG))) IN ('N','NO','0','FALSE','F') THEN 'N'
-                         ELSE NULL END AS InjuryFlg,
-
-                    CASE WHEN UPPER(LTRIM(RTRIM(b.NALOXONE_GIVEN_FLG))) IN ('Y','YES','1','TRUE','T') THEN 'Y'
-                         WHEN UPPER(LTRIM(RTRIM(b.NALOXONE_GIVEN_FLG))) IN ('N','NO','0','FALSE','F') THEN 'N'
-                         ELSE NULL END AS NaloxoneGivenFlg,
-
-                    CASE WHEN UPPER(LTRIM(RTRIM(b.MEDICATION_GIVEN_OTHER_FLG))) IN ('Y','YES','1','TRUE','T') THEN 'Y'
-                         WHEN UPPER(LTRIM(RTRIM(b.MEDICATION_GIVEN_OTHER_FLG))) IN ('N','NO','0','FALSE','F') THEN 'N'
-                         ELSE NULL END AS MedicationGivenOtherFlg,
-
-                    -- record-level hash so we can dedupe across reruns / different RunIds
-                    CONVERT(VARCHAR(64), HASHBYTES('SHA2_256', CONCAT(
-                        ISNULL(UPPER(LTRIM(RTRIM(b.INCIDENT_DT))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.INCIDENT_COUNTY))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.CHIEF_COMPLAINT_DISPATCH))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.CHIEF_COMPLAINT_ANATOMIC_LOC))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.PRIMARY_SYMPTOM))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.PROVIDER_IMPRESSION_PRIMARY))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.DISPOSITION_ED))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.DISPOSITION_HOSPITAL))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.DESTINATION_TYPE))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.PROVIDER_TYPE_STRUCTURE))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.PROVIDER_TYPE_SERVICE))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.PROVIDER_TYPE_SERVICE_LEVEL))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.PROVIDER_TO_SCENE_MINS))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.PROVIDER_TO_DESTINATION_MINS))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.UNIT_NOTIFIED_BY_DISPATCH_DT))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.UNIT_ARRIVED_ON_SCENE_DT))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.UNIT_ARRIVED_TO_PATIENT_DT))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.UNIT_LEFT_SCENE_DT))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.PATIENT_ARRIVED_DESTINATION_DT))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.INJURY_FLG))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.NALOXONE_GIVEN_FLG))), ''), '|',
-                        ISNULL(UPPER(LTRIM(RTRIM(b.MEDICATION_GIVEN_OTHER_FLG))), '')
-                    )), 2) AS RecordHash
-                FROM batch b
-            )
-            INSERT INTO silver.ems_clean (
-                RunId, FileName, SourceRowNum,
-                IncidentDttm,
-                IncidentCounty,
-                ChiefComplaintDispatch, ChiefComplaintAnatomicLoc,
-                PrimarySymptom, ProviderImpressionPrimary,
-                DispositionED, DispositionHospital, DestinationType,
-                ProviderTypeStructure, ProviderTypeService, ProviderTypeServiceLevel,
-                ProviderToSceneMins, ProviderToDestinationMins,
-                UnitNotifiedByDispatchDttm, UnitArrivedOnSceneDttm, UnitArrivedToPatientDttm,
-                UnitLeftSceneDttm, PatientArrivedDestinationDttm,
-                InjuryFlg, NaloxoneGivenFlg, MedicationGivenOtherFlg,
-                RecordHash
-            )
-            SELECT
-                t.RunId, t.FileName, t.SourceRowNum,
-                t.IncidentDttm,
-                t.IncidentCounty,
-                t.ChiefComplaintDispatch, t.ChiefComplaintAnatomicLoc,
-                t.PrimarySymptom, t.ProviderImpressionPrimary,
-                t.DispositionED, t.DispositionHospital, t.DestinationType,
-                t.ProviderTypeStructure, t.ProviderTypeService, t.ProviderTypeServiceLevel,
-                t.ProviderToSceneMins, t.ProviderToDestinationMins,
-                t.UnitNotifiedByDispatchDttm, t.UnitArrivedOnSceneDttm, t.UnitArrivedToPatientDttm,
-                t.UnitLeftSceneDttm, t.PatientArrivedDestinationDttm,
-                t.InjuryFlg, t.NaloxoneGivenFlg, t.MedicationGivenOtherFlg,
-                t.RecordHash
-            FROM typed t
-            LEFT JOIN rejected_keys r
-              ON r.RunId = t.RunId AND r.SourceRowNum = t.SourceRowNum
-            WHERE r.RunId IS NULL
-              AND NOT EXISTS (
-                  SELECT 1
-                  FROM silver.ems_clean c
-                  WHERE c.RecordHash = t.RecordHash
-              );
-            """
-
-            # insert rejects for this batch
-            cur.execute(reject_sql, batch_size, last_bronze_id)
-            try:
-                rows_reject_total += max(cur.rowcount or 0, 0)
-            except Exception:
-                pass  # some drivers return -1 for rowcount on INSERT
-
-            # insert clean rows for this batch
-            cur.execute(clean_sql, batch_size, last_bronze_id)
-            try:
-                rows_out_total += max(cur.rowcount or 0, 0)
-            except Exception:
-                pass
-
-            # move the watermark forward to the last BronzeId in this batch
-            cur.execute(
-                """
-                SELECT ISNULL(MAX(BronzeId), ?)
-                FROM (
-                    SELECT TOP (?) BronzeId
-                    FROM bronze.ems_raw
-                    WHERE BronzeId > ?
-                    ORDER BY BronzeId
-                ) x;
-                """,
-                last_bronze_id, batch_size, last_bronze_id
-            )
-            new_last = int(cur.fetchone()[0])
-
-            if new_last == last_bronze_id:
-                break  # safety check (prevents infinite loop)
-
-            last_bronze_id = new_last
-            set_last_bronze_id(conn, last_bronze_id)
+        if workers > 1:
+            ranges = _split_ranges(last_bronze_id, max_bronze_id, batch_size)
+            done = set()
+            next_idx = 0
+
+            with closing(_run_ranges_parallel(pool, ranges, workers, metrics, engine, retry, profile)) as results:
+                for idx, ((rows_reject, rows_out, rows_in, _), batch_profile) in results:
+                    profile.add(batch_profile)
+                    rows_reject_total += rows_reject
+                    rows_out_total += rows_out
+                    rows_in_total += rows_in
+
+                    # advance only to the highest contiguous completed range
+                    done.add(idx)
+                    start_idx = next_idx
+                    while next_idx in done:
+                        next_idx += 1
+                    if next_idx > start_idx:
+                        last_bronze_id = ranges[next_idx - 1][1]
+                        set_last_bronze_id(conn, last_bronze_id)
+
+        else:
+            _create_stage(cur, engine)
+            conn.commit()  # keep the temp tables when a batch gets rolled back for a retry
+
+            def run_one(lo: int, size: int):
+                # pull the next chunk from bronze by BronzeId (simple incremental pattern)
+                result = _run_batch(cur, lo, size, max_bronze_id, metrics, engine)
+                batch_profile = profile.read_batch(cur)
+                new_last = result[3]
+                if new_last != lo:
+                    # move the watermark forward to the last BronzeId in this batch, one commit with the batch
+                    with metrics.measure(SILVER_STEP, "commit", lo, new_last):
+                        write_last_bronze_id(conn, new_last)
+                        conn.commit()
+                # counted once the batch is in (a retried batch isn't counted twice)
+                profile.add(batch_profile)
+                return result
+
+            while last_bronze_id < max_bronze_id:
+                size = batch_size if batch_sizer is None else batch_sizer.size
+                t0 = time.perf_counter()
+                rows_reject, rows_out, rows_in, new_last = retry.run(lambda: run_one(last_bronze_id, size), conn)
+                rows_reject_total += rows_reject
+                rows_out_total += rows_out
+                rows_in_total += rows_in
+
+                if new_last == last_bronze_id:
+                    break  # safety check (prevents infinite loop)
+                if batch_sizer is not None:
+                    batch_sizer.observe(last_bronze_id, new_last, rows_in, time.perf_counter() - t0)
+                last_bronze_id = new_last
+
+                if on_batch is not None:
+                    # hand the batch to the consumer: everything up to MAX(SilverId) is committed now
+                    cur.execute("SELECT COALESCE(MAX(SilverId), 0) FROM silver.ems_clean;")
+                    on_batch(int(cur.fetchone()[0]))
+
+            cur.execute(duckdb_sql.DROP_STAGE_SQL if dialect_of(conn) == DUCKDB else _DROP_STAGE_SQL)
             conn.commit()
 
-        # simple "rows in" marker (max bronze seen). could be refined, but good enough for logging
-        rows_in_total = max_bronze_id
-
+        metrics.flush(conn)
+        profile.flush(conn)
+        if batch_sizer is not None:
+            batch_sizer.flush(conn, run_id, SILVER_STEP)
         end_step(
             conn,
             step_log_id,
@@ -313,6 +544,14 @@ def run_silver(
 
     except Exception as ex:
         # log failure and bubble up (so the caller can fail the run)
+        try:
+            conn.rollback()
+            metrics.flush(conn)  # timings up to the failure are the interesting part
+            profile.flush(conn)  # committed batches stay profiled
+            if batch_sizer is not None:
+                batch_sizer.flush(conn, run_id, SILVER_STEP)
+        except (pyodbc.Error, OSError):
+            pass
         try:
             end_step(
                 conn,
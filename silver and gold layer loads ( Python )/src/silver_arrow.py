@@ -0,0 +1,378 @@
+# src/silver_arrow.py
+# --engine arrow: the silver stage step (typing, trimming, Y/N/X flags, reject rule, RecordHash) done on
+# columnar pyarrow batches in this process instead of on the SQL Server CPU.
+# The result is bulk loaded into the same #silver_batch work set the SQL engine fills, so routing
+# (rejects, clean insert, dedupe, watermark) is the shared silver._ROUTE_SQL for both engines.
+#
+# Parity with silver._STAGE_SQL: python only decides values it can decide exactly the same way SQL does
+# (ASCII text, ISO dates, plain integers). Anything else - other date formats, odd numbers, non-ASCII
+# flags/text, very long rows - is resolved by SQL itself (TRY_CONVERT / UPPER / HASHBYTES), once per
+# distinct value, so both engines produce identical rows (--check-parity against a real SQL Server;
+# tests/test_silver_parity.py only against the DuckDB stand-in + the T-SQL statement text).
+#
+# Not columnar end to end: pyodbc hands the batch over as Row tuples (fetchall), which are pivoted into arrays here,
+# and RecordHash is one hashlib call per row. Typing / trimming / flags / rules are the vectorized part.
+import hashlib
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from .db import pyodbc
+
+from .bronze import BRONZE_COLUMNS
+from .dedupe import RECORD_HASH_COLUMNS, record_hash_sql
+from .dq_profile import PROFILE_COLUMNS
+from .metrics import StepMetrics, NULL_METRICS
+
+_STEP = "SILVER_LOAD"
+
+_FETCH_SQL = f"""
+SELECT TOP (?) BronzeId, RunId, FileName, SourceRowNum, {', '.join(BRONZE_COLUMNS)}
+FROM bronze.ems_raw
+WHERE BronzeId > ? AND BronzeId <= ?
+ORDER BY BronzeId;
+"""
+
+# values python leaves to SQL: Kind D = DATETIME2(0), I = INT, F = flag, S = text (only emptiness matters)
+CREATE_CONVERT_SQL = """
+IF OBJECT_ID('tempdb..#silver_convert') IS NOT NULL
+    DROP TABLE #silver_convert;
+
+CREATE TABLE #silver_convert (
+    Kind CHAR(1)        NOT NULL,
+    Raw  NVARCHAR(4000) NOT NULL   -- already trimmed, never ''
+);
+"""
+
+_CONVERT_SQL = """
+SELECT
+    Kind,
+    Raw,
+    CASE WHEN Kind = 'D' THEN TRY_CONVERT(DATETIME2(0), Raw) END,
+    CASE WHEN Kind = 'I' THEN TRY_CONVERT(INT, Raw) END,
+    CASE WHEN Kind = 'F' THEN
+        CASE WHEN UPPER(Raw) IN ('Y','YES','1','TRUE','T') THEN 'Y'
+             WHEN UPPER(Raw) IN ('N','NO','0','FALSE','F') THEN 'N'
+             WHEN NULLIF(Raw, '') IS NULL THEN NULL
+             ELSE 'X' END
+    END,
+    CASE WHEN NULLIF(Raw, '') IS NULL THEN 1 ELSE 0 END
+FROM #silver_convert;
+"""
+
+# rows python didn't hash (non-ASCII or longer than one NVARCHAR(4000)) get this placeholder, then SQL hashes them
+_HASH_PLACEHOLDER = bytes(32)
+
+_FIX_HASH_SQL = f"""
+UPDATE t
+SET RecordHash = {record_hash_sql("b")}
+FROM #silver_batch t
+JOIN bronze.ems_raw b ON b.BronzeId = t.BronzeId
+WHERE t.RecordHash = 0x{_HASH_PLACEHOLDER.hex()};
+"""
+
+_STAGE_COLUMNS = [
+    "BronzeId", "RunId", "FileName", "SourceRowNum",
+    "IncidentDttm",
+    "IncidentCounty",
+    "ChiefComplaintDispatch", "ChiefComplaintAnatomicLoc",
+    "PrimarySymptom", "ProviderImpressionPrimary",
+    "DispositionED", "DispositionHospital", "DestinationType",
+    "ProviderTypeStructure", "ProviderTypeService", "ProviderTypeServiceLevel",
+    "ProviderToSceneMins", "ProviderToDestinationMins",
+    "UnitNotifiedByDispatchDttm", "UnitArrivedOnSceneDttm", "UnitArrivedToPatientDttm",
+    "UnitLeftSceneDttm", "PatientArrivedDestinationDttm",
+    "InjuryFlg", "NaloxoneGivenFlg", "MedicationGivenOtherFlg",
+    "RecordHash",
+    "BlankMask", "ParseFailMask",
+    "ErrorType",
+]
+
+_INSERT_STAGE_SQL = f"""
+INSERT INTO #silver_batch ({', '.join(_STAGE_COLUMNS)})
+VALUES ({', '.join('?' for _ in _STAGE_COLUMNS)});
+"""
+
+# silver column -> bronze column, per type
+_TEXT_COLUMNS = {
+    "IncidentCounty": "INCIDENT_COUNTY",
+    "ChiefComplaintDispatch": "CHIEF_COMPLAINT_DISPATCH",
+    "ChiefComplaintAnatomicLoc": "CHIEF_COMPLAINT_ANATOMIC_LOC",
+    "PrimarySymptom": "PRIMARY_SYMPTOM",
+    "ProviderImpressionPrimary": "PROVIDER_IMPRESSION_PRIMARY",
+    "DispositionED": "DISPOSITION_ED",
+    "DispositionHospital": "DISPOSITION_HOSPITAL",
+    "DestinationType": "DESTINATION_TYPE",
+    "ProviderTypeStructure": "PROVIDER_TYPE_STRUCTURE",
+    "ProviderTypeService": "PROVIDER_TYPE_SERVICE",
+    "ProviderTypeServiceLevel": "PROVIDER_TYPE_SERVICE_LEVEL",
+}
+_DATE_COLUMNS = {
+    "IncidentDttm": "INCIDENT_DT",
+    "UnitNotifiedByDispatchDttm": "UNIT_NOTIFIED_BY_DISPATCH_DT",
+    "UnitArrivedOnSceneDttm": "UNIT_ARRIVED_ON_SCENE_DT",
+    "UnitArrivedToPatientDttm": "UNIT_ARRIVED_TO_PATIENT_DT",
+    "UnitLeftSceneDttm": "UNIT_LEFT_SCENE_DT",
+    "PatientArrivedDestinationDttm": "PATIENT_ARRIVED_DESTINATION_DT",
+}
+_INT_COLUMNS = {
+    "ProviderToSceneMins": "PROVIDER_TO_SCENE_MINS",
+    "ProviderToDestinationMins": "PROVIDER_TO_DESTINATION_MINS",
+}
+_FLAG_COLUMNS = {
+    "InjuryFlg": "INJURY_FLG",
+    "NaloxoneGivenFlg": "NALOXONE_GIVEN_FLG",
+    "MedicationGivenOtherFlg": "MEDICATION_GIVEN_OTHER_FLG",
+}
+
+_YES = pa.array(["Y", "YES", "1", "TRUE", "T"])
+_NO = pa.array(["N", "NO", "0", "FALSE", "F"])
+
+# ISO shapes TRY_CONVERT(DATETIME2(0), ...) reads the same way under any language / DATEFORMAT
+_ISO_DATE_RE = r"^\d{4}-\d{2}-\d{2}( \d{2}:\d{2}(:\d{2})?|T\d{2}:\d{2}:\d{2})?$"
+_ISO_DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+_PLAIN_INT_RE = r"^-?\d{1,9}$"  # always fits an INT
+
+_NULL_STR = pa.scalar(None, pa.string())
+
+
+def _trim(a: pa.Array) -> pa.Array:
+    # LTRIM/RTRIM only strip spaces
+    return pc.utf8_trim(a, characters=" ")
+
+
+def _nullif_empty(a: pa.Array) -> pa.Array:
+    return pc.if_else(pc.equal(a, ""), _NULL_STR, a)
+
+
+def _is_ascii(a: pa.Array) -> pa.Array:
+    return pc.fill_null(pc.string_is_ascii(a), True)
+
+
+def _strptime_exact(a: pa.Array, fmt: str) -> pa.Array:
+    # arrow's strptime rolls impossible dates over (2023-02-30 -> 2023-03-02); TRY_CONVERT gives NULL,
+    # so only keep values that format back to the exact input
+    parsed = pc.strptime(a, format=fmt, unit="s", error_is_null=True)
+    exact = pc.fill_null(pc.equal(pc.strftime(parsed, format=fmt), a), False)
+    return pc.if_else(exact, parsed, pa.scalar(None, parsed.type))
+
+
+class _Unresolved:
+    # values python handed to SQL, collected per batch: (kind, raw) -> row indexes per silver column
+    def __init__(self):
+        self.cells: list[tuple[str, str, int, str]] = []  # (silver column, kind, row index, raw)
+
+    def add(self, column: str, kind: str, raw: pa.Array, mask: pa.Array) -> None:
+        for i in pc.indices_nonzero(pc.fill_null(mask, False)).to_pylist():
+            self.cells.append((column, kind, i, raw[i].as_py()))
+
+    def resolve(self, cur: pyodbc.Cursor) -> dict[tuple[str, str], tuple]:
+        distinct = sorted({(kind, raw) for _, kind, _, raw in self.cells})
+        if not distinct:
+            return {}
+        cur.execute("TRUNCATE TABLE #silver_convert;")
+        cur.fast_executemany = True
+        try:
+            cur.executemany("INSERT INTO #silver_convert (Kind, Raw) VALUES (?, ?);", distinct)
+        finally:
+            cur.fast_executemany = False
+        cur.execute(_CONVERT_SQL)
+        return {(r[0], r[1]): tuple(r[2:]) for r in cur.fetchall()}
+
+
+def _patch(arr: pa.Array, column: str, cells: list, answers: dict, pick, type_: pa.DataType) -> pa.Array:
+    # overwrite the cells SQL decided for this column; pick(answer row, current value) -> new value
+    mine = [(i, answers[(kind, raw)]) for col, kind, i, raw in cells if col == column]
+    if not mine:
+        return arr
+    values = arr.to_pylist()
+    for i, answer in mine:
+        values[i] = pick(answer, values[i])
+    return pa.array(values, type=type_)
+
+
+def transform(cur: pyodbc.Cursor, raw: dict[str, pa.Array]) -> dict[str, pa.Array]:
+    """
+    Vectorized twin of the CROSS APPLY in silver._STAGE_SQL: bronze string columns in, #silver_batch columns out.
+    - raw holds the bronze columns by bronze name (pa.string arrays, same length)
+    - returns silver columns by #silver_batch name (everything except the lineage columns)
+    """
+    out: dict[str, pa.Array] = {}
+    todo = _Unresolved()
+    blank: dict[str, pa.Array] = {}  # bronze value there but empty after the trim (dates / ints; text + flags below)
+
+    for col, src in _TEXT_COLUMNS.items():
+        v = _nullif_empty(_trim(raw[src]))
+        out[col] = v
+        # non-ASCII text: only the collation knows whether it compares equal to ''
+        todo.add(col, "S", v, pc.invert(_is_ascii(v)))
+
+    for col, src in _DATE_COLUMNS.items():
+        v = _nullif_empty(_trim(raw[src]))
+        iso = pc.if_else(pc.fill_null(pc.match_substring_regex(v, _ISO_DATE_RE), False), v, _NULL_STR)
+        parsed = pc.coalesce(*[_strptime_exact(iso, f) for f in _ISO_DATE_FORMATS])
+        out[col] = parsed
+        blank[col] = pc.and_(pc.is_valid(raw[src]), pc.is_null(v))
+        todo.add(col, "D", v, pc.and_(pc.is_valid(v), pc.is_null(parsed)))
+
+    for col, src in _INT_COLUMNS.items():
+        v = _nullif_empty(_trim(raw[src]))
+        plain = pc.fill_null(pc.match_substring_regex(v, _PLAIN_INT_RE), False)
+        out[col] = pc.cast(pc.if_else(plain, v, _NULL_STR), pa.int32())
+        blank[col] = pc.and_(pc.is_valid(raw[src]), pc.is_null(v))
+        todo.add(col, "I", v, pc.and_(pc.is_valid(v), pc.invert(plain)))
+
+    for col, src in _FLAG_COLUMNS.items():
+        t = _trim(raw[src])
+        up = pc.utf8_upper(t)
+        empty = pc.fill_null(pc.equal(t, ""), True)
+        out[col] = pc.case_when(
+            pc.make_struct(pc.is_in(up, value_set=_YES), pc.is_in(up, value_set=_NO), empty),
+            pa.scalar("Y"), pa.scalar("N"), _NULL_STR, pa.scalar("X"),
+        )
+        todo.add(col, "F", t, pc.and_(pc.invert(empty), pc.invert(_is_ascii(t))))
+
+    # let SQL decide the leftovers (one round trip per batch, distinct values only)
+    if todo.cells:
+        answers = todo.resolve(cur)
+        for col in _TEXT_COLUMNS:
+            out[col] = _patch(out[col], col, todo.cells, answers, lambda a, v: None if a[3] else v, pa.string())
+        for col in _DATE_COLUMNS:
+            out[col] = _patch(out[col], col, todo.cells, answers, lambda a, v: a[0], pa.timestamp("s"))
+            blank[col] = _patch(blank[col], col, todo.cells, answers, lambda a, v: v or bool(a[3]), pa.bool_())
+        for col in _INT_COLUMNS:
+            out[col] = _patch(out[col], col, todo.cells, answers, lambda a, v: a[1], pa.int32())
+            blank[col] = _patch(blank[col], col, todo.cells, answers, lambda a, v: v or bool(a[3]), pa.bool_())
+        for col in _FLAG_COLUMNS:
+            out[col] = _patch(out[col], col, todo.cells, answers, lambda a, v: a[2], pa.string())
+
+    # first failing rule wins (same order as _STAGE_SQL)
+    out["ErrorType"] = pc.case_when(
+        pc.make_struct(
+            pc.is_null(out["IncidentDttm"]),
+            pc.is_null(out["IncidentCounty"]),
+            pc.fill_null(pc.equal(out["InjuryFlg"], "X"), False),
+            pc.fill_null(pc.equal(out["NaloxoneGivenFlg"], "X"), False),
+            pc.fill_null(pc.equal(out["MedicationGivenOtherFlg"], "X"), False),
+        ),
+        pa.scalar("INVALID_INCIDENT_DT"),
+        pa.scalar("MISSING_COUNTY"),
+        pa.scalar("INVALID_INJURY_FLG"),
+        pa.scalar("INVALID_NALOXONE_FLG"),
+        pa.scalar("INVALID_MED_GIVEN_FLG"),
+        _NULL_STR,
+    )
+
+    out["RecordHash"] = record_hashes(raw)
+    out["BlankMask"], out["ParseFailMask"] = _masks(raw, out, blank)
+    return out
+
+
+def _masks(raw: dict[str, pa.Array], out: dict[str, pa.Array], blank: dict[str, pa.Array]) -> tuple[pa.Array, pa.Array]:
+    # BlankMask / ParseFailMask, same bits as dq_profile.blank_mask_sql / parse_fail_mask_sql
+    n = len(out["ErrorType"])
+    blank_mask = pa.array([0] * n, pa.int32())
+    fail_mask = pa.array([0] * n, pa.int32())
+    zero = pa.scalar(0, pa.int32())
+    for i, (col, src, _) in enumerate(PROFILE_COLUMNS):
+        bit = pa.scalar(1 << i, pa.int32())
+        if col in blank:
+            # dates / ints: blank vs didn't convert
+            is_blank = pc.fill_null(blank[col], False)
+            failed = pc.and_(pc.invert(is_blank), pc.and_(pc.is_valid(raw[src]), pc.is_null(out[col])))
+        else:
+            # text / flags only come out NULL when the bronze value was empty; flags that didn't map are X
+            is_blank = pc.and_(pc.is_valid(raw[src]), pc.is_null(out[col]))
+            failed = pc.fill_null(pc.equal(out[col], "X"), False) if col in _FLAG_COLUMNS else None
+        blank_mask = pc.add(blank_mask, pc.if_else(is_blank, bit, zero))
+        if failed is not None:
+            fail_mask = pc.add(fail_mask, pc.if_else(failed, bit, zero))
+    return blank_mask, fail_mask
+
+
+def record_hashes(raw: dict[str, pa.Array]) -> list[bytes]:
+    """
+    Same bytes as dedupe.record_hash_sql: SHA2_256 over the UTF-16LE (NVARCHAR) text of
+    UPPER(trimmed values) joined with '|', NULL -> ''.
+    - Only ASCII rows up to 4000 chars are hashed here (UPPER/CONCAT behave identically there);
+      the rest get _HASH_PLACEHOLDER and are hashed by SQL (_FIX_HASH_SQL)
+    """
+    parts = [pc.fill_null(pc.utf8_upper(_trim(raw[c])), "") for c in RECORD_HASH_COLUMNS]
+    joined = pc.binary_join_element_wise(*parts, "|")
+
+    ascii_ok = _is_ascii(joined)
+    short_ok = pc.less_equal(pc.utf8_length(joined), 4000)
+    python_ok = pc.and_(ascii_ok, short_ok).to_pylist()
+
+    sha256 = hashlib.sha256
+    return [
+        sha256(s.encode("utf-16-le")).digest() if ok else _HASH_PLACEHOLDER
+        for s, ok in zip(joined.to_pylist(), python_ok)
+    ]
+
+
+def _max_len(values: list) -> int:
+    return max((len(v) for v in values if v), default=1)
+
+
+def stage_batch_arrow(
+    cur: pyodbc.Cursor,
+    last_bronze_id: int,
+    batch_size: int,
+    upper_bronze_id: int,
+    metrics: StepMetrics = NULL_METRICS
+) -> int:
+    """
+    Arrow stage step: fills #silver_batch (and nothing else) for BronzeId in (last, upper], TOP batch_size.
+    - Same rows, same values as silver._STAGE_SQL; the caller runs _ROUTE_SQL afterwards
+    - Needs #silver_batch and #silver_convert on this session (silver._CREATE_STAGE_SQL + CREATE_CONVERT_SQL)
+    - Returns rows staged
+    """
+    with metrics.measure(_STEP, "arrow:fetch", last_bronze_id, upper_bronze_id) as m:
+        cur.execute("TRUNCATE TABLE #silver_batch;")
+        cur.execute(_FETCH_SQL, batch_size, last_bronze_id, upper_bronze_id)
+        rows = cur.fetchall()
+        m.rows = len(rows)
+    if not rows:
+        return 0
+
+    with metrics.measure(_STEP, "arrow:transform", last_bronze_id, upper_bronze_id) as m:
+        # columnar from here on: one pa.string array per bronze column
+        columns = list(zip(*rows))
+        lineage = columns[:4]
+        raw = {name: pa.array(columns[4 + i], type=pa.string()) for i, name in enumerate(BRONZE_COLUMNS)}
+        out = transform(cur, raw)
+
+        staged = [list(lineage[0]), list(lineage[1]), list(lineage[2]), list(lineage[3])]
+        for col in _STAGE_COLUMNS[4:]:
+            v = out[col]
+            staged.append(v if isinstance(v, list) else v.to_pylist())
+        m.rows = len(rows)
+
+    with metrics.measure(_STEP, "arrow:load", last_bronze_id, upper_bronze_id) as m:
+        sizes = []
+        for col, values in zip(_STAGE_COLUMNS, staged):
+            if col in ("BronzeId", "SourceRowNum"):
+                sizes.append((pyodbc.SQL_BIGINT, 0, 0))
+            elif col in _DATE_COLUMNS:
+                sizes.append((pyodbc.SQL_TYPE_TIMESTAMP, 19, 0))
+            elif col in _INT_COLUMNS or col in ("BlankMask", "ParseFailMask"):
+                sizes.append((pyodbc.SQL_INTEGER, 0, 0))
+            elif col in _FLAG_COLUMNS:
+                sizes.append((pyodbc.SQL_CHAR, 1, 0))
+            elif col == "RecordHash":
+                sizes.append((pyodbc.SQL_BINARY, 32, 0))
+            else:
+                sizes.append((pyodbc.SQL_WVARCHAR, _max_len(values), 0))
+
+        cur.fast_executemany = True
+        try:
+            cur.setinputsizes(sizes)
+            cur.executemany(_INSERT_STAGE_SQL, list(zip(*staged)))
+        finally:
+            cur.fast_executemany = False
+
+        if any(h == _HASH_PLACEHOLDER for h in staged[_STAGE_COLUMNS.index("RecordHash")]):
+            cur.execute(_FIX_HASH_SQL)
+        m.rows = len(rows)
+
+    return len(rows)
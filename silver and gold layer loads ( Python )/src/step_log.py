@@ -1,17 +1,22 @@
-import pyodbc
+from .db import pyodbc
+from .dialect import DUCKDB, dialect_of
+from . import duckdb_sql
 
 
 def start_step(conn: pyodbc.Connection, run_id: str, step_name: str) -> int:
     # insert a STARTED record for this step and return the StepLogId
     cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO etl.run_step_log (RunId, StepName, Status)
-        OUTPUT INSERTED.StepLogId
-        VALUES (?, ?, 'STARTED');
-        """,
-        run_id, step_name
-    )
+    if dialect_of(conn) == DUCKDB:
+        cur.execute(duckdb_sql.START_STEP_SQL, run_id, step_name)
+    else:
+        cur.execute(
+            """
+            INSERT INTO etl.run_step_log (RunId, StepName, Status)
+            OUTPUT INSERTED.StepLogId
+            VALUES (?, ?, 'STARTED');
+            """,
+            run_id, step_name
+        )
     step_log_id = int(cur.fetchone()[0])
     conn.commit()
     return step_log_id
@@ -28,6 +33,11 @@ def end_step(
 ) -> None:
     # update the same step row when the step finishes (SUCCESS/FAILED + counts)
     cur = conn.cursor()
+    if dialect_of(conn) == DUCKDB:
+        cur.execute(duckdb_sql.END_STEP_SQL, status, rows_in, rows_out, rows_reject, error_message, step_log_id)
+        conn.commit()
+        return
+
     cur.execute(
         """
         UPDATE etl.run_step_log
@@ -42,3 +52,13 @@ def end_step(
         status, rows_in, rows_out, rows_reject, error_message, step_log_id
     )
     conn.commit()
+
+
+def succeeded_steps(conn: pyodbc.Connection, run_id: str) -> set[str]:
+    # names of the steps this RunId already finished (what a resumed run can skip)
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT DISTINCT StepName FROM etl.run_step_log WHERE RunId = ? AND Status = 'SUCCESS';",
+        run_id
+    )
+    return {r[0] for r in cur.fetchall()}
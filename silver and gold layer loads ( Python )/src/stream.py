@@ -0,0 +1,103 @@
+# src/stream.py
+import queue
+import threading
+
+from .db import pyodbc, connect, ConnectionPool, RetryPolicy, DEFAULT_RETRY
+from .silver import run_silver, DEFAULT_BATCH_SIZE
+from .gold import run_gold_stream, reset_gold
+from .metrics import StepMetrics, NULL_METRICS
+from .batch_sizer import AdaptiveBatchSize
+from .dq_profile import SilverProfile, NULL_PROFILE
+from .date_window import DATE_WINDOW
+
+DEFAULT_QUEUE_SIZE = 4
+
+
+def _put(silver_ids: queue.Queue, item: int | None, consumer: threading.Thread) -> None:
+    # blocking put (that's the backpressure), but don't wait forever on a consumer that already died
+    while True:
+        try:
+            silver_ids.put(item, timeout=1)
+            return
+        except queue.Full:
+            if not consumer.is_alive():
+                raise RuntimeError("gold consumer stopped")
+
+
+def run_streaming(
+    conn: pyodbc.Connection,
+    conn_str: str,
+    run_id: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    full_refresh: bool = False,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    fact_engine: str = "sql",
+    engine: str = "sql",
+    metrics: StepMetrics = NULL_METRICS,
+    dim_workers: int = 1,
+    pool: ConnectionPool | None = None,
+    retry: RetryPolicy = DEFAULT_RETRY,
+    batch_sizer: AdaptiveBatchSize | None = None,
+    rollups=(),
+    profile: SilverProfile = NULL_PROFILE,
+    date_window: tuple[int, int] = DATE_WINDOW
+) -> None:
+    """
+    Micro-batch mode: silver and gold run at the same time, pipelined per silver batch.
+    - Silver (this thread, `conn`) hands every committed batch's SilverId high mark to a gold consumer thread
+      (own connection) through a bounded queue
+    - Gold loads dims + fact for just that SilverId range, so new rows reach dw.* one batch after they land in silver
+    - queue_size = how many batches gold may fall behind before silver waits (backpressure)
+    - Silver stays serial here (parallel ranges commit out of SilverId order)
+    """
+    if queue_size < 1:
+        raise ValueError("queue_size must be >= 1")
+
+    gold_conn = connect(conn_str)
+    silver_ids: queue.Queue = queue.Queue(maxsize=queue_size)
+    errors: list[BaseException] = []
+
+    try:
+        if full_refresh:
+            # gold first: run_silver's full refresh resets the gold watermark, the DW rows have to go with it
+            reset_gold(gold_conn)
+
+        def consume():
+            try:
+                run_gold_stream(gold_conn, run_id, silver_ids, batch_size=batch_size,
+                                fact_engine=fact_engine, metrics=metrics, dim_workers=dim_workers, pool=pool,
+                                retry=retry, rollups=rollups, date_window=date_window)
+            except BaseException as ex:  # surfaced on the main thread after join
+                errors.append(ex)
+
+        consumer = threading.Thread(target=consume, name="gold-consumer", daemon=True)
+        consumer.start()
+
+        silver_error = None
+        try:
+            if not full_refresh:
+                # backlog first: silver rows that are already there but not in gold yet
+                cur = conn.cursor()
+                cur.execute("SELECT COALESCE(MAX(SilverId), 0) FROM silver.ems_clean;")
+                _put(silver_ids, int(cur.fetchone()[0]), consumer)
+
+            run_silver(conn, run_id, batch_size=batch_size, full_refresh=full_refresh, metrics=metrics,
+                       engine=engine, on_batch=lambda hi: _put(silver_ids, hi, consumer), retry=retry,
+                       batch_sizer=batch_sizer, profile=profile)
+        except Exception as ex:
+            silver_error = ex
+
+        # always release the consumer (also when silver failed: gold finishes what was committed)
+        try:
+            _put(silver_ids, None, consumer)
+        except RuntimeError:
+            pass
+        consumer.join()
+
+        if errors:
+            raise errors[0] from silver_error
+        if silver_error is not None:
+            raise silver_error
+
+    finally:
+        gold_conn.close()
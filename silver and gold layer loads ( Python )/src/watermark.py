@@ -1,12 +1,34 @@
-import pyodbc
+from .db import pyodbc
+from .dialect import DUCKDB, dialect_of
+from . import duckdb_sql
 
 # one watermark per pipeline so we can do safe incremental runs
 PIPELINE_NAME = "ems_silver_gold"
 
+# gold keeps its own row; for this pipeline LastBronzeId holds the last SilverId loaded into dw.*
+GOLD_PIPELINE_NAME = "ems_gold"
+
+# gold dims phase: LastBronzeId holds the last SilverId whose dims are loaded (>= ems_gold while the fact catches up)
+GOLD_DIMS_PIPELINE_NAME = "ems_gold_dims"
+
+# dw.ems_daily_summary reject counts: LastBronzeId holds the last silver.ems_reject.RejectId counted
+SUMMARY_REJECT_PIPELINE_NAME = "ems_summary_reject"
+
+# dw.rollup_* tables (rollups.py): LastBronzeId holds the last dw.FactEMS_Encounter.EncounterKey rolled up
+ROLLUP_PIPELINE_NAME = "ems_rollup"
+
+# bronze archive (bronze_archive.py): LastBronzeId holds the last BronzeId written to the Parquet archive
+BRONZE_ARCHIVE_PIPELINE_NAME = "ems_bronze_archive"
+
 
 def ensure_watermark_table(conn: pyodbc.Connection) -> None:
     # creates etl schema + watermark table if it doesn't exist (dev-friendly)
     cur = conn.cursor()
+    if dialect_of(conn) == DUCKDB:
+        cur.execute(duckdb_sql.WATERMARK_TABLE_SQL)
+        conn.commit()
+        return
+
     cur.execute(
         """
         IF NOT EXISTS (
@@ -56,11 +78,14 @@ def get_last_bronze_id(conn: pyodbc.Connection, pipeline_name: str = PIPELINE_NA
     return int(row[0])
 
 
-def set_last_bronze_id(conn: pyodbc.Connection, last_bronze_id: int, pipeline_name: str = PIPELINE_NAME) -> None:
-    # updates the watermark after a successful run (MERGE keeps it idempotent)
-    ensure_watermark_table(conn)
-
+def write_last_bronze_id(conn: pyodbc.Connection, last_bronze_id: int, pipeline_name: str = PIPELINE_NAME) -> None:
+    # the watermark MERGE alone: no DDL, no commit, so it lands in the caller's transaction with the rows it covers
+    # (the table has to exist already: get_last_bronze_id / ensure_watermark_table up front)
     cur = conn.cursor()
+    if dialect_of(conn) == DUCKDB:
+        cur.execute(duckdb_sql.SET_WATERMARK_SQL, pipeline_name, last_bronze_id)
+        return
+
     cur.execute(
         """
         MERGE etl.watermark AS tgt
@@ -73,4 +98,12 @@ def set_last_bronze_id(conn: pyodbc.Connection, last_bronze_id: int, pipeline_na
         """,
         pipeline_name, last_bronze_id
     )
+
+
+def set_last_bronze_id(conn: pyodbc.Connection, last_bronze_id: int, pipeline_name: str = PIPELINE_NAME) -> None:
+    # standalone watermark update (resets, archive): creates the table if needed and commits.
+    # ensure_watermark_table commits too, so never call this with uncommitted rows the watermark covers;
+    # use write_last_bronze_id + one conn.commit() for those
+    ensure_watermark_table(conn)
+    write_last_bronze_id(conn, last_bronze_id, pipeline_name)
     conn.commit()
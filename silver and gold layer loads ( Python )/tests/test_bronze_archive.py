@@ -0,0 +1,54 @@
+# tests/test_bronze_archive.py
+# --archive-bronze between silver and gold (DuckDB backend): the purge must leave the bronze rows of rejects the daily
+# summary hasn't counted yet, or gold's reject merge finds nothing to join and the counts are lost.
+import uuid
+
+import pytest
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("duckdb")
+
+from src.benchmark.generator import GeneratorConfig, write_csv
+from src.bronze import load_file
+from src.bronze_archive import archive_bronze
+from src.duckdb_backend import connect
+from src.gold import run_gold
+from src.silver import run_silver
+
+
+def _scalar(conn, sql):
+    cur = conn.cursor()
+    cur.execute(sql)
+    return cur.fetchone()[0]
+
+
+def test_silver_archive_gold_keeps_reject_counts(tmp_path):
+    csv_path = str(tmp_path / "ems.csv")
+    write_csv(csv_path, GeneratorConfig(4000, reject_rate=0.05, days=60))
+    conn = connect(str(tmp_path / "ems.duckdb"))
+    run_id = str(uuid.uuid4())
+
+    load_file(conn, run_id, csv_path)
+    run_silver(conn, run_id, batch_size=1000)
+    # rejects with a date the summary can put on a day (INVALID_INCIDENT_DT ones are never counted)
+    expected = _scalar(conn, "SELECT count(*) FROM silver.ems_reject WHERE ErrorType <> 'INVALID_INCIDENT_DT'")
+    assert expected > 0
+
+    archived, purged = archive_bronze(conn, str(uuid.uuid4()), str(tmp_path / "archive"), batch_size=1000)
+    assert archived == 4000
+    assert 0 < purged < archived  # stopped below the first reject gold hasn't counted
+    assert _scalar(conn, """
+        SELECT count(*) FROM silver.ems_reject r
+        WHERE NOT EXISTS (SELECT 1 FROM bronze.ems_raw b WHERE b.RunId = r.RunId AND b.SourceRowNum = r.SourceRowNum)
+    """) == 0
+
+    run_gold(conn, run_id, batch_size=1000)
+    assert _scalar(conn, "SELECT sum(RejectCount) FROM dw.ems_daily_summary") == expected
+
+    # counted now: the next archive run purges the rest, and the summary doesn't change
+    _, purged_after = archive_bronze(conn, str(uuid.uuid4()), str(tmp_path / "archive"))
+    assert purged + purged_after == 4000
+    assert _scalar(conn, "SELECT count(*) FROM bronze.ems_raw") == 0
+    run_gold(conn, run_id, batch_size=1000)
+    assert _scalar(conn, "SELECT sum(RejectCount) FROM dw.ems_daily_summary") == expected
+    conn.close()
@@ -0,0 +1,72 @@
+# tests/test_calendar_dim.py
+# DimDate with typo years in silver (DuckDB backend): whole years inside the date window, just the days outside it,
+# and the rows with those dates still load into silver and the fact.
+import csv
+import uuid
+
+import pytest
+
+pytest.importorskip("duckdb")
+
+from src.benchmark.generator import GeneratorConfig, generate_rows
+from src.bronze import BRONZE_COLUMNS, load_file
+from src.duckdb_backend import connect
+from src.gold import run_gold
+from src.silver import run_silver
+
+ROWS = 500
+
+
+def _scalar(conn, sql):
+    cur = conn.cursor()
+    cur.execute(sql)
+    return cur.fetchone()[0]
+
+
+@pytest.fixture
+def silver_conn(tmp_path):
+    # a month of 2023 incidents, one incident date in year 201 and one destination date in 2920
+    rows = [dict(zip(BRONZE_COLUMNS, r)) for r in generate_rows(GeneratorConfig(ROWS, duplicate_rate=0, reject_rate=0, days=30))]
+    rows[0]["INCIDENT_DT"] = "0201-01-01 10:00:00"
+    rows[1]["PATIENT_ARRIVED_DESTINATION_DT"] = "2920-05-01"
+    csv_path = str(tmp_path / "ems.csv")
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, BRONZE_COLUMNS)
+        w.writeheader()
+        w.writerows(rows)
+
+    conn = connect(str(tmp_path / "ems.duckdb"))
+    run_id = str(uuid.uuid4())
+    load_file(conn, run_id, csv_path)
+    run_silver(conn, run_id, batch_size=200)
+    yield conn, run_id
+    conn.close()
+
+
+def test_typo_years_get_their_days_only(silver_conn):
+    conn, run_id = silver_conn
+    assert _scalar(conn, "SELECT count(*) FROM silver.ems_clean") == ROWS
+    assert _scalar(conn, "SELECT count(*) FROM silver.ems_reject") == 0
+
+    run_gold(conn, run_id, batch_size=200)
+    assert _scalar(conn, "SELECT count(*) FROM dw.FactEMS_Encounter") == ROWS
+    assert _scalar(conn, "SELECT count(*) FROM dw.DimDate WHERE DateKey BETWEEN 20000101 AND 20991231") == 365  # 2023
+    assert _scalar(conn, "SELECT list(DateKey ORDER BY DateKey) FROM dw.DimDate WHERE DateKey NOT BETWEEN 20000101 AND 20991231") \
+        == [2010101, 29200501]
+    assert _scalar(conn, "SELECT sum(TotalIncidents) FROM dw.ems_daily_summary") == ROWS
+
+
+def test_window_is_per_run(silver_conn):
+    conn, run_id = silver_conn
+    run_gold(conn, run_id, batch_size=200, date_window=(2024, 2030))
+    # every 2023 date is outside now: only the days the rows use, no whole year
+    used = _scalar(conn, """
+        SELECT count(DISTINCT k) FROM (
+            SELECT unnest([IncidentDateKey, UnitNotifiedDateKey, ArrivedSceneDateKey, ArrivedPatientDateKey,
+                           LeftSceneDateKey, ArrivedDestinationDateKey]) AS k
+            FROM silver.ems_clean
+        ) v
+        WHERE k IS NOT NULL
+    """)
+    assert _scalar(conn, "SELECT count(*) FROM dw.DimDate WHERE DateKey <> -1") == used < 365
+    assert _scalar(conn, "SELECT count(*) FROM dw.FactEMS_Encounter") == ROWS
@@ -0,0 +1,92 @@
+# tests/test_daily_summary.py
+# the summary MERGEs are additive, so they must commit with the watermark that covers them (DuckDB backend, run_gold and
+# publish_gold): a failure between the MERGE and the watermark write rolls both back, and the retry / rerun counts every
+# row once.
+import uuid
+
+import pytest
+
+pytest.importorskip("duckdb")
+
+from src import daily_summary, gold
+from src.benchmark.generator import GeneratorConfig, write_csv
+from src.bronze import load_file
+from src.db import RetryPolicy, pyodbc
+from src.duckdb_backend import connect
+from src.silver import run_silver
+from src.watermark import GOLD_PIPELINE_NAME, SUMMARY_REJECT_PIPELINE_NAME
+
+
+def _scalar(conn, sql):
+    cur = conn.cursor()
+    cur.execute(sql)
+    return cur.fetchone()[0]
+
+
+def _fail_once(monkeypatch, module, pipeline_name, error):
+    # module.write_last_bronze_id raises `error` the first time it's called for pipeline_name (before writing anything)
+    real = module.write_last_bronze_id
+    calls = []
+
+    def write(conn, last_bronze_id, name=None):
+        if name == pipeline_name and not calls:
+            calls.append(last_bronze_id)
+            raise error
+        real(conn, last_bronze_id, name)
+
+    monkeypatch.setattr(module, "write_last_bronze_id", write)
+    return calls
+
+
+@pytest.fixture
+def silver_conn(tmp_path):
+    csv_path = str(tmp_path / "ems.csv")
+    write_csv(csv_path, GeneratorConfig(3000, reject_rate=0.05, days=30))
+    conn = connect(str(tmp_path / "ems.duckdb"))
+    run_id = str(uuid.uuid4())
+    load_file(conn, run_id, csv_path)
+    run_silver(conn, run_id, batch_size=1000)
+    yield conn, run_id
+    conn.close()
+
+
+def test_slice_retried_after_failed_watermark_counts_once(silver_conn, monkeypatch):
+    conn, run_id = silver_conn
+    calls = _fail_once(monkeypatch, gold, GOLD_PIPELINE_NAME, pyodbc.Error("40001", "deadlocked (1205)"))
+
+    gold.run_gold(conn, run_id, batch_size=1000, retry=RetryPolicy(attempts=2, base_delay=0.0))
+
+    assert calls  # the first slice did fail after its summary MERGE, and was retried
+    assert _scalar(conn, "SELECT count(*) FROM dw.FactEMS_Encounter") == _scalar(conn, "SELECT count(*) FROM silver.ems_clean")
+    assert _scalar(conn, "SELECT sum(TotalIncidents) FROM dw.ems_daily_summary") == _scalar(conn, """
+        SELECT count(*) FROM silver.ems_clean WHERE IncidentDttm IS NOT NULL AND IncidentCounty IS NOT NULL
+    """)
+
+
+def test_rejects_rerun_after_failed_watermark_counts_once(silver_conn, monkeypatch):
+    conn, run_id = silver_conn
+    expected = _scalar(conn, "SELECT count(*) FROM silver.ems_reject WHERE ErrorType <> 'INVALID_INCIDENT_DT'")
+    assert expected > 0
+    _fail_once(monkeypatch, daily_summary, SUMMARY_REJECT_PIPELINE_NAME, pyodbc.Error("HY000", "connection lost"))
+
+    with pytest.raises(pyodbc.Error):
+        gold.run_gold(conn, run_id, batch_size=1000)
+    assert _scalar(conn, "SELECT coalesce(sum(RejectCount), 0) FROM dw.ems_daily_summary") == 0
+
+    gold.run_gold(conn, run_id, batch_size=1000)
+    assert _scalar(conn, "SELECT sum(RejectCount) FROM dw.ems_daily_summary") == expected
+
+
+def test_publish_rerun_after_failed_watermark_counts_once(silver_conn, monkeypatch):
+    conn, run_id = silver_conn
+    _fail_once(monkeypatch, gold, GOLD_PIPELINE_NAME, pyodbc.Error("HY000", "connection lost"))
+
+    with pytest.raises(pyodbc.Error):
+        gold.publish_gold(conn, run_id, batch_size=1000)
+    assert _scalar(conn, "SELECT count(*) FROM dw.FactEMS_Encounter") == 0
+    assert _scalar(conn, "SELECT count(*) FROM dw.ems_daily_summary") == 0
+
+    gold.publish_gold(conn, run_id, batch_size=1000)
+    assert _scalar(conn, "SELECT sum(TotalIncidents) FROM dw.ems_daily_summary") == _scalar(conn, """
+        SELECT count(*) FROM silver.ems_clean WHERE IncidentDttm IS NOT NULL AND IncidentCounty IS NOT NULL
+    """)
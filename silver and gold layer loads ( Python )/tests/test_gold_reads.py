@@ -0,0 +1,93 @@
+# tests/test_gold_reads.py
+# GoldReads cache vs gold publishes (DuckDB backend, fake clock): a publish while a miss is reading must not leave the
+# pre- or mid-publish rows cached, and by default the next read after a publish sees it.
+from datetime import date
+
+import pytest
+
+pytest.importorskip("duckdb")
+
+from src.duckdb_backend import connect
+from src.gold import GOLD_STEP
+from src.gold_reads import GoldReads
+from src.step_log import end_step, start_step
+
+DAY = date(2023, 1, 1)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect(str(tmp_path / "ems.duckdb"))
+    yield conn
+    conn.close()
+
+
+def _publish(conn, county, incidents):
+    # what a gold run leaves behind: summary rows + a SUCCESS gold step (the data version)
+    cur = conn.cursor()
+    cur.execute(
+        "INSERT INTO dw.ems_daily_summary (IncidentDate, IncidentCounty, RunId, TotalIncidents) VALUES (?, ?, 'r', ?)",
+        DAY, county, incidents,
+    )
+    conn.commit()
+    end_step(conn, start_step(conn, "r", GOLD_STEP), "SUCCESS")
+
+
+def _counties(rows):
+    return sorted((r.county, r.encounters) for r in rows)
+
+
+def test_publish_during_miss_isnt_cached(conn):
+    _publish(conn, "A", 5)
+    reads = GoldReads(conn, check_seconds=60.0, clock=FakeClock())  # clock never moves: only the re-check can see it
+
+    real_read = reads._read
+    published = []
+
+    def read_then_publish(*args):
+        rows = real_read(*args)
+        if not published:
+            _publish(conn, "B", 7)  # lands after the read, before the miss stores its rows
+            published.append(True)
+        return rows
+
+    reads._read = read_then_publish
+
+    assert _counties(reads.daily_counts(DAY, DAY)) == [("A", 5)]       # read before the publish, returned as is
+    assert _counties(reads.daily_counts(DAY, DAY)) == [("A", 5), ("B", 7)]  # not served from the cache
+    assert _counties(reads.daily_counts(DAY, DAY)) == [("A", 5), ("B", 7)]
+    stats = reads.stats()
+    assert (stats["misses"], stats["hits"], stats["entries"]) == (2, 1, 1)
+
+
+def test_default_sees_publish_on_next_read(conn):
+    _publish(conn, "A", 5)
+    reads = GoldReads(conn, clock=FakeClock())
+    assert _counties(reads.daily_counts(DAY, DAY)) == [("A", 5)]
+    assert _counties(reads.daily_counts(DAY, DAY)) == [("A", 5)]
+    assert reads.stats()["hits"] == 1
+
+    _publish(conn, "B", 7)
+    assert _counties(reads.daily_counts(DAY, DAY)) == [("A", 5), ("B", 7)]
+    assert reads.stats()["invalidations"] == 1
+
+
+def test_check_seconds_bounds_staleness(conn):
+    _publish(conn, "A", 5)
+    clock = FakeClock()
+    reads = GoldReads(conn, check_seconds=5.0, clock=clock)
+    assert _counties(reads.daily_counts(DAY, DAY)) == [("A", 5)]
+
+    _publish(conn, "B", 7)
+    clock.now += 4.9
+    assert _counties(reads.daily_counts(DAY, DAY)) == [("A", 5)]  # opt-in: stale inside check_seconds
+    clock.now += 0.1
+    assert _counties(reads.daily_counts(DAY, DAY)) == [("A", 5), ("B", 7)]
@@ -0,0 +1,228 @@
+# tests/test_silver_parity.py
+# --engine arrow vs a stand-in for the SQL stage, over a fixed set of awkward bronze rows (trimming, flag spellings,
+# every reject rule, other date formats, non-ASCII, values past one NVARCHAR(4000)).
+# This is NOT parity with SQL Server: no T-SQL runs here. The stand-in is the DuckDB stage (duckdb_sql.STAGE_SQL), and
+# the values arrow leaves to SQL (#silver_convert) are answered by DuckDB too, so SQL Server's own TRY_CONVERT / LTRIM /
+# RTRIM / collation behaviour is never compared; run_pipeline --check-parity does that against a real database.
+# What ties the stand-in to the T-SQL silver._STAGE_SQL is checked on the statement text at the bottom: same reject
+# rules in the same order, same flag spellings, same bronze column behind every typed column.
+# RecordHash is checked against the T-SQL definition (SHA2_256 over UTF-16LE, see dedupe.record_hash_sql) instead,
+# DuckDB hashes UTF-8.
+import hashlib
+import re
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+duckdb = pytest.importorskip("duckdb")
+
+from src import duckdb_sql, silver, silver_arrow
+from src.bronze import BRONZE_COLUMNS
+from src.dedupe import RECORD_HASH_COLUMNS
+from src.duckdb_backend import connect
+
+_BASE = {
+    "INCIDENT_DT": "2023-03-04 05:06:07",
+    "INCIDENT_COUNTY": "COUNTY A",
+    "CHIEF_COMPLAINT_DISPATCH": "CHEST PAIN",
+    "CHIEF_COMPLAINT_ANATOMIC_LOC": "CHEST",
+    "PRIMARY_SYMPTOM": "PAIN",
+    "PROVIDER_IMPRESSION_PRIMARY": "CARDIAC",
+    "DISPOSITION_ED": "ADMITTED",
+    "DISPOSITION_HOSPITAL": "WARD",
+    "INJURY_FLG": "Y",
+    "NALOXONE_GIVEN_FLG": "N",
+    "MEDICATION_GIVEN_OTHER_FLG": "Y",
+    "DESTINATION_TYPE": "HOSPITAL",
+    "PROVIDER_TYPE_STRUCTURE": "FIRE",
+    "PROVIDER_TYPE_SERVICE": "911",
+    "PROVIDER_TYPE_SERVICE_LEVEL": "ALS",
+    "PROVIDER_TO_SCENE_MINS": "7",
+    "PROVIDER_TO_DESTINATION_MINS": "15",
+    "UNIT_NOTIFIED_BY_DISPATCH_DT": "2023-03-04 05:07:00",
+    "UNIT_ARRIVED_ON_SCENE_DT": "2023-03-04 05:14:00",
+    "UNIT_ARRIVED_TO_PATIENT_DT": "2023-03-04 05:15:00",
+    "UNIT_LEFT_SCENE_DT": "2023-03-04 05:30",
+    "PATIENT_ARRIVED_DESTINATION_DT": "2023-03-04",
+}
+
+# one row per case: overrides of _BASE
+CASES = {
+    "clean": {},
+    "padded": {"INCIDENT_DT": "  2023-03-04 05:06:07  ", "INCIDENT_COUNTY": "  county a ", "INJURY_FLG": " yes ",
+               "NALOXONE_GIVEN_FLG": " 0", "PROVIDER_TO_SCENE_MINS": " 12 "},
+    "flag spellings": {"INJURY_FLG": "true", "NALOXONE_GIVEN_FLG": "F", "MEDICATION_GIVEN_OTHER_FLG": "No"},
+    "blank flags": {"INJURY_FLG": "", "NALOXONE_GIVEN_FLG": "   ", "MEDICATION_GIVEN_OTHER_FLG": None},
+    "tab is not trimmed": {"INJURY_FLG": "\tY"},
+    "missing county": {"INCIDENT_COUNTY": "   "},
+    "null county": {"INCIDENT_COUNTY": None},
+    "bad injury flag": {"INJURY_FLG": "MAYBE"},
+    "bad naloxone flag": {"NALOXONE_GIVEN_FLG": "2"},
+    "bad medication flag": {"MEDICATION_GIVEN_OTHER_FLG": "yes please"},
+    "not a date": {"INCIDENT_DT": "not a date"},
+    "blank incident date": {"INCIDENT_DT": "  "},
+    "impossible date": {"INCIDENT_DT": "2023-02-30 10:00:00"},
+    "us date": {"INCIDENT_DT": "03/04/2023 5:06 PM", "UNIT_LEFT_SCENE_DT": "3/4/2023"},
+    "iso T date": {"INCIDENT_DT": "2023-03-04T05:06:07"},
+    "far years": {"INCIDENT_DT": "0201-01-01 10:00:00", "PATIENT_ARRIVED_DESTINATION_DT": "2920-05-01"},
+    "odd ints": {"PROVIDER_TO_SCENE_MINS": "1e3", "PROVIDER_TO_DESTINATION_MINS": "99999999999"},
+    "negative int": {"PROVIDER_TO_SCENE_MINS": "-5", "PROVIDER_TO_DESTINATION_MINS": ""},
+    "non-ascii text": {"INCIDENT_COUNTY": "Peñuelas", "PRIMARY_SYMPTOM": " Dolor – agudo "},
+    "non-ascii flag": {"NALOXONE_GIVEN_FLG": "ÿ"},
+    "long text": {"CHIEF_COMPLAINT_DISPATCH": "A" * 4500},
+    "long non-ascii text": {"PROVIDER_IMPRESSION_PRIMARY": "é" * 4100},
+}
+
+_COMPARED = silver_arrow._STAGE_COLUMNS[4:]  # everything but lineage
+
+
+def _bronze_rows() -> list[tuple]:
+    return [tuple({**_BASE, **case}[c] for c in BRONZE_COLUMNS) for case in CASES.values()]
+
+
+def _tsql_record_hash(row: tuple) -> bytes:
+    # HASHBYTES('SHA2_256', CONCAT(ISNULL(UPPER(LTRIM(RTRIM(col))), ''), '|', ...)) over NVARCHAR
+    values = dict(zip(BRONZE_COLUMNS, row))
+    text = "|".join((values[c] or "").strip(" ").upper() for c in RECORD_HASH_COLUMNS)
+    return hashlib.sha256(text.encode("utf-16-le")).digest()
+
+
+class _DuckDBConvert:
+    # stands in for the SQL Server session arrow sends its leftovers to: #silver_convert answered by the DuckDB rules
+    def __init__(self):
+        self.db = duckdb.connect()
+        self.db.execute("CREATE TABLE b (Kind VARCHAR, Raw VARCHAR);")
+        self.fast_executemany = False
+        self.converted = []
+        self._rows = []
+
+    def execute(self, sql, *params):
+        if sql.startswith("TRUNCATE"):
+            self.db.execute("DELETE FROM b;")
+        elif sql is silver_arrow._CONVERT_SQL:
+            self._rows = self.db.execute(f"""
+                SELECT
+                    Kind,
+                    Raw,
+                    CASE WHEN Kind = 'D' THEN {duckdb_sql._dttm("Raw")} END,
+                    CASE WHEN Kind = 'I' THEN {duckdb_sql._int("Raw")} END,
+                    CASE WHEN Kind = 'F' THEN {duckdb_sql._flag("Raw")} END,
+                    CASE WHEN NULLIF(trim(Raw), '') IS NULL THEN 1 ELSE 0 END
+                FROM b;
+            """).fetchall()
+        else:
+            raise AssertionError(f"unexpected statement: {sql}")
+
+    def executemany(self, sql, rows):
+        self.converted += rows
+        self.db.executemany("INSERT INTO b VALUES (?, ?);", rows)
+
+    def fetchall(self):
+        return self._rows
+
+
+@pytest.fixture(scope="module")
+def sql_stage() -> list[dict]:
+    conn = connect(":memory:")
+    cur = conn.cursor()
+    cur.executemany(
+        f"INSERT INTO bronze.ems_raw (RunId, FileName, SourceRowNum, {', '.join(BRONZE_COLUMNS)}) "
+        f"VALUES (?, ?, ?, {', '.join('?' for _ in BRONZE_COLUMNS)});",
+        [("run", "parity.csv", i + 1, *row) for i, row in enumerate(_bronze_rows())]
+    )
+    cur.execute(duckdb_sql.CREATE_STAGE_SQL)
+    cur.execute(duckdb_sql.STAGE_SQL, len(CASES), 0, len(CASES))
+    cur.execute(f"SELECT {', '.join(_COMPARED)} FROM silver_batch ORDER BY BronzeId;")
+    rows = [dict(zip(_COMPARED, r)) for r in cur.fetchall()]
+    conn.close()
+    return rows
+
+
+@pytest.fixture(scope="module")
+def arrow_stage() -> tuple[list[dict], _DuckDBConvert]:
+    rows = _bronze_rows()
+    raw = {c: pa.array([r[i] for r in rows], type=pa.string()) for i, c in enumerate(BRONZE_COLUMNS)}
+    convert = _DuckDBConvert()
+    out = silver_arrow.transform(convert, raw)
+    columns = {c: (v if isinstance(v, list) else v.to_pylist()) for c, v in out.items()}
+    return [{c: columns[c][i] for c in _COMPARED} for i in range(len(rows))], convert
+
+
+@pytest.mark.parametrize("case", list(CASES))
+def test_arrow_matches_sql_stage(case, sql_stage, arrow_stage):
+    i = list(CASES).index(case)
+    expected = {c: v for c, v in sql_stage[i].items() if c != "RecordHash"}
+    actual = {c: v for c, v in arrow_stage[0][i].items() if c != "RecordHash"}
+    assert actual == expected
+
+
+@pytest.mark.parametrize("case", list(CASES))
+def test_record_hash_matches_tsql(case, arrow_stage):
+    i = list(CASES).index(case)
+    row = _bronze_rows()[i]
+    joined = "|".join((v or "").strip(" ").upper() for v in (dict(zip(BRONZE_COLUMNS, row))[c] for c in RECORD_HASH_COLUMNS))
+    got = arrow_stage[0][i]["RecordHash"]
+    if joined.isascii() and len(joined) <= 4000:
+        assert got == _tsql_record_hash(row)
+    else:
+        assert got == silver_arrow._HASH_PLACEHOLDER  # left to SQL (_FIX_HASH_SQL)
+
+
+def test_reject_rules(sql_stage):
+    errors = dict(zip(CASES, (r["ErrorType"] for r in sql_stage)))
+    assert errors["clean"] is None and errors["padded"] is None and errors["blank flags"] is None
+    assert errors["missing county"] == errors["null county"] == "MISSING_COUNTY"
+    assert errors["bad injury flag"] == errors["tab is not trimmed"] == "INVALID_INJURY_FLG"
+    assert errors["bad naloxone flag"] == errors["non-ascii flag"] == "INVALID_NALOXONE_FLG"
+    assert errors["bad medication flag"] == "INVALID_MED_GIVEN_FLG"
+    for case in ("not a date", "blank incident date", "impossible date"):
+        assert errors[case] == "INVALID_INCIDENT_DT"
+    assert errors["far years"] is None  # a typo year is still a date (gold's date window only bounds DimDate)
+
+
+def test_only_undecidable_values_go_to_sql(arrow_stage):
+    sent = {raw for _, raw in arrow_stage[1].converted}
+    assert "03/04/2023 5:06 PM" in sent and "1e3" in sent and "Peñuelas" in sent and "ÿ" in sent
+    assert "2023-03-04 05:06:07" not in sent and "COUNTY A" not in sent and "A" * 4500 not in sent
+
+
+# --------------------------
+# statement text: the stand-in only says something about the T-SQL stage if both encode the same rules
+# --------------------------
+_REJECT_RULE_RE = re.compile(r"WHEN v\.(\w+) (IS NULL|= 'X') THEN '(\w+)'")
+_FLAG_SET_RE = re.compile(r"IN \(([^)]*)\) THEN '([YN])'")
+_TSQL_TYPED_RE = {
+    "date": re.compile(r"TRY_CONVERT\(DATETIME2\(0\), NULLIF\(LTRIM\(RTRIM\(b\.(\w+)\)\), ''\)\) AS (\w+)"),
+    "int": re.compile(r"TRY_CONVERT\(INT, NULLIF\(LTRIM\(RTRIM\(b\.(\w+)\)\), ''\)\) AS (\w+)"),
+    "text": re.compile(r"^\s+NULLIF\(LTRIM\(RTRIM\(b\.(\w+)\)\), ''\) AS (\w+)", re.MULTILINE),
+    "flag": re.compile(r"CASE WHEN UPPER\(LTRIM\(RTRIM\(b\.(\w+)\)\)\) IN .*? END AS (\w+)", re.DOTALL),
+}
+
+
+def _flag_sets(sql: str) -> set:
+    return {(letter, frozenset(v.strip(" '") for v in values.split(","))) for values, letter in _FLAG_SET_RE.findall(sql)}
+
+
+def test_tsql_and_duckdb_stage_reject_order():
+    tsql = _REJECT_RULE_RE.findall(silver._STAGE_SQL)
+    assert tsql == _REJECT_RULE_RE.findall(duckdb_sql.STAGE_SQL)
+    assert [rule for *_, rule in tsql] == [
+        "INVALID_INCIDENT_DT", "MISSING_COUNTY", "INVALID_INJURY_FLG", "INVALID_NALOXONE_FLG", "INVALID_MED_GIVEN_FLG"
+    ]
+
+
+def test_tsql_duckdb_and_arrow_flag_sets():
+    expected = {("Y", frozenset(silver_arrow._YES.to_pylist())), ("N", frozenset(silver_arrow._NO.to_pylist()))}
+    for sql in (silver._STAGE_SQL, duckdb_sql.STAGE_SQL, silver_arrow._CONVERT_SQL):
+        assert _flag_sets(sql) == expected
+
+
+def test_tsql_stage_columns_match_arrow():
+    # every typed silver column reads the bronze column arrow reads, with the conversion of its kind
+    found = {kind: {col: src for src, col in rx.findall(silver._STAGE_SQL)} for kind, rx in _TSQL_TYPED_RE.items()}
+    assert found == {
+        "date": silver_arrow._DATE_COLUMNS,
+        "int": silver_arrow._INT_COLUMNS,
+        "text": silver_arrow._TEXT_COLUMNS,
+        "flag": silver_arrow._FLAG_COLUMNS,
+    }